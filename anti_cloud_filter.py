@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ANTI-CLOUD FILTER - Anti-Wolken Regeln mit Zustand pro Objekt
+=============================================================
+Statt jeden Blob gegen die zuletzt gespeicherte Detection der Kamera zu
+prüfen, hält der Filter pro Objekt einen kompakten Zustand (Position,
+Geschwindigkeit, Zeitstempel) in vorab allokierten Arrays. Die Blobs eines
+Frames werden gesammelt dem nächstgelegenen (vorhergesagten) Objekt
+zugeordnet (Nachbarsuche über spatial_hash statt voller Abstandsmatrix)
+und alle drei Regeln laufen als Array-Operationen:
+
+    1. Mindest-Bewegung  (SLOW / FAST)       gegen Wolken-Drift
+    2. Fläche            (TINY / HUGE / SIZE_OK) gegen Reflexionen/Wolken
+    3. Geschwindigkeit   (CRAWL / BIRD_SPEED) Vogel-typisches Tempo
+
+Nur für das Overlay werden die Gründe wieder zu Text.
+
+Der Zuordnungsradius skaliert mit der Bildgröße (match_radius_for) - bei
+4K bewegt sich ein Vogel pro Frame um ein Vielfaches der Pixel von 640x480.
+"""
+
+import numpy as np
+
+from spatial_hash import SpatialHash
+
+# Regel-Codes pro Spalte: Bewegung, Fläche, Geschwindigkeit (0 = Regel nicht anwendbar)
+MOVE, SIZE, SPEED = 0, 1, 2
+REASON_NAMES = (
+    ('', 'SLOW', 'FAST', 'NEW'),
+    ('', 'TINY', 'HUGE', 'SIZE_OK'),
+    ('', 'CRAWL', 'BIRD_SPEED'),
+)
+SLOW, FAST, NEW = 1, 2, 3
+TINY, HUGE, SIZE_OK = 1, 2, 3
+CRAWL, BIRD_SPEED = 1, 2
+
+MATCH_FRACTION = 0.1  # Zuordnungsradius als Anteil der Bilddiagonale (80 px bei 640x480)
+
+
+def match_radius_for(frame_shape, fraction=MATCH_FRACTION):
+    """Zuordnungsradius (Pixel) für eine Frame-Größe"""
+    height, width = frame_shape[:2]
+    return fraction * float(np.hypot(width, height))
+
+
+def describe_reasons(codes):
+    """Regel-Codes eines Blobs → Overlay-Text (maximal 2 Gründe)"""
+    names = [REASON_NAMES[rule][code] for rule, code in enumerate(codes) if code]
+    return " ".join(names[:2]) or "FIRST"
+
+
+class AntiCloudFilter:
+    """Anti-Wolken Filter einer Kamera (eine Instanz pro Kamera)
+
+    capacity: Anzahl gleichzeitig verfolgter Objekte (älteste werden ersetzt,
+    überzählige neue Blobs eines Frames bekommen keinen Platz)
+    match_radius: max. Abstand (Pixel) Blob ↔ vorhergesagte Objektposition -
+    bei wechselnder Bildgröße per set_match_radius(match_radius_for(...)) nachführen
+    max_age: Sekunden ohne Treffer, nach denen ein Objekt vergessen wird
+    fps: Bezugs-Framerate der Speed-Regel (Pixel pro Frame)
+    """
+
+    def __init__(self, capacity=64, match_radius=80.0, max_age=1.0, fps=30.0):
+        self.capacity = capacity
+        self.match_radius = match_radius
+        self.max_age = max_age
+        self.fps = fps
+        self.position = np.zeros((capacity, 2), np.float32)
+        self.velocity = np.zeros((capacity, 2), np.float32)  # Pixel pro Sekunde
+        self.timestamp = np.full(capacity, -np.inf)
+        self.hits = np.zeros(capacity, np.int32)
+        self._index = SpatialHash(match_radius)
+
+    def reset(self):
+        self.timestamp[:] = -np.inf
+        self.hits[:] = 0
+
+    def set_match_radius(self, match_radius):
+        """Zuordnungsradius ändern (z.B. neue Auflösung) - Objektzustand bleibt"""
+        if match_radius != self.match_radius:
+            self.match_radius = match_radius
+            self._index = SpatialHash(match_radius)
+
+    def evaluate(self, blobs, timestamp, min_movement, min_area, max_area, min_speed):
+        """Alle Regeln für die Blobs eines Frames auswerten und Objektzustand fortschreiben
+
+        Returns:
+            (passes, codes) - bool-Array pro Blob und Regel-Codes (N×3, uint8)
+        """
+        count = len(blobs)
+        passes = np.zeros(count, bool)
+        codes = np.zeros((count, 3), np.uint8)
+        if not count:
+            return passes, codes
+
+        # 2. Fläche - gilt unabhängig vom Objektzustand
+        areas = blobs['area']
+        codes[:, SIZE] = np.where(areas < min_area, TINY, np.where(areas > max_area, HUGE, SIZE_OK))
+        candidates = np.flatnonzero(codes[:, SIZE] == SIZE_OK)
+        if not len(candidates):
+            return passes, codes
+
+        centers = np.empty((len(candidates), 2), np.float32)
+        centers[:, 0] = blobs['cx'][candidates]
+        centers[:, 1] = blobs['cy'][candidates]
+        codes[candidates, MOVE] = NEW
+
+        age = timestamp - self.timestamp
+        alive = np.flatnonzero((age <= self.max_age) & (age > 0))
+        matched = np.zeros(len(candidates), bool)
+        updated = np.zeros(self.capacity, bool)  # In diesem Frame fortgeschriebene Objekte
+
+        if len(alive):
+            # Zuordnung zur vorhergesagten Position - der nächste Blob gewinnt das Objekt
+            predicted = self.position[alive] + self.velocity[alive] * age[alive, None].astype(np.float32)
+            nearest, nearest_distance = self._index.build(predicted).nearest(
+                centers, 1, self.match_radius)
+            nearest, nearest_distance = nearest[:, 0], nearest_distance[:, 0]
+            order = np.argsort(nearest_distance, kind='stable')
+            order = order[nearest[order] >= 0]
+            _, first = np.unique(nearest[order], return_index=True)
+            winners = order[first]
+            slots = alive[nearest[winners]]
+            matched[winners] = True
+            updated[slots] = True
+
+            # 1. Mindest-Bewegung seit der letzten Position des eigenen Objekts
+            delta = centers[winners] - self.position[slots]
+            distance = np.hypot(delta[:, 0], delta[:, 1])
+            moving = distance >= min_movement
+            codes[candidates[winners], MOVE] = np.where(moving, FAST, SLOW)
+
+            # 3. Geschwindigkeit - erst ab dem zweiten Treffer (wie früher ab 3 Einträgen)
+            dt = age[slots]
+            speed_per_frame = distance / dt / self.fps
+            rated = self.hits[slots] >= 2
+            fast = speed_per_frame >= min_speed
+            codes[candidates[winners], SPEED] = np.where(rated, np.where(fast, BIRD_SPEED, CRAWL), 0)
+
+            self.velocity[slots] = delta / dt[:, None].astype(np.float32)
+            self.position[slots] = centers[winners]
+            self.timestamp[slots] = timestamp
+            self.hits[slots] += 1
+
+        # Neue Objekte: freie Plätze, sonst die am längsten nicht gesehenen - nie ein
+        # gerade zugeordnetes Objekt; reicht der Platz nicht, bleiben Blobs ohne Objekt
+        new = np.flatnonzero(~matched)
+        if len(new):
+            available = np.flatnonzero(~updated)
+            slots = available[np.argsort(self.timestamp[available], kind='stable')[:len(new)]]
+            new = new[:len(slots)]
+            self.position[slots] = centers[new]
+            self.velocity[slots] = 0.0
+            self.timestamp[slots] = timestamp
+            self.hits[slots] = 1
+
+        move = codes[:, MOVE]
+        passes[:] = (codes[:, SIZE] == SIZE_OK) & (move != SLOW) & (codes[:, SPEED] != CRAWL)
+        return passes, codes
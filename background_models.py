@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BACKGROUND MODELS - Austauschbare Hintergrundmodelle der Detection
+==================================================================
+Alle Modelle liefern für einen Frame eine Vordergrund-Maske (uint8,
+0..255) - der anschließende Threshold der Pipeline bleibt gleich:
+
+    mog2            Gaußsche Mischverteilung (OpenCV MOG2, bisheriger Standard)
+    knn             K-Nearest-Neighbours (OpenCV KNN)
+    running_average Graustufen-Mittelwert mit exponentiellem Vergessen -
+                    billigstes adaptives Modell, Maske = Helligkeitsdifferenz
+    frame_diff      Differenz zum vorherigen Frame (Lernrate 1)
+
+Jedes Modell hat eine explizite Lernrate bzw. History (Lernrate = 1/History).
+Auswahl pro Profil über den 'background'-Eintrag in DETECTION_PROFILES:
+
+    "background": {"model": "running_average", "history": 600, "noise_floor": 3}
+"""
+
+import inspect
+
+import cv2
+import numpy as np
+
+
+def _to_gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+class BackgroundModel:
+    """Schnittstelle: apply() → Vordergrund-Maske, background_image() für die Verfeinerung"""
+
+    name = None
+
+    def apply(self, frame):
+        raise NotImplementedError
+
+    def background_image(self):
+        """Aktuelles Hintergrundbild (oder None, solange noch nichts gelernt wurde)"""
+        return None
+
+    def reset(self):
+        pass
+
+
+class MOG2Background(BackgroundModel):
+    """OpenCV MOG2 - robust, aber teuer (mehrere Gaußverteilungen pro Pixel)
+
+    learning_rate: -1 = automatisch aus history
+    """
+
+    name = 'mog2'
+
+    def __init__(self, history=500, var_threshold=16, detect_shadows=True, learning_rate=-1):
+        self.history = history
+        self.var_threshold = var_threshold
+        self.detect_shadows = detect_shadows
+        self.learning_rate = learning_rate
+        self.reset()
+
+    def reset(self):
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=self.history, varThreshold=self.var_threshold, detectShadows=self.detect_shadows)
+
+    def apply(self, frame):
+        # MOG2 lernt bei Größenwechsel automatisch neu
+        return self.subtractor.apply(frame, learningRate=self.learning_rate)
+
+    def background_image(self):
+        return self.subtractor.getBackgroundImage()
+
+
+class KNNBackground(MOG2Background):
+    """OpenCV KNN - bei wenigen Vordergrund-Pixeln oft schneller als MOG2"""
+
+    name = 'knn'
+
+    def __init__(self, history=500, dist2_threshold=400.0, detect_shadows=False, learning_rate=-1):
+        self.dist2_threshold = dist2_threshold
+        super().__init__(history, None, detect_shadows, learning_rate)
+
+    def reset(self):
+        self.subtractor = cv2.createBackgroundSubtractorKNN(
+            history=self.history, dist2Threshold=self.dist2_threshold, detectShadows=self.detect_shadows)
+
+
+class RunningAverageBackground(BackgroundModel):
+    """Graustufen-Mittelwert: bg = (1 - a) * bg + a * frame
+
+    learning_rate: a pro Frame (Standard 1/history)
+    noise_floor: Helligkeitsdifferenz, die als Sensorrauschen abgezogen wird
+    """
+
+    name = 'running_average'
+
+    def __init__(self, history=100, learning_rate=None, noise_floor=0):
+        self.history = history
+        self.learning_rate = learning_rate if learning_rate is not None else 1.0 / max(1, history)
+        self.noise_floor = noise_floor
+        self.reset()
+
+    def reset(self):
+        self._average = None
+
+    def apply(self, frame):
+        gray = _to_gray(frame)
+        if self._average is None or self._average.shape != gray.shape:
+            self._average = gray.astype(np.float32)  # Größenwechsel: neu lernen
+            return np.zeros_like(gray)
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._average))
+        cv2.accumulateWeighted(gray, self._average, self.learning_rate)
+        if self.noise_floor:
+            diff = cv2.subtract(diff, self.noise_floor)
+        return diff
+
+    def background_image(self):
+        return None if self._average is None else cv2.convertScaleAbs(self._average)
+
+
+class FrameDifferenceBackground(BackgroundModel):
+    """Differenz zum vorherigen Graustufen-Frame - kein Modell, volle Bildrate"""
+
+    name = 'frame_diff'
+
+    def __init__(self, noise_floor=0):
+        self.noise_floor = noise_floor
+        self.reset()
+
+    def reset(self):
+        self._previous = None
+
+    def apply(self, frame):
+        gray = _to_gray(frame)
+        previous, self._previous = self._previous, gray.copy()
+        if previous is None or previous.shape != gray.shape:
+            return np.zeros_like(gray)
+        diff = cv2.absdiff(gray, previous)
+        if self.noise_floor:
+            diff = cv2.subtract(diff, self.noise_floor)
+        return diff
+
+    def background_image(self):
+        return self._previous
+
+
+BACKGROUND_MODELS = {
+    model.name: model
+    for model in (MOG2Background, KNNBackground, RunningAverageBackground, FrameDifferenceBackground)
+}
+
+
+def create_background_model(spec=None, **defaults):
+    """Hintergrundmodell aus einer Profil-Angabe {'model': ..., weitere Parameter}
+
+    defaults gelten, soweit das Modell den Parameter kennt und spec ihn nicht setzt.
+    """
+    spec = dict(spec or {})
+    model_class = BACKGROUND_MODELS.get(spec.pop('model', 'mog2'))
+    if model_class is None:
+        raise ValueError(f"Unbekanntes Hintergrundmodell - verfügbar: {', '.join(BACKGROUND_MODELS)}")
+    accepted = inspect.signature(model_class).parameters
+    kwargs = {key: value for key, value in defaults.items() if key in accepted}
+    kwargs.update(spec)
+    return model_class(**kwargs)
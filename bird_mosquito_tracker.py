@@ -19,10 +19,16 @@ import numpy as np
 import threading
 import time
 from datetime import datetime
-from collections import deque
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
+from anti_cloud_filter import AntiCloudFilter, describe_reasons, match_radius_for
+from detection_store import DetectionStore, best_synchronized, match_synchronized
+from frame_capture import CaptureClock, monotonic_to_wall
+from frame_pacer import FrameRateGovernor
+from overlay_renderer import DetectionResult, OverlayRenderer
+from motion_detection import MotionDetector
+
 print("🎯 Bird & Mosquito Tracker - Optimiert und Vereinfacht")
 print("✅ OpenCV verfügbar")
 print("✅ matplotlib verfügbar - stabile 3D-Triangulation")
@@ -167,7 +173,7 @@ class Stable3DTriangulation:
                 return
                 
             # Pruefe ob Motion-Daten vorhanden
-            if not hasattr(self.tracker, 'camera_motion_data'):
+            if not hasattr(self.tracker, 'detections'):
                 return
                 
             # Synchrone Motion-Filter anwenden
@@ -193,55 +199,21 @@ class Stable3DTriangulation:
     def _filter_synchronized_motions(self):
         """Filtere nur zeitgleiche Bewegungen"""
         try:
-            if not hasattr(self.tracker, 'camera_motion_data') or \
-               len(self.tracker.camera_motion_data) < 2:
+            if not hasattr(self.tracker, 'detections'):
                 return {}
                 
-            current_time = time.time()
-            sync_tolerance = 0.2  # 200ms Toleranz - schneller
+            current_time = time.monotonic()  # Capture-Zeitstempel sind monoton
+            sync_tolerance = 0.05  # 50ms - echter Kamera-Versatz dank Capture-Zeitstempel
             
-            # Sammle aktuelle Motion-Events
-            recent_motions = {}
-            for camera_name, motion_list in self.tracker.camera_motion_data.items():
-                if camera_name not in self.camera_positions or not motion_list:
-                    continue
-                    
-                # Nur Events der letzten Sekunde
-                very_recent = []
-                for motion in motion_list:
-                    try:
-                        if current_time - motion['timestamp'] < 1.0:
-                            very_recent.append(motion)
-                    except:
-                        continue
-                        
-                if very_recent:
-                    recent_motions[camera_name] = very_recent
+            # Gefilterte Motion-Events der letzten Sekunde als Slices pro Kamera
+            recent_motions = self.tracker.detections.recent(current_time - 1.0,
+                                                            cameras=list(self.camera_positions), limit=50)
             
             if len(recent_motions) < 2:
                 return {}
             
-            # Finde beste zeitliche Uebereinstimmung
-            camera_names = list(recent_motions.keys())
-            best_match = None
-            best_time_diff = float('inf')
-            
-            for i in range(len(camera_names)):
-                for j in range(i + 1, len(camera_names)):
-                    cam1_name = camera_names[i]
-                    cam2_name = camera_names[j]
-                    
-                    for motion1 in recent_motions[cam1_name]:
-                        for motion2 in recent_motions[cam2_name]:
-                            try:
-                                time_diff = abs(motion1['timestamp'] - motion2['timestamp'])
-                                if time_diff < sync_tolerance and time_diff < best_time_diff:
-                                    best_time_diff = time_diff
-                                    best_match = {cam1_name: motion1, cam2_name: motion2}
-                            except:
-                                continue
-            
-            return best_match or {}
+            # Finde beste zeitliche Uebereinstimmung (Binaersuche ueber die Zeitstempel)
+            return best_synchronized(recent_motions, match_synchronized(recent_motions, sync_tolerance))
             
         except Exception:
             return {}
@@ -262,7 +234,7 @@ class Stable3DTriangulation:
                 camera_color = self.camera_colors.get(camera_name, 'white')
                 
                 # 3D Richtung berechnen
-                direction = self._pixel_to_3d_direction(motion['x'], motion['y'], camera_name)
+                direction = self._pixel_to_3d_direction(motion['cx'], motion['cy'], camera_name)
                 
                 # Strahl fuer Tracking
                 ray_length = 5.0
@@ -302,10 +274,10 @@ class Stable3DTriangulation:
                         
                         # 3D Strahlen
                         pos1 = self.camera_positions[cam1_name]
-                        dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'], cam1_name)
+                        dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name)
                         
                         pos2 = self.camera_positions[cam2_name]
-                        dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'], cam2_name)
+                        dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name)
                         
                         # Triangulation
                         intersection, confidence = self._line_intersection_3d_with_confidence(pos1, dir1, pos2, dir2)
@@ -411,14 +383,22 @@ class BirdMosquitoTracker:
         # Tracking state
         self.is_tracking = False
         self.caps = {}
-        self.bg_subtractors = {}
-        self.camera_motion_data = {}
-        self.motion_data = []
+        self.detectors = {}  # MotionDetector (eigenes Hintergrundmodell) pro Kamera
+        self.detection_backend = 'opencv'  # 'native' = C++-Kernel aus core/ (falls gebaut)
+        # Motion-Gate: Frames ohne globale Veraenderung ueberspringen Blobs + Filter
+        # (8er Bloecke mit 2er Stichprobe - auch fuer Muecken fein genug)
+        self.motion_gate = {'block': 8, 'sample': 2, 'noise_threshold': 6}
+        self.storm_frames = {}  # Helligkeitsspruenge: verworfene Frames der laufenden Episode pro Kamera
+        self.capture_clocks = {}  # Capture-Zeitstempel pro Kamera (monoton)
+        self.detections = DetectionStore()  # Alle Blobs als Records pro Kamera (3D Viewer, Triangulation)
+        self.cloud_filters = {}  # AntiCloudFilter (Objektzustand) pro Kamera
+        self.overlay_renderer = OverlayRenderer()  # Overlays hoechstens mit Anzeige-Rate
         self.last_detection_frame = None
         self.last_detection_info = None
         
         # Performance optimiert
         self.frame_skip = 1  # Verarbeite jeden Frame
+        self.target_fps = 30  # Entspricht CAP_PROP_FPS der Kameras
         self.current_frame_count = 0
         
         self._setup_ui()
@@ -628,9 +608,10 @@ class BirdMosquitoTracker:
                         
                         camera_name = f'webcam_{i}'
                         self.caps[camera_name] = cap
-                        self.bg_subtractors[camera_name] = cv2.createBackgroundSubtractorMOG2(
-                            history=300, varThreshold=16, detectShadows=False)
-                        self.camera_motion_data[camera_name] = deque(maxlen=50)
+                        self.detectors[camera_name] = MotionDetector(
+                            history=300, var_threshold=16, detect_shadows=False, kernel_size=2,
+                            backend=self.detection_backend, gate=self.motion_gate)
+                        self.cloud_filters[camera_name] = AntiCloudFilter()
                         
                         camera_count += 1
                         self.log(f"✅ {camera_name}: {actual_width}x{actual_height} @ {actual_fps:.1f}FPS")
@@ -672,197 +653,153 @@ class BirdMosquitoTracker:
         for cap in self.caps.values():
             if cap.isOpened():
                 cap.release()
+        for camera_name, detector in self.detectors.items():
+            if detector.gate is not None and detector.gate.frames:
+                self.log(f"🚦 {camera_name}: {detector.gate.summary()}")
         self.caps.clear()
-        self.bg_subtractors.clear()
+        self.detectors.clear()
+        self.cloud_filters.clear()
+        self.capture_clocks.clear()
     
     def _tracking_loop(self):
         """Haupt-Tracking-Loop - PERFORMANCE OPTIMIERT"""
         frame_count = 0
         start_time = time.time()
+        governor = FrameRateGovernor(self.target_fps, log=self.log)
         
         while self.is_tracking:
+            governor.begin()
             try:
                 frames = {}
                 motion_counts = {}
                 
                 # Lese Frames von allen Kameras PARALLEL
                 for camera_name, cap in self.caps.items():
-                    ret, frame = cap.read()
+                    # Grab zuerst → Zeitstempel zum Aufnahmezeitpunkt
+                    ret = cap.grab()
+                    if not ret:
+                        continue
+                    clock = self.capture_clocks.setdefault(camera_name, CaptureClock())
+                    timestamp = clock.stamp(cap) / 1e9
+                    ret, frame = cap.retrieve()
                     if ret and frame is not None:
                         # Frame-Skip fuer Performance (nur wenn noetig)
                         self.current_frame_count += 1
                         if self.current_frame_count % self.frame_skip == 0:
                             # Verarbeite Frame
-                            processed_frame, motion_count = self._process_motion(
+                            result = self._process_motion(
                                 frame, camera_name,
                                 self.threshold_var.get(),
                                 self.min_area_var.get(),
-                                self.max_area_var.get()
+                                self.max_area_var.get(),
+                                timestamp,
+                                scale=governor.detection_scale
                             )
-                            frames[camera_name] = processed_frame
-                            motion_counts[camera_name] = motion_count
+                            frames[camera_name] = result
+                            motion_counts[camera_name] = result.filtered_count
                 
-                # Zeige Frames an (optimiert)
+                # Zeige Frames an - gezeichnet wird nur mit Anzeige-Wiederholrate
                 if frames:
-                    self._display_frames(frames, motion_counts, frame_count, start_time)
+                    if self.overlay_renderer.due():
+                        images = self._render_frames(frames, annotate=governor.draw_overlays)
+                        self._display_frames(images, motion_counts, frame_count, start_time)
                     frame_count += 1
                 
-                # Kurze Pause fuer andere Threads
-                time.sleep(0.02)  # ~50 FPS Maximum
-                
             except Exception as e:
                 self.log(f"⚠️ Tracking-Fehler: {str(e)}")
                 time.sleep(0.1)
+                
+            # Nur die Restzeit bis zur Ziel-FPS schlafen, bei Ueberlast drosseln
+            governor.end()
     
-    def _process_motion(self, frame, camera_name, threshold, min_area, max_area):
-        """Process motion detection auf Frame - OPTIMIERT"""
+    def _process_motion(self, frame, camera_name, threshold, min_area, max_area, timestamp=None,
+                        scale=1.0):
+        """Process motion detection auf Frame - OPTIMIERT
+
+        timestamp: Capture-Zeit des Frames (time.monotonic() Sekunden)
+        scale: Drosselung durch das Frame-Pacing
+        Returns: DetectionResult - gezeichnet wird erst in _render_frames()
+        """
         if frame is None:
-            return frame, 0
+            return None
             
-        bg_subtractor = self.bg_subtractors[camera_name]
-        
-        # Background subtraction
-        fg_mask = bg_subtractor.apply(frame)
-        
-        # Apply threshold
-        _, fg_mask = cv2.threshold(fg_mask, threshold, 255, cv2.THRESH_BINARY)
-        
-        # Morphological operations - OPTIMIERT
-        kernel = np.ones((2,2), np.uint8)  # Kleinerer Kernel fuer Performance
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel, iterations=1)
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel, iterations=1)
-        
-        # Find contours
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Process contours mit ANTI-WOLKEN FILTER
-        motion_count = 0
-        filtered_motion_count = 0
-        result_frame = frame.copy()
-        current_time = time.time()
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if min_area <= area <= max_area:
-                motion_count += 1
-                
-                # Get contour info
-                x, y, w, h = cv2.boundingRect(contour)
-                center_x = x + w // 2
-                center_y = y + h // 2
-                timestamp = current_time
-                
-                # ANTI-WOLKEN FILTER
-                passes_filter = True
-                filter_reasons = []
-                
-                # 1. Mindest-Bewegung
-                min_movement = self.min_movement_var.get()
-                if camera_name in self.camera_motion_data and len(self.camera_motion_data[camera_name]) >= 2:
-                    last_motion = list(self.camera_motion_data[camera_name])[-1]
-                    last_x = last_motion.get('x', 0)
-                    last_y = last_motion.get('y', 0)
-                    distance = ((center_x - last_x)**2 + (center_y - last_y)**2)**0.5
-                    
-                    if distance < min_movement:
-                        passes_filter = False
-                        filter_reasons.append("SLOW")
-                    else:
-                        filter_reasons.append("FAST")
-                
-                # 2. Anti-Cloud Area Filter
-                anti_cloud_min = self.anti_cloud_min_area_var.get()
-                anti_cloud_max = self.anti_cloud_max_area_var.get()
-                
-                if area < anti_cloud_min:
-                    passes_filter = False
-                    filter_reasons.append("TINY")
-                elif area > anti_cloud_max:
-                    passes_filter = False 
-                    filter_reasons.append("HUGE")
-                else:
-                    filter_reasons.append("SIZE_OK")
-                
-                # 3. Speed Filter
-                min_speed = self.min_speed_var.get()
-                if camera_name in self.camera_motion_data and len(self.camera_motion_data[camera_name]) >= 3:
-                    motions = list(self.camera_motion_data[camera_name])[-3:]
-                    if len(motions) >= 2:
-                        time_diff = motions[-1]['timestamp'] - motions[-2]['timestamp']
-                        if time_diff > 0:
-                            speed = distance / time_diff
-                            speed_per_frame = speed / 30
-                            
-                            if speed_per_frame < min_speed:
-                                passes_filter = False
-                                filter_reasons.append("CRAWL")
-                            else:
-                                filter_reasons.append("BIRD_SPEED")
-                
-                # Filter result
-                if not filter_reasons:
-                    filter_reasons = ["FIRST"]
-                    
-                filter_reason = " ".join(filter_reasons[:2])
-                
-                # Draw based on filter result
-                if passes_filter:
-                    filtered_motion_count += 1
-                    # Green = passes filter
-                    cv2.rectangle(result_frame, (x, y), (x+w, y+h), (0, 255, 0), 3)
-                    cv2.putText(result_frame, f'F{filtered_motion_count}', 
-                               (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-                    cv2.putText(result_frame, filter_reason, 
-                               (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
-                    
-                    # Store for Last Detection Window
-                    padding = 40
-                    detection_region = frame[max(0, y-padding):min(frame.shape[0], y+h+padding), 
-                                           max(0, x-padding):min(frame.shape[1], x+w+padding)]
-                    if detection_region.size > 0:
-                        self.last_detection_frame = detection_region.copy()
-                        self.last_detection_info = {
-                            'timestamp': timestamp,
-                            'camera': camera_name,
-                            'area': area,
-                            'center': (center_x, center_y),
-                            'bbox': (x, y, w, h),
-                            'reason': filter_reason,
-                            'mode': self.mode_var.get()
-                        }
-                else:
-                    # Red = filtered out
-                    cv2.rectangle(result_frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
-                    cv2.putText(result_frame, f'M{motion_count}', 
-                               (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-                    cv2.putText(result_frame, filter_reason, 
-                               (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 0, 255), 1)
-                
-                # Motion data fuer 3D viewer (nur filtered)
-                if passes_filter:
-                    if camera_name not in self.camera_motion_data:
-                        self.camera_motion_data[camera_name] = deque(maxlen=30)
-                    self.camera_motion_data[camera_name].append({
-                        'x': center_x,
-                        'y': center_y, 
-                        'area': area,
-                        'timestamp': timestamp,
-                        'camera': camera_name
-                    })
-        
-        # Add stream info
+        # Gate → Background subtraction → Threshold → Morphologie → Komponenten
+        detector = self.detectors[camera_name]
+        blobs = detector.detect(frame, threshold, min_area, max_area, scale)
+        
+        # Process blobs mit ANTI-WOLKEN FILTER (alle Blobs auf einmal, Zustand pro Objekt)
+        current_time = timestamp if timestamp is not None else time.monotonic()
+        if detector.gated:
+            # Keine globale Veraenderung - Filter entfaellt
+            return DetectionResult.empty(camera_name, frame, current_time, gated=True)
+        self._note_storm(camera_name, detector.foreground_fraction if detector.storm else 0.0)
+        if detector.storm:
+            # Helligkeitsspruenge (Sonne, Auto-Belichtung) - Blobs waeren Artefakte
+            return DetectionResult.empty(camera_name, frame, current_time, storm=detector.foreground_fraction)
+        
+        # Zuordnungsradius folgt der Aufloesung der Kamera
+        cloud_filter = self.cloud_filters[camera_name]
+        cloud_filter.set_match_radius(match_radius_for(frame.shape))
+        passes, reasons = cloud_filter.evaluate(
+            blobs, current_time,
+            self.min_movement_var.get(),
+            self.anti_cloud_min_area_var.get(),
+            self.anti_cloud_max_area_var.get(),
+            self.min_speed_var.get())
+        passed = np.flatnonzero(passes)
+        result = DetectionResult(camera_name, frame, current_time, blobs, passes, reasons)
+        
+        # Alle Blobs fuer 3D Viewer und Triangulation (gefilterte mit passed=True)
+        self.detections.add(result, self.current_frame_count)
+        
+        if len(passed):
+            # Store for Last Detection Window
+            blob = blobs[passed[-1]]
+            x, y, w, h = int(blob['x']), int(blob['y']), int(blob['w']), int(blob['h'])
+            padding = 40
+            detection_region = frame[max(0, y-padding):min(frame.shape[0], y+h+padding), 
+                                   max(0, x-padding):min(frame.shape[1], x+w+padding)]
+            if detection_region.size > 0:
+                self.last_detection_frame = detection_region.copy()
+                self.last_detection_info = {
+                    'timestamp': current_time,
+                    'camera': camera_name,
+                    'area': float(blob['area']),
+                    'center': (int(blob['cx']), int(blob['cy'])),
+                    'bbox': (x, y, w, h),
+                    'reason': describe_reasons(reasons[passed[-1]]),
+                    'mode': self.mode_var.get()
+                }
+                   
+        return result
+        
+    def _note_storm(self, camera_name, fraction):
+        """Helligkeitssprung einmal pro Episode loggen"""
+        frames = self.storm_frames.get(camera_name, 0)
+        if fraction:
+            if not frames:
+                self.log(f"🌩️ {camera_name}: Helligkeitssprung - {fraction:.0%} Vordergrund, "
+                         f"Hintergrund lernt neu")
+            self.storm_frames[camera_name] = frames + 1
+        elif frames:
+            self.log(f"🌤️ {camera_name}: Beleuchtung stabil - {frames} Frames verworfen")
+            self.storm_frames[camera_name] = 0
+        
+    def _render_frames(self, results, annotate=True):
+        """Overlays nur fuer angezeigte Frames zeichnen (annotate=False bei Ueberlast)"""
         timestamp_str = datetime.now().strftime("%H:%M:%S")
-        cv2.putText(result_frame, f'{camera_name} - {timestamp_str}', 
-                   (10, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(result_frame, f'Motion: {motion_count} | Gefiltert: {filtered_motion_count}', 
-                   (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        
-        # Filter info
         mode = self.mode_var.get()
-        cv2.putText(result_frame, f'{mode}-Modus | Anti-Wolken aktiv', 
-                   (10, 105), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
-                   
-        return result_frame, filtered_motion_count
+        images = {}
+        for camera_name, result in results.items():
+            header_lines = [
+                (f'{camera_name} - {timestamp_str}', (10, 35), 0.8, (255, 255, 255), 2),
+                (f'Motion: {result.motion_count} | Gefiltert: {result.filtered_count}',
+                 (10, 70), 0.8, (0, 255, 0), 2),
+                # Filter info
+                (f'{mode}-Modus | Anti-Wolken aktiv', (10, 105), 0.6, (0, 255, 255), 2),
+            ]
+            images[camera_name] = self.overlay_renderer.render(result, header_lines, annotate=annotate)
+        return images
         
     def _display_frames(self, frames, motion_counts, frame_count, start_time):
         """Display processed frames - OPTIMIERT fuer grosse Vorschau"""
@@ -941,7 +878,7 @@ class BirdMosquitoTracker:
                                     interpolation=cv2.INTER_CUBIC)
             
             # Info overlay
-            time_str = datetime.fromtimestamp(info['timestamp']).strftime("%H:%M:%S")
+            time_str = datetime.fromtimestamp(monotonic_to_wall(info['timestamp'])).strftime("%H:%M:%S")
             cv2.putText(scaled_frame, f"Last Detection - {info['mode']} Mode", 
                        (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 255), 2)
             cv2.putText(scaled_frame, f"Time: {time_str} | Area: {info['area']}px", 
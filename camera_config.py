@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CAMERA CONFIG - Kamera-Konfiguration mit ROI und Ausschluss-Masken
+==================================================================
+Pro Kamera werden eine ROI (Polygon, in dem detektiert wird) und beliebig
+viele Ausschluss-Polygone (Bäume, Dächer, Zeitstempel-Overlay) in
+camera_config.json gespeichert. Koordinaten sind auf 0..1 normiert, damit
+sie unabhängig von Auflösung und Detection-Pyramide gelten.
+
+Die Detection schneidet jeden Frame auf die Bounding Box der ROI zu (vor
+MOG2) und maskiert den Vordergrund vor der Blob-Extraktion. Ergebnisse werden auf
+Vollbild-Koordinaten zurückgerechnet - die Triangulation merkt nichts davon.
+"""
+
+import json
+import os
+
+import cv2
+import numpy as np
+
+CAMERA_CONFIG_FILE = "camera_config.json"
+
+
+class RegionMask:
+    """ROI + Ausschluss-Polygone einer Kamera (normierte Koordinaten)"""
+
+    def __init__(self, roi=None, exclusions=None):
+        self.roi = [tuple(p) for p in (roi or [])]
+        self.exclusions = [[tuple(p) for p in polygon] for polygon in (exclusions or []) if len(polygon) >= 3]
+        if len(self.roi) < 3:
+            self.roi = []
+        self._prepared = {}   # Frame-Shape → (bbox, Maske in bbox-Größe)
+        self._scaled = {}     # (Frame-Shape, Masken-Shape) → skalierte Maske
+
+    @property
+    def active(self):
+        return bool(self.roi or self.exclusions)
+
+    def __eq__(self, other):
+        return (isinstance(other, RegionMask) and
+                self.roi == other.roi and self.exclusions == other.exclusions)
+
+    def __getstate__(self):
+        # Nur Polygone übertragen (Worker-Prozesse) - Masken werden dort neu gebaut
+        return {'roi': self.roi, 'exclusions': self.exclusions}
+
+    def __setstate__(self, state):
+        self.__init__(state['roi'], state['exclusions'])
+
+    def to_dict(self):
+        return {'roi': [list(p) for p in self.roi],
+                'exclusions': [[list(p) for p in polygon] for polygon in self.exclusions]}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('roi'), data.get('exclusions'))
+
+    def _to_pixels(self, polygon, width, height):
+        points = np.array(polygon, dtype=np.float64) * (width, height)
+        return np.round(points).astype(np.int32)
+
+    def prepare(self, shape):
+        """Bounding Box (x0, y0, x1, y1) und Maske (bbox-Größe) für eine Frame-Größe"""
+        key = shape[:2]
+        if key not in self._prepared:
+            height, width = key
+            if self.roi:
+                roi = self._to_pixels(self.roi, width, height)
+                x, y, w, h = cv2.boundingRect(roi)
+                x0, y0 = max(0, x), max(0, y)
+                x1, y1 = min(width, x + w), min(height, y + h)
+            else:
+                roi = None
+                x0, y0, x1, y1 = 0, 0, width, height
+
+            mask = np.zeros((max(1, y1 - y0), max(1, x1 - x0)), np.uint8)
+            if roi is not None:
+                cv2.fillPoly(mask, [roi - (x0, y0)], 255)
+            else:
+                mask[:] = 255
+            for polygon in self.exclusions:
+                cv2.fillPoly(mask, [self._to_pixels(polygon, width, height) - (x0, y0)], 0)
+            self._prepared[key] = ((x0, y0, x1, y1), mask)
+        return self._prepared[key]
+
+    def crop(self, frame):
+        """Frame auf die ROI-Bounding-Box zuschneiden
+
+        Returns:
+            (Ausschnitt, (offset_x, offset_y))
+        """
+        (x0, y0, x1, y1), _ = self.prepare(frame.shape)
+        return frame[y0:y1, x0:x1], (x0, y0)
+
+    def mask_for(self, frame_shape, mask_shape):
+        """Maske passend zu einem (evtl. verkleinerten) Ausschnitt"""
+        key = (frame_shape[:2], mask_shape[:2])
+        if key not in self._scaled:
+            _, mask = self.prepare(frame_shape)
+            if mask.shape != mask_shape[:2]:
+                mask = cv2.resize(mask, (mask_shape[1], mask_shape[0]), interpolation=cv2.INTER_NEAREST)
+            self._scaled[key] = mask
+        return self._scaled[key]
+
+    def draw(self, frame):
+        """ROI (gelb) und Ausschlüsse (grau) ins Overlay zeichnen"""
+        height, width = frame.shape[:2]
+        if self.roi:
+            cv2.polylines(frame, [self._to_pixels(self.roi, width, height)], True, (0, 255, 255), 1)
+        for polygon in self.exclusions:
+            cv2.polylines(frame, [self._to_pixels(polygon, width, height)], True, (128, 128, 128), 1)
+
+
+def load_camera_regions(path=CAMERA_CONFIG_FILE):
+    """Lade RegionMasks aller Kameras aus der Kamera-Konfiguration"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        cameras = json.load(f).get('cameras', {})
+    return {name: RegionMask.from_dict(entry) for name, entry in cameras.items()}
+
+
+def save_camera_regions(regions, path=CAMERA_CONFIG_FILE):
+    """Speichere RegionMasks - andere Einträge der Konfiguration bleiben erhalten"""
+    config = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    cameras = config.setdefault('cameras', {})
+    for name, region in regions.items():
+        cameras.setdefault(name, {}).update(region.to_dict())
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2)
@@ -0,0 +1,473 @@
+// motion_kernel.cpp
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <pybind11/stl.h>
+#include <cmath>
+#include <cstdint>
+#include <cstring>
+#include <vector>
+#include <algorithm>
+#include <stdexcept>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+// BGR rows need byte shuffles to vectorize (SSSE3/AVX2) - build both variants
+// and let the loader pick one, so the extension still runs on any x86-64 CPU.
+#if defined(__GNUC__) && !defined(__clang__) && defined(__x86_64__)
+#define KERNEL_TARGET_CLONES __attribute__((target_clones("avx2", "default")))
+#else
+#define KERNEL_TARGET_CLONES
+#endif
+
+namespace py = pybind11;
+
+/**
+ * Fused motion detection kernel for one camera frame.
+ *
+ * grayscale -> running-average background (update in place) -> threshold
+ * -> 3x3 open/close -> 8-connected component labeling -> blob statistics
+ *
+ * All pixel stages run as row-tiled OpenMP loops inside a single parallel
+ * region; the frame is read exactly once and the intermediate masks are
+ * one byte per pixel. Every mask row carries an "any foreground" flag, so
+ * morphology and run extraction skip empty rows (the common case for sky
+ * footage) without touching their pixels. Labeling works on horizontal runs
+ * instead of pixels, so its cost depends on the amount of foreground.
+ */
+
+struct Run
+{
+    int32_t y;
+    int32_t x0;  // first pixel
+    int32_t x1;  // one past the last pixel
+};
+
+struct BlobStats
+{
+    int32_t x_min, y_min, x_max, y_max;
+    int64_t area;
+    int64_t sum_x, sum_y;
+};
+
+/**
+ * Binary mask with one flag per row. A row whose flag is 0 is all zeros and
+ * its pixels are never read - they may contain stale data.
+ */
+struct RowMask
+{
+    std::vector<uint8_t> pixels;
+    std::vector<uint8_t> any;
+    int width = 0;
+
+    void resize(int height, int new_width)
+    {
+        width = new_width;
+        pixels.resize(static_cast<size_t>(height) * width);
+        any.resize(height);
+    }
+
+    uint8_t* row(int y) { return pixels.data() + static_cast<size_t>(y) * width; }
+};
+
+/**
+ * Buffers of one calling thread, kept between frames: fresh allocations of
+ * this size would page-fault on every frame and cost more than the kernel.
+ */
+struct Workspace
+{
+    RowMask mask_a, mask_b, scratch;
+    std::vector<std::vector<Run>> row_runs;
+    std::vector<Run> runs;
+    std::vector<size_t> row_start;
+    std::vector<int32_t> parent, label;
+
+    void resize(int height, int width)
+    {
+        mask_a.resize(height, width);
+        mask_b.resize(height, width);
+        scratch.resize(height, width);
+        row_runs.resize(height);
+        for (std::vector<Run>& row : row_runs)
+            row.clear();
+        row_start.assign(height + 1, 0);
+        runs.clear();
+    }
+};
+
+static int32_t find_root(std::vector<int32_t>& parent, int32_t i)
+{
+    while (parent[i] != i)
+    {
+        parent[i] = parent[parent[i]];  // Path halving
+        i = parent[i];
+    }
+    return i;
+}
+
+static void unite(std::vector<int32_t>& parent, int32_t a, int32_t b)
+{
+    a = find_root(parent, a);
+    b = find_root(parent, b);
+    if (a == b)
+        return;
+    // Keep the smaller index as root -> labels follow raster order
+    if (a < b)
+        parent[b] = a;
+    else
+        parent[a] = b;
+}
+
+// Row helpers index with size_t: with int indices and -fwrapv (Python's default
+// CFLAGS) GCC can't prove 3 * x doesn't wrap and leaves the loops scalar.
+
+static bool row_any(const uint8_t* __restrict row, size_t width)
+{
+    uint8_t acc = 0;
+    for (size_t x = 0; x < width; ++x)
+        acc |= row[x];
+    return acc != 0;
+}
+
+/**
+ * Same fixed-point weights as cv2.COLOR_BGR2GRAY.
+ */
+KERNEL_TARGET_CLONES
+static void bgr_to_gray_row(const uint8_t* __restrict in, uint8_t* __restrict out, size_t width)
+{
+    for (size_t x = 0; x < width; ++x)
+        out[x] = static_cast<uint8_t>(
+            (in[3 * x] * 1868 + in[3 * x + 1] * 9617 + in[3 * x + 2] * 4899 + 8192) >> 14);
+}
+
+/**
+ * Difference to the background, running-average update and threshold for one row.
+ * Returns the number of foreground pixels in the row.
+ */
+static size_t update_row(const uint8_t* __restrict gray, float* __restrict model,
+                       const uint8_t* __restrict region, uint8_t* __restrict out,
+                       size_t width, float rate, float limit)
+{
+    for (size_t x = 0; x < width; ++x)
+    {
+        const float diff = static_cast<float>(gray[x]) - model[x];
+        model[x] += rate * diff;
+        out[x] = std::fabs(diff) > limit ? 255 : 0;
+    }
+    if (region)
+    {
+        for (size_t x = 0; x < width; ++x)
+            out[x] &= region[x];
+    }
+    size_t count = 0;
+    for (size_t x = 0; x < width; ++x)
+        count += out[x] >> 7;
+    return count;
+}
+
+/**
+ * out[x] = min/max(out[x], in[x]) - the building block of both morphology passes.
+ */
+template <bool IsMax>
+static void combine_row(uint8_t* __restrict out, const uint8_t* __restrict in, size_t count)
+{
+    for (size_t x = 0; x < count; ++x)
+        out[x] = IsMax ? std::max(out[x], in[x]) : std::min(out[x], in[x]);
+}
+
+/**
+ * Separable rectangular erosion (IsMax = false) or dilation (IsMax = true)
+ * with the given radius. Pixels outside the image are ignored, which matches
+ * the default border handling of cv2.erode / cv2.dilate.
+ *
+ * Must be called from inside an OpenMP parallel region: both passes are
+ * work-shared loops with an implicit barrier in between.
+ */
+template <bool IsMax>
+static void morph_pass(RowMask& src, RowMask& tmp, RowMask& dst,
+                       int height, int width, int radius, int tile_rows)
+{
+    const int tiles = (height + tile_rows - 1) / tile_rows;
+
+    // Horizontal pass: src -> tmp. Shifting the source row by k and combining only
+    // the columns where x + k lies inside the image handles the borders for free.
+    #pragma omp for schedule(static)
+    for (int tile = 0; tile < tiles; ++tile)
+    {
+        const int y_end = std::min(height, (tile + 1) * tile_rows);
+        for (int y = tile * tile_rows; y < y_end; ++y)
+        {
+            if (!src.any[y])
+            {
+                tmp.any[y] = 0;
+                continue;
+            }
+            const uint8_t* in = src.row(y);
+            uint8_t* out = tmp.row(y);
+            std::memcpy(out, in, width);
+            for (int k = -radius; k <= radius; ++k)
+            {
+                if (k == 0 || std::abs(k) >= width)
+                    continue;
+                const int x0 = std::max(0, -k);
+                combine_row<IsMax>(out + x0, in + x0 + k, width - std::abs(k));
+            }
+            tmp.any[y] = IsMax ? 1 : row_any(out, width);
+        }
+    }
+
+    // Vertical pass: tmp -> dst
+    #pragma omp for schedule(static)
+    for (int tile = 0; tile < tiles; ++tile)
+    {
+        const int y_end = std::min(height, (tile + 1) * tile_rows);
+        for (int y = tile * tile_rows; y < y_end; ++y)
+        {
+            const int y0 = std::max(0, y - radius);
+            const int y1 = std::min(height - 1, y + radius);
+            uint8_t* out = dst.row(y);
+            bool filled = false;
+            bool empty = false;
+            for (int k = y0; k <= y1 && !empty; ++k)
+            {
+                if (!tmp.any[k])
+                {
+                    // Erosion: one empty row in the window empties the output row,
+                    // dilation: empty rows contribute nothing
+                    empty = !IsMax;
+                    continue;
+                }
+                if (!filled)
+                    std::memcpy(out, tmp.row(k), width);
+                else
+                    combine_row<IsMax>(out, tmp.row(k), width);
+                filled = true;
+            }
+            dst.any[y] = (filled && !empty) ? (IsMax ? 1 : row_any(out, width)) : 0;
+        }
+    }
+}
+
+/**
+ * Run the fused detection pipeline on one frame.
+ *
+ * frame:         uint8 (H, W) grayscale or (H, W, 3) BGR
+ * background:    float32 (H, W), C-contiguous - updated in place
+ * threshold:     brightness difference that counts as motion
+ * learning_rate: running-average weight of the new frame (1.0 = frame difference)
+ * mask:          optional uint8 (H, W) - zero pixels never produce motion
+ *
+ * Returns (stats, centroids, foreground): stats and centroids like
+ * cv2.connectedComponentsWithStats without the background label - stats is
+ * int32 (N, 5) with x, y, w, h, area, centroids is float64 (N, 2), ordered by
+ * the first pixel in raster order. foreground is the number of thresholded
+ * pixels BEFORE the morphology (the contour-storm measure of the OpenCV path).
+ */
+py::tuple detect(
+    py::array_t<uint8_t, py::array::c_style | py::array::forcecast> frame,
+    py::array background,
+    double threshold,
+    double learning_rate,
+    py::object mask,
+    int tile_rows)
+{
+    if (frame.ndim() != 2 && !(frame.ndim() == 3 && frame.shape(2) == 3))
+        throw std::runtime_error("frame must be (H, W) grayscale or (H, W, 3) BGR");
+
+    const int height = static_cast<int>(frame.shape(0));
+    const int width = static_cast<int>(frame.shape(1));
+    const int channels = frame.ndim() == 3 ? 3 : 1;
+
+    // The background is updated in place - a converted copy would lose the update
+    if (!py::isinstance<py::array_t<float>>(background) ||
+        !(background.flags() & py::array::c_style) || !background.writeable() ||
+        background.ndim() != 2 || background.shape(0) != height || background.shape(1) != width)
+        throw std::runtime_error("background must be a writeable C-contiguous float32 array of shape (H, W)");
+
+    py::array_t<uint8_t, py::array::c_style | py::array::forcecast> mask_array;
+    const uint8_t* mask_ptr = nullptr;
+    if (!mask.is_none())
+    {
+        mask_array = mask.cast<py::array_t<uint8_t, py::array::c_style | py::array::forcecast>>();
+        if (mask_array.ndim() != 2 || mask_array.shape(0) != height || mask_array.shape(1) != width)
+            throw std::runtime_error("mask must have shape (H, W)");
+        mask_ptr = mask_array.data();
+    }
+
+    tile_rows = std::max(1, tile_rows);
+    const uint8_t* src = frame.data();
+    float* bg = static_cast<float*>(background.mutable_data());
+    const float rate = static_cast<float>(learning_rate);
+    const float limit = static_cast<float>(threshold);
+
+    std::vector<BlobStats> blobs;
+    int64_t foreground = 0;
+
+    {
+        py::gil_scoped_release release;
+
+        // One workspace per calling thread - cameras may run detect() concurrently
+        static thread_local Workspace workspace;
+        workspace.resize(height, width);
+        RowMask& mask_a = workspace.mask_a;
+        RowMask& mask_b = workspace.mask_b;
+        RowMask& scratch = workspace.scratch;
+        std::vector<std::vector<Run>>& row_runs = workspace.row_runs;
+        const int tiles = (height + tile_rows - 1) / tile_rows;
+
+        #pragma omp parallel
+        {
+            // 1. Grayscale + background difference/update + threshold (+ region mask)
+            #pragma omp for schedule(static) reduction(+:foreground)
+            for (int tile = 0; tile < tiles; ++tile)
+            {
+                const int y_end = std::min(height, (tile + 1) * tile_rows);
+                for (int y = tile * tile_rows; y < y_end; ++y)
+                {
+                    const size_t row = static_cast<size_t>(y) * width;
+                    const uint8_t* gray = src + row;
+                    if (channels == 3)
+                    {
+                        // The scratch buffer is free until the morphology stage
+                        bgr_to_gray_row(src + row * 3, scratch.row(y), width);
+                        gray = scratch.row(y);
+                    }
+                    const size_t count = update_row(gray, bg + row, mask_ptr ? mask_ptr + row : nullptr,
+                                                    mask_a.row(y), width, rate, limit);
+                    mask_a.any[y] = count != 0;
+                    foreground += static_cast<int64_t>(count);
+                }
+            }
+
+            // 2. Open (erode 3x3, dilate 3x3) + close (dilate 3x3, erode 3x3).
+            //    The two middle dilations combine into a single 5x5 dilation.
+            morph_pass<false>(mask_a, scratch, mask_b, height, width, 1, tile_rows);
+            morph_pass<true>(mask_b, scratch, mask_a, height, width, 2, tile_rows);
+            morph_pass<false>(mask_a, scratch, mask_b, height, width, 1, tile_rows);
+
+            // 3. Horizontal runs per row
+            #pragma omp for schedule(static)
+            for (int tile = 0; tile < tiles; ++tile)
+            {
+                const int y_end = std::min(height, (tile + 1) * tile_rows);
+                for (int y = tile * tile_rows; y < y_end; ++y)
+                {
+                    if (!mask_b.any[y])
+                        continue;
+                    const uint8_t* in = mask_b.row(y);
+                    std::vector<Run>& runs = row_runs[y];
+                    int x = 0;
+                    while (x < width)
+                    {
+                        while (x < width && !in[x])
+                            ++x;
+                        if (x == width)
+                            break;
+                        const int start = x;
+                        while (x < width && in[x])
+                            ++x;
+                        runs.push_back({y, start, x});
+                    }
+                }
+            }
+        }
+
+        // 4. Union-find over runs: 8-connected = overlapping incl. diagonal neighbours
+        std::vector<Run>& runs = workspace.runs;
+        std::vector<size_t>& row_start = workspace.row_start;
+        for (int y = 0; y < height; ++y)
+        {
+            row_start[y] = runs.size();
+            runs.insert(runs.end(), row_runs[y].begin(), row_runs[y].end());
+        }
+        row_start[height] = runs.size();
+
+        std::vector<int32_t>& parent = workspace.parent;
+        parent.resize(runs.size());
+        for (size_t i = 0; i < runs.size(); ++i)
+            parent[i] = static_cast<int32_t>(i);
+
+        for (int y = 1; y < height; ++y)
+        {
+            size_t above = row_start[y - 1];
+            const size_t above_end = row_start[y];
+            for (size_t i = row_start[y]; i < row_start[y + 1]; ++i)
+            {
+                const Run& run = runs[i];
+                // Runs above that end left of this run can't touch later runs either
+                while (above < above_end && runs[above].x1 < run.x0)
+                    ++above;
+                for (size_t j = above; j < above_end && runs[j].x0 <= run.x1; ++j)
+                    unite(parent, static_cast<int32_t>(i), static_cast<int32_t>(j));
+            }
+        }
+
+        // 5. Statistics per component (labels in raster order of the first pixel)
+        std::vector<int32_t>& label = workspace.label;
+        label.assign(runs.size(), -1);
+        for (size_t i = 0; i < runs.size(); ++i)
+        {
+            const int32_t root = find_root(parent, static_cast<int32_t>(i));
+            if (label[root] < 0)
+            {
+                label[root] = static_cast<int32_t>(blobs.size());
+                blobs.push_back({runs[i].x0, runs[i].y, runs[i].x1 - 1, runs[i].y, 0, 0, 0});
+            }
+            const Run& run = runs[i];
+            BlobStats& blob = blobs[label[root]];
+            const int64_t length = run.x1 - run.x0;
+            blob.x_min = std::min(blob.x_min, run.x0);
+            blob.x_max = std::max(blob.x_max, run.x1 - 1);
+            blob.y_max = std::max(blob.y_max, run.y);
+            blob.area += length;
+            blob.sum_x += length * (run.x0 + run.x1 - 1) / 2;
+            blob.sum_y += length * run.y;
+        }
+    }
+
+    const py::ssize_t count = static_cast<py::ssize_t>(blobs.size());
+    py::array_t<int32_t> stats({count, static_cast<py::ssize_t>(5)});
+    py::array_t<double> centroids({count, static_cast<py::ssize_t>(2)});
+    auto s = stats.mutable_unchecked<2>();
+    auto c = centroids.mutable_unchecked<2>();
+    for (py::ssize_t i = 0; i < count; ++i)
+    {
+        const BlobStats& blob = blobs[i];
+        s(i, 0) = blob.x_min;
+        s(i, 1) = blob.y_min;
+        s(i, 2) = blob.x_max - blob.x_min + 1;
+        s(i, 3) = blob.y_max - blob.y_min + 1;
+        s(i, 4) = static_cast<int32_t>(blob.area);
+        c(i, 0) = static_cast<double>(blob.sum_x) / blob.area;
+        c(i, 1) = static_cast<double>(blob.sum_y) / blob.area;
+    }
+    return py::make_tuple(stats, centroids, foreground);
+}
+
+/**
+ * Number of OpenMP threads the kernel will use (1 without OpenMP).
+ */
+int max_threads()
+{
+#ifdef _OPENMP
+    return omp_get_max_threads();
+#else
+    return 1;
+#endif
+}
+
+PYBIND11_MODULE(motion_kernel_cpp, m)
+{
+    m.doc() = "Fused, OpenMP-parallel motion detection kernel (gray -> background -> threshold -> open/close -> components)";
+    m.def("detect", &detect,
+          "Detect motion blobs in one frame and update the background in place",
+          py::arg("frame"),
+          py::arg("background"),
+          py::arg("threshold"),
+          py::arg("learning_rate"),
+          py::arg("mask") = py::none(),
+          py::arg("tile_rows") = 64);
+    m.def("max_threads", &max_threads, "Number of OpenMP threads used by detect()");
+}
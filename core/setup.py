@@ -33,6 +33,15 @@ ext_modules = [
         ],
         language='c++'
     ),
+    # Fused motion detection kernel (optional backend of motion_detection.MotionDetector)
+    Extension(
+        'motion_kernel_cpp',
+        ['motion_kernel.cpp'],
+        include_dirs=[
+            pybind11.get_include(),
+        ],
+        language='c++'
+    ),
 ]
 
 setup(
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DETECTION STORE - Spaltenorientierter Detection-Speicher pro Kamera
+===================================================================
+Statt jede Detection als dict ({'x', 'y', 'area', 'timestamp', 'camera'})
+bzw. Tupel in Python-Listen abzulegen, schreibt die Pipeline alle Blobs
+eines Frames in einem Schritt in einen NumPy Ringpuffer fester Kapazität
+pro Kamera (DETECTION_DTYPE - ein Record pro Blob).
+
+Abfragen liefern Slices statt dicts - Dashboard, 3D Viewer und
+Triangulation rechnen direkt auf den Spalten:
+
+    recent = store.window('webcam_0', since=now - 1.0)      # nur gefilterte
+    xs, ys = recent['cx'], recent['cy']
+    for camera, records in store.recent(now - 1.0).items(): ...
+
+Capture-Zeitstempel sind pro Kamera monoton - Zeitfenster werden per
+Binärsuche geschnitten, ohne den Ring zu kopieren.
+
+Kamera-Synchronisation: match_synchronized sucht für jedes Kamerapaar alle
+Detection-Paare mit |Δt| < tolerance per Binärsuche über die sortierten
+Zeitstempel - O((n + m) log m + Treffer) statt n × m Vergleichen:
+
+    recent = store.recent(now - 1.0, cameras=positions)
+    matches = match_synchronized(recent, tolerance=0.05)   # SYNC_DTYPE
+    pair = best_synchronized(recent, matches)              # {Kamera: Record}
+"""
+
+import threading
+
+import numpy as np
+
+DETECTION_DTYPE = np.dtype([
+    ('frame', np.int64),         # Capture-Sequenz des Frames (-1 = unbekannt)
+    ('timestamp', np.float64),   # Capture-Zeit (time.monotonic() Sekunden)
+    ('cx', np.int32), ('cy', np.int32),   # Schwerpunkt
+    ('x', np.int32), ('y', np.int32), ('w', np.int32), ('h', np.int32),  # Bounding Box
+    ('area', np.float32),
+    ('passed', np.bool_),        # Anti-Wolken Filter bestanden
+    ('reasons', np.uint8, (3,)),  # Regel-Codes (anti_cloud_filter)
+    ('track', np.int64),         # Track-ID (multi_object_tracker, -1 = nicht getrackt)
+])
+
+_BLOB_FIELDS = ('cx', 'cy', 'x', 'y', 'w', 'h', 'area')
+
+# Zeitlich synchrones Detection-Paar zweier Kameras (Indizes in die recent()-Records)
+SYNC_DTYPE = np.dtype([
+    ('camera1', 'U32'), ('camera2', 'U32'),
+    ('index1', np.int64), ('index2', np.int64),
+    ('time_diff', np.float64),   # |Δt| in Sekunden
+])
+
+
+def match_synchronized(recent, tolerance, one_to_one=False):
+    """Alle Detection-Paare verschiedener Kameras mit |Δt| < tolerance
+
+    recent: {Kamera: Records} (z.B. DetectionStore.recent)
+    one_to_one: pro Kamerapaar jede Detection höchstens einmal verwenden -
+    die Paare mit kleinstem |Δt| zuerst
+
+    Returns:
+        SYNC_DTYPE-Records, sortiert nach Kamerapaar, index1, index2
+    """
+    cameras = [camera for camera, records in recent.items() if len(records)]
+    # Pro Kamera einmal nach Zeit sortieren (Capture-Zeit ist schon monoton - stabil, fast gratis)
+    orders = {camera: np.argsort(recent[camera]['timestamp'], kind='stable') for camera in cameras}
+    times = {camera: recent[camera]['timestamp'][orders[camera]] for camera in cameras}
+    parts = []
+    for a, first in enumerate(cameras):
+        times1 = recent[first]['timestamp']
+        for second in cameras[a + 1:]:
+            times2 = times[second]
+            # Kandidaten-Bereich [lo, hi) in den sortierten Zeiten der zweiten Kamera -
+            # inklusive Grenzen, |Δt| < tolerance wird danach exakt geprüft (Rundung)
+            lo = np.searchsorted(times2, times1 - tolerance, 'left')
+            hi = np.searchsorted(times2, times1 + tolerance, 'right')
+            counts = np.maximum(hi - lo, 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+            index1 = np.repeat(np.arange(len(times1)), counts)
+            sorted2 = np.repeat(lo, counts) + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            index2 = orders[second][sorted2]
+            diff = np.abs(times1[index1] - times2[sorted2])
+            keep = diff < tolerance
+            index1, index2, diff = index1[keep], index2[keep], diff[keep]
+            if one_to_one and len(diff):
+                # Gierig nach |Δt|: jede Detection beider Kameras nur einmal
+                chosen = []
+                used1, used2 = set(), set()
+                for k in np.argsort(diff, kind='stable'):
+                    if index1[k] not in used1 and index2[k] not in used2:
+                        used1.add(index1[k])
+                        used2.add(index2[k])
+                        chosen.append(k)
+                chosen = np.sort(np.asarray(chosen, np.int64))
+                index1, index2, diff = index1[chosen], index2[chosen], diff[chosen]
+            order = np.lexsort((index2, index1))
+            matches = np.zeros(len(order), SYNC_DTYPE)
+            matches['camera1'], matches['camera2'] = first, second
+            matches['index1'], matches['index2'] = index1[order], index2[order]
+            matches['time_diff'] = diff[order]
+            parts.append(matches)
+    return np.concatenate(parts) if parts else np.zeros(0, SYNC_DTYPE)
+
+
+def best_synchronized(recent, matches):
+    """Das Paar mit kleinstem |Δt| als {Kamera: Record} ({} ohne Treffer)"""
+    if not len(matches):
+        return {}
+    best = matches[int(np.argmin(matches['time_diff']))]
+    return {str(best['camera1']): recent[str(best['camera1'])][best['index1']],
+            str(best['camera2']): recent[str(best['camera2'])][best['index2']]}
+
+
+class DetectionRing:
+    """Ringpuffer fester Kapazität einer Kamera - älteste Records werden überschrieben"""
+
+    def __init__(self, capacity=1024):
+        self.records = np.zeros(capacity, DETECTION_DTYPE)
+        self.total = 0  # Jemals geschriebene Records
+
+    @property
+    def capacity(self):
+        return len(self.records)
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, records):
+        capacity = self.capacity
+        if len(records) > capacity:
+            # Nur die neuesten passen - die übrigen gelten als geschrieben und überschrieben
+            self.total += len(records) - capacity
+            records = records[-capacity:]
+        count = len(records)
+        start = self.total % capacity
+        first = min(count, capacity - start)
+        self.records[start:start + first] = records[:first]
+        self.records[:count - first] = records[first:]
+        self.total += count
+
+    def segments(self):
+        """(ältere, neuere) Views in Zeitreihenfolge - ohne Kopie"""
+        if self.total <= self.capacity:
+            return (self.records[:self.total],)
+        start = self.total % self.capacity
+        return self.records[start:], self.records[:start]
+
+    def window(self, since=None, until=None):
+        """Records mit since <= timestamp < until (Kopie, chronologisch)"""
+        parts = []
+        for segment in self.segments():
+            times = segment['timestamp']
+            lo = 0 if since is None else np.searchsorted(times, since, 'left')
+            hi = len(segment) if until is None else np.searchsorted(times, until, 'left')
+            if hi > lo:
+                parts.append(segment[lo:hi])
+        if not parts:
+            return np.zeros(0, DETECTION_DTYPE)
+        return parts[0].copy() if len(parts) == 1 else np.concatenate(parts)
+
+
+class DetectionStore:
+    """Detections aller Kameras - ein DetectionRing pro Kamera, thread-sicher
+
+    Geschrieben wird aus der Tracking-Schleife, gelesen aus GUI/Viewer-Threads;
+    Abfragen liefern immer Kopien.
+
+    capacity: Records pro Kamera (gefilterte UND verworfene Blobs)
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._rings = {}
+        self._lock = threading.Lock()
+
+    def add(self, result, frame_id=-1):
+        """Alle Blobs eines DetectionResult ablegen → geschriebene Records"""
+        blobs = result.blobs
+        records = np.zeros(len(blobs), DETECTION_DTYPE)
+        if len(blobs):
+            for field in _BLOB_FIELDS:
+                records[field] = blobs[field]
+            records['frame'] = frame_id
+            records['timestamp'] = result.timestamp
+            records['passed'] = result.passes
+            records['reasons'] = result.reasons
+            records['track'] = -1 if result.track_ids is None else result.track_ids
+        with self._lock:
+            ring = self._rings.get(result.camera)
+            if ring is None:
+                ring = self._rings[result.camera] = DetectionRing(self.capacity)
+            if len(records):
+                ring.append(records)
+        return records
+
+    def clear(self):
+        with self._lock:
+            self._rings = {}
+
+    def cameras(self):
+        with self._lock:
+            return [name for name, ring in self._rings.items() if len(ring)]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(ring) for ring in self._rings.values())
+
+    @property
+    def total(self):
+        """Alle jemals abgelegten Detections (auch bereits überschriebene)"""
+        with self._lock:
+            return sum(ring.total for ring in self._rings.values())
+
+    def window(self, camera, since=None, until=None, passed=True):
+        """Records einer Kamera im Zeitfenster [since, until)
+
+        passed: True = nur gefilterte, False = nur verworfene, None = alle
+        """
+        with self._lock:
+            ring = self._rings.get(camera)
+            records = ring.window(since, until) if ring is not None else np.zeros(0, DETECTION_DTYPE)
+        if passed is not None:
+            records = records[records['passed'] == passed]
+        return records
+
+    def recent(self, since, passed=True, cameras=None, limit=None):
+        """{Kamera: Records seit since} - nur Kameras mit Records
+
+        cameras: nur diese Kameras (z.B. die mit bekannter Position)
+        limit: höchstens die neuesten limit Records pro Kamera
+        """
+        names = self.cameras() if cameras is None else cameras
+        result = {}
+        for camera in names:
+            records = self.window(camera, since, passed=passed)
+            if limit is not None:
+                records = records[-limit:]
+            if len(records):
+                result[camera] = records
+        return result
+
+    def latest(self, count, camera=None, passed=None):
+        """Die neuesten count Records einer Kamera bzw. aller Kameras (nach Capture-Zeit)"""
+        names = self.cameras() if camera is None else [camera]
+        parts = [self.window(name, passed=passed)[-count:] for name in names]
+        if not parts:
+            return np.zeros(0, DETECTION_DTYPE)
+        records = np.concatenate(parts)
+        if len(parts) > 1:
+            records = records[np.argsort(records['timestamp'], kind='stable')]
+        return records[-count:]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FRAME CAPTURE - Ein Reader-Thread pro Kamera
+============================================
+Jede cv2.VideoCapture bekommt ihren eigenen Thread, der in einen kleinen,
+vorallokierten Ringpuffer schreibt. Der Puffer behaelt nur die neuesten
+Frames - die Detection-Schleife holt sich pro Kamera nicht-blockierend den
+neuesten Frame. Ueberschriebene (nie verarbeitete) Frames werden gezaehlt.
+
+Jeder Frame wird beim Grab mit einem monotonen Zeitstempel versehen
+(time.monotonic_ns bzw. CAP_PROP_POS_MSEC des Backends, per Offset auf die
+monotone Uhr abgebildet). Dieser Zeitstempel läuft mit dem Frame durch
+Detection, Filter und Triangulation - unabhängig von der CPU-Last.
+"""
+
+import threading
+import time
+
+import cv2
+
+
+def monotonic_to_wall(timestamp):
+    """Monotoner Zeitstempel (Sekunden) → Unix-Zeit für Anzeige/Logs"""
+    return time.time() - time.monotonic() + timestamp
+
+
+class CaptureClock:
+    """Capture-Zeitstempel einer Kamera auf der monotonen Uhr
+
+    Liefert das Backend eine Frame-Position (CAP_PROP_POS_MSEC), wird sie
+    einmalig per Offset auf time.monotonic_ns() abgebildet - das ist
+    genauer als der Zeitpunkt, an dem read() zurückkehrt. Sonst (oder wenn
+    die Position springt/stehen bleibt) zählt der Grab-Zeitpunkt.
+    """
+
+    MAX_DRIFT_NS = 500_000_000  # Mehr Abweichung → Offset neu verankern
+
+    def __init__(self):
+        self._offset_ns = None
+        self._last_pos_ns = -1
+
+    def stamp(self, cap):
+        """Zeitstempel (ns, monoton) für den gerade gegrabbten Frame"""
+        # Replay-Quellen liefern den Original-Zeitstempel der Aufnahme
+        recorded_ns = getattr(cap, 'capture_time_ns', None)
+        if recorded_ns is not None:
+            return recorded_ns
+
+        now_ns = time.monotonic_ns()
+        try:
+            pos_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+        except Exception:
+            pos_ms = 0
+        if not pos_ms or pos_ms <= 0:
+            return now_ns
+
+        pos_ns = int(pos_ms * 1_000_000)
+        if pos_ns <= self._last_pos_ns:
+            self._offset_ns = None  # Position steht/springt zurück → neu verankern
+        self._last_pos_ns = pos_ns
+
+        if self._offset_ns is not None:
+            timestamp_ns = self._offset_ns + pos_ns
+            if abs(timestamp_ns - now_ns) <= self.MAX_DRIFT_NS and timestamp_ns <= now_ns:
+                return timestamp_ns
+        self._offset_ns = now_ns - pos_ns
+        return now_ns
+
+
+class FrameRingBuffer:
+    """Vorallokierter Ringpuffer - behaelt nur die neuesten Frames
+
+    Der Writer (Capture-Thread) schreibt nie in den Slot, den der Consumer
+    gerade verarbeitet, und nie in den neuesten fertigen Slot. Mit mindestens
+    3 Slots ist daher immer ein freier Slot vorhanden - kein Blockieren.
+
+    lossless=True (Replay mit Maximalgeschwindigkeit): der Writer wartet,
+    bis der neueste Frame abgeholt wurde - es wird nichts verworfen.
+    """
+
+    def __init__(self, capacity=3, lossless=False):
+        self.capacity = max(3, int(capacity))
+        self.lossless = lossless
+        self._slots = [None] * self.capacity
+        self._seq = [0] * self.capacity         # 0 = leer / wird beschrieben
+        self._timestamps = [0] * self.capacity  # Capture-Zeit (monotonic ns)
+        self._latest = -1                       # Index des neuesten Frames
+        self._held = -1                         # Index beim Consumer
+        self._latest_consumed = True
+        self._write_idx = 0
+        self._next_seq = 1
+        self._cond = threading.Condition()
+
+        # Statistik
+        self.frames_written = 0
+        self.frames_dropped = 0                 # nie verarbeitet, ueberschrieben
+
+    def acquire_write_slot(self, timeout=None):
+        """Reserviere einen Slot für den nächsten Frame (Writer-Seite)
+
+        Returns:
+            (idx, slot) oder None wenn im lossless-Modus der Timeout ablief
+        """
+        with self._cond:
+            if self.lossless and not self._cond.wait_for(lambda: self._latest_consumed, timeout):
+                return None
+            for _ in range(self.capacity):
+                idx = self._write_idx
+                self._write_idx = (self._write_idx + 1) % self.capacity
+                if idx != self._held and idx != self._latest:
+                    self._seq[idx] = 0
+                    return idx, self._slots[idx]
+        # Kann mit capacity >= 3 nicht passieren
+        raise RuntimeError("FrameRingBuffer: kein freier Slot")
+
+    def commit(self, idx, frame, timestamp_ns):
+        """Markiere Slot als neuesten Frame (Writer-Seite)
+
+        Liefert cv2 ein neues Array (erster Frame / Aufloesungswechsel),
+        wird es als Slot-Speicher übernommen.
+        """
+        with self._cond:
+            self._slots[idx] = frame
+            self._timestamps[idx] = timestamp_ns
+            if self._latest >= 0 and not self._latest_consumed:
+                self.frames_dropped += 1
+            self._seq[idx] = self._next_seq
+            self._next_seq += 1
+            self._latest = idx
+            self._latest_consumed = False
+            self.frames_written += 1
+
+    @property
+    def pending(self):
+        """Liegt ein fertiger Frame bereit, den der Consumer noch nicht abgeholt hat?"""
+        with self._cond:
+            return self._latest >= 0 and not self._latest_consumed
+
+    def get_latest(self, last_seq=0):
+        """Neuester Frame (Consumer-Seite) - blockiert nie
+
+        Returns:
+            (seq, frame, timestamp_ns) oder None wenn seit last_seq nichts
+            Neues kam.
+            Der Frame bleibt bis zum nächsten Aufruf für den Consumer reserviert.
+        """
+        with self._cond:
+            if self._latest < 0 or self._seq[self._latest] <= last_seq:
+                return None
+            self._held = self._latest
+            self._latest_consumed = True
+            self._cond.notify_all()
+            idx = self._held
+            return self._seq[idx], self._slots[idx], self._timestamps[idx]
+
+    def release(self):
+        """Gib den reservierten Slot wieder frei"""
+        with self._cond:
+            self._held = -1
+
+
+class CameraCaptureThread:
+    """Reader-Thread für eine einzelne cv2.VideoCapture"""
+
+    STALL_LOG_THRESHOLD = 30  # Fehlversuche bevor geloggt wird
+
+    def __init__(self, name, cap, buffer_capacity=3, log=None, lossless=False):
+        self.name = name
+        self.cap = cap
+        self.buffer = FrameRingBuffer(buffer_capacity, lossless=lossless)
+        self.clock = CaptureClock()
+        self.on_frame = None  # Optional: callback(name, frame, timestamp_ns), z.B. Recorder
+        self.log = log or print
+        self.is_running = False
+        self.thread = None
+
+        # Statistik
+        self.read_failures = 0
+        self.consecutive_failures = 0
+
+    @property
+    def frames_captured(self):
+        return self.buffer.frames_written
+
+    @property
+    def frames_dropped(self):
+        return self.buffer.frames_dropped
+
+    @property
+    def drained(self):
+        """Quelle erschöpft (Thread beendet) und der letzte Frame abgeholt"""
+        thread = self.thread
+        return (thread is None or not thread.is_alive()) and not self.buffer.pending
+
+    def start(self):
+        """Starte den Reader-Thread"""
+        self.is_running = True
+        self.thread = threading.Thread(target=self._capture_loop,
+                                       name=f"capture-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stoppe den Reader-Thread (vor cap.release() aufrufen!)"""
+        self.is_running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=timeout)
+        self.thread = None
+
+    def get_latest(self, last_seq=0):
+        """Nicht-blockierend: neuester Frame seit last_seq oder None"""
+        return self.buffer.get_latest(last_seq)
+
+    def _capture_loop(self):
+        """Liest so schnell wie die Kamera liefert - nur das Neueste zählt"""
+        while self.is_running:
+            try:
+                acquired = self.buffer.acquire_write_slot(timeout=0.1)
+                if acquired is None:
+                    continue  # lossless: Consumer hat den letzten Frame noch nicht abgeholt
+                idx, slot = acquired
+                # Grab zuerst → Zeitstempel so nah wie möglich am Sensor
+                ret = self.cap.grab()
+                frame = None
+                if ret:
+                    timestamp_ns = self.clock.stamp(self.cap)
+                    # In den vorallokierten Slot dekodieren (kein neues Array pro Frame)
+                    if slot is not None:
+                        ret, frame = self.cap.retrieve(slot)
+                    else:
+                        ret, frame = self.cap.retrieve()
+
+                if ret and frame is not None:
+                    self.buffer.commit(idx, frame, timestamp_ns)
+                    if self.on_frame is not None:
+                        self.on_frame(self.name, frame, timestamp_ns)
+                    self.consecutive_failures = 0
+                elif getattr(self.cap, 'ended', False):
+                    break  # Replay-Quelle erschöpft - kein weiterer Frame
+                else:
+                    self.read_failures += 1
+                    self.consecutive_failures += 1
+                    if self.consecutive_failures == self.STALL_LOG_THRESHOLD:
+                        self.log(f"⚠️ {self.name}: Kein Frame empfangen")
+                    time.sleep(0.01)
+
+            except Exception as e:
+                self.read_failures += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures == self.STALL_LOG_THRESHOLD:
+                    self.log(f"❌ {self.name} Capture-Fehler: {str(e)}")
+                time.sleep(0.01)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FRAME PACER - Adaptive Bildraten-Steuerung für Tracking-Schleifen
+=================================================================
+Ersetzt feste time.sleep()-Pausen: die Schleife misst die Arbeitszeit
+pro Iteration und schläft nur den Rest bis zur Ziel-FPS des Profils.
+
+Kommt die Schleife nicht hinterher, wird stufenweise Arbeit gespart:
+    Stufe 0  volle Verarbeitung
+    Stufe 1  keine Overlays (Boxen/Texte) zeichnen
+    Stufe 2  zusätzlich Detection mit reduzierter Auflösung
+Mit Hysterese - erst wenn wieder genug Luft ist, geht es zurück.
+
+    governor = FrameRateGovernor(profile['fps'])
+    while running:
+        governor.begin()
+        ... verarbeiten (governor.draw_overlays / governor.detection_scale)
+        governor.end()
+"""
+
+import time
+
+LEVEL_FULL = 0
+LEVEL_SKIP_OVERLAYS = 1
+LEVEL_REDUCED_RESOLUTION = 2
+
+LEVEL_NAMES = {
+    LEVEL_FULL: "voll",
+    LEVEL_SKIP_OVERLAYS: "ohne Overlays",
+    LEVEL_REDUCED_RESOLUTION: "reduzierte Auflösung",
+}
+
+
+class FrameRateGovernor:
+    """Misst die Arbeitszeit pro Iteration, schläft den Rest und drosselt bei Überlast"""
+
+    def __init__(self, target_fps, reduced_scale=0.5, smoothing=0.1,
+                 behind_ratio=1.0, recover_ratio=0.6, hold_iterations=30, log=None):
+        self.reduced_scale = reduced_scale
+        self.smoothing = smoothing                # EMA-Gewicht der neuesten Messung
+        self.behind_ratio = behind_ratio          # Arbeitszeit > Budget * ratio → Stufe hoch
+        self.recover_ratio = recover_ratio        # Arbeitszeit < Budget * ratio → Stufe runter
+        self.hold_iterations = hold_iterations    # Mindestabstand zwischen Stufenwechseln
+        self.log = log
+
+        self.level = LEVEL_FULL
+        self.avg_work_time = 0.0
+        self.actual_fps = 0.0
+        self._iteration_start = None
+        self._last_end = None
+        self._since_change = 0
+        self.set_target_fps(target_fps)
+
+    def set_target_fps(self, target_fps):
+        """Ziel-FPS ändern (0/None = unbegrenzt, kein Schlafen, keine Drosselung)"""
+        self.target_fps = target_fps or 0
+        self.frame_budget = 1.0 / self.target_fps if self.target_fps > 0 else 0.0
+
+    @property
+    def draw_overlays(self):
+        return self.level < LEVEL_SKIP_OVERLAYS
+
+    @property
+    def detection_scale(self):
+        return self.reduced_scale if self.level >= LEVEL_REDUCED_RESOLUTION else 1.0
+
+    def begin(self):
+        """Beginn einer Iteration markieren"""
+        self._iteration_start = time.perf_counter()
+
+    def end(self):
+        """Ende einer Iteration: Stufe anpassen und Restzeit schlafen
+
+        Returns:
+            Geschlafene Zeit in Sekunden
+        """
+        now = time.perf_counter()
+        if self._iteration_start is None:
+            self._iteration_start = now
+        work_time = now - self._iteration_start
+
+        if self.avg_work_time == 0.0:
+            self.avg_work_time = work_time
+        else:
+            self.avg_work_time += self.smoothing * (work_time - self.avg_work_time)
+
+        if self.frame_budget > 0:
+            self._adapt_level()
+
+        sleep_time = max(0.0, self.frame_budget - work_time)
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+        end = time.perf_counter()
+        if self._last_end is not None and end > self._last_end:
+            fps = 1.0 / (end - self._last_end)
+            self.actual_fps = fps if self.actual_fps == 0 else self.actual_fps + self.smoothing * (fps - self.actual_fps)
+        self._last_end = end
+        self._iteration_start = None
+        return sleep_time
+
+    def _adapt_level(self):
+        self._since_change += 1
+        if self._since_change < self.hold_iterations:
+            return
+
+        if self.avg_work_time > self.frame_budget * self.behind_ratio and self.level < LEVEL_REDUCED_RESOLUTION:
+            self._set_level(self.level + 1)
+        elif (self.avg_work_time < self.frame_budget * self.recover_ratio and self.level > LEVEL_FULL and
+              self._since_change >= 3 * self.hold_iterations):
+            # Zurück erst nach längerer Ruhephase - sonst pendelt die Stufe
+            self._set_level(self.level - 1)
+
+    def _set_level(self, level):
+        self.level = level
+        self._since_change = 0
+        if self.log:
+            self.log(f"⏱️ Frame-Pacing: {LEVEL_NAMES[level]} "
+                     f"({self.avg_work_time * 1000:.0f}ms / {self.frame_budget * 1000:.0f}ms Budget)")
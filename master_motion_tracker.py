@@ -20,19 +20,27 @@ VERSION: Enhanced - Alle Features + bessere UX/Performance
 """
 
 import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import cv2
 import numpy as np
 import threading
 import time
 import queue
-import subprocess
 import os
 from datetime import datetime
 from collections import deque
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
+from frame_capture import monotonic_to_wall
+from frame_pacer import LEVEL_NAMES
+from recorded_session import ReplaySession
+from camera_config import RegionMask, save_camera_regions
+from detection_store import best_synchronized, match_synchronized
+from tracking_engine import (TrackingEngine, TrackingConfig, DETECTION_PROFILES, VIDEO_SOURCES,
+                             REPLAY_SPEEDS, SYNC_TOLERANCE, pixel_to_3d_direction,
+                             line_intersection_3d_with_confidence)
+
 print("🎯 Pixeltovoxelprojector - Master Motion Tracker")
 print("✅ OpenCV verfügbar")
 print("✅ matplotlib verfügbar - stabile 3D-Triangulation")
@@ -281,7 +289,7 @@ class Stable3DTriangulation:
                 return
                 
             # Prüfe ob Motion-Daten vorhanden
-            if not hasattr(self.master_tracker, 'camera_motion_data'):
+            if not hasattr(self.master_tracker, 'detections'):
                 return
                 
             # Synchrone Motion-Filter anwenden
@@ -307,12 +315,11 @@ class Stable3DTriangulation:
     def _filter_synchronized_motions(self):
         """Filtere nur zeitgleiche Bewegungen + Anti-Stationary Filter gegen Wolken/Äste"""
         try:
-            if not hasattr(self.master_tracker, 'camera_motion_data') or \
-               len(self.master_tracker.camera_motion_data) < 2:
+            if not hasattr(self.master_tracker, 'detections'):
                 return {}
                 
-            current_time = time.time()
-            sync_tolerance = 0.3  # 300ms Toleranz
+            current_time = self.master_tracker.pipeline_time()  # Uhr der Capture-Zeitstempel
+            sync_tolerance = SYNC_TOLERANCE
             
             # Anti-Stationary Filter Parameter
             min_movement_distance = getattr(self.master_tracker, 'min_movement_var', None)
@@ -321,73 +328,29 @@ class Stable3DTriangulation:
             min_distance = min_movement_distance.get() if min_movement_distance else 15  # Mindest-Bewegung in Pixeln
             time_window = movement_time_window.get() if movement_time_window else 1.0   # Zeitfenster in Sekunden
             
-            # Sammle gefilterte Motion-Events
+            # Gefilterte Motion-Events (neueste 20 pro Kamera) inkl. Vorlauf für den Bewegungs-Vergleich
+            candidates = self.master_tracker.detections.recent(
+                current_time - 3.0 - 2 * time_window, cameras=list(self.camera_positions), limit=20)
             filtered_motions = {}
-            for camera_name, motion_list in self.master_tracker.camera_motion_data.items():
-                if camera_name not in self.camera_positions or not motion_list:
-                    continue
-                    
-                # Nur Events der letzten 3 Sekunden für bewegungsanalyse
-                recent_motions = []
-                for motion in motion_list:
-                    try:
-                        if current_time - motion['timestamp'] > 3.0:
-                            continue
-                            
-                        # ANTI-STATIONARY FILTER: Prüfe signifikante Bewegung
-                        motion_x = motion.get('x', 0)
-                        motion_y = motion.get('y', 0)
-                        motion_time = motion.get('timestamp', current_time)
-                        
-                        # Suche nach älterer Position im Zeitfenster
-                        has_significant_movement = False
-                        for older_motion in motion_list:
-                            older_time = older_motion.get('timestamp', 0)
-                            if (motion_time - older_time) > time_window and (motion_time - older_time) < time_window * 2:
-                                older_x = older_motion.get('x', 0)
-                                older_y = older_motion.get('y', 0)
-                                
-                                # Berechne Bewegungsdistanz
-                                distance = ((motion_x - older_x)**2 + (motion_y - older_y)**2)**0.5
-                                
-                                if distance >= min_distance:
-                                    has_significant_movement = True
-                                    break
-                        
-                        # Nur Motions mit signifikanter Bewegung akzeptieren
-                        if has_significant_movement or len(motion_list) < 5:  # Bei wenigen Daten weniger streng
-                            recent_motions.append(motion)
-                        
-                    except:
-                        continue
-                        
-                if recent_motions:
+            for camera_name, records in candidates.items():
+                # ANTI-STATIONARY FILTER: ältere Position im Zeitfenster mit signifikanter Bewegung
+                age = records['timestamp'][:, None] - records['timestamp'][None, :]
+                distance = np.hypot(records['cx'][:, None] - records['cx'][None, :],
+                                    records['cy'][:, None] - records['cy'][None, :])
+                moving = ((age > time_window) & (age < time_window * 2) & (distance >= min_distance)).any(axis=1)
+                if len(records) < 5:  # Bei wenigen Daten weniger streng
+                    moving[:] = True
+
+                # Nur Events der letzten 3 Sekunden
+                recent_motions = records[moving & (current_time - records['timestamp'] <= 3.0)]
+                if len(recent_motions):
                     filtered_motions[camera_name] = recent_motions
             
             if len(filtered_motions) < 2:
                 return {}
             
-            # Finde beste zeitliche Übereinstimmung mit gefilterten Daten
-            camera_names = list(filtered_motions.keys())
-            best_match = None
-            best_time_diff = float('inf')
-            
-            for i in range(len(camera_names)):
-                for j in range(i + 1, len(camera_names)):
-                    cam1_name = camera_names[i]
-                    cam2_name = camera_names[j]
-                    
-                    for motion1 in filtered_motions[cam1_name]:
-                        for motion2 in filtered_motions[cam2_name]:
-                            try:
-                                time_diff = abs(motion1['timestamp'] - motion2['timestamp'])
-                                if time_diff < sync_tolerance and time_diff < best_time_diff:
-                                    best_time_diff = time_diff
-                                    best_match = {cam1_name: motion1, cam2_name: motion2}
-                            except:
-                                continue
-            
-            return best_match or {}
+            # Beste zeitliche Übereinstimmung mit gefilterten Daten (Binärsuche über die Zeitstempel)
+            return best_synchronized(filtered_motions, match_synchronized(filtered_motions, sync_tolerance))
             
         except Exception:
             return {}
@@ -408,7 +371,7 @@ class Stable3DTriangulation:
                 camera_color = self.camera_colors.get(camera_name, 'white')
                 
                 # 3D Richtung berechnen
-                direction = self._pixel_to_3d_direction(motion['x'], motion['y'], camera_name)
+                direction = self._pixel_to_3d_direction(motion['cx'], motion['cy'], camera_name)
                 
                 # Strahl für Himmel-Tracking
                 ray_length = 4.0  # Reduziert für bessere Sichtbarkeit
@@ -448,10 +411,10 @@ class Stable3DTriangulation:
                         
                         # 3D Strahlen
                         pos1 = self.camera_positions[cam1_name]
-                        dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'], cam1_name)
+                        dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name)
                         
                         pos2 = self.camera_positions[cam2_name]
-                        dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'], cam2_name)
+                        dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name)
                         
                         # Triangulation
                         intersection, confidence = self._line_intersection_3d_with_confidence(pos1, dir1, pos2, dir2)
@@ -552,85 +515,34 @@ class Stable3DTriangulation:
             self.timer.stop()
 
 
-# Detection Profiles für verschiedene Ziele - Full HD optimiert
-DETECTION_PROFILES = {
-    "🦟 Mosquito": {
-        "threshold": 15,
-        "min_area": 25,  # Skaliert für Full HD
-        "max_area": 400,  # Skaliert für Full HD 
-        "fps": 60,
-        "resolution": (1920, 1080),  # Full HD
-        "description": "Optimiert für kleine, schnelle Insekten - Full HD"
-    },
-    "🐦 Bird": {
-        "threshold": 30,
-        "min_area": 500,  # Skaliert für Full HD
-        "max_area": 12000,  # Skaliert für Full HD
-        "fps": 30,
-        "resolution": (1920, 1080),  # Full HD
-        "description": "Optimiert für Vögel und mittlere Flugobjekte - Full HD"
-    },
-    "✈️ Aircraft": {
-        "threshold": 40,
-        "min_area": 1200,  # Skaliert für Full HD
-        "max_area": 120000,  # Skaliert für Full HD
-        "fps": 15,
-        "resolution": (1920, 1080),  # Full HD
-        "description": "Optimiert für Flugzeuge und große Objekte - Full HD"
-    },
-    "🎯 Custom": {
-        "threshold": 25,
-        "min_area": 250,  # Skaliert für Full HD
-        "max_area": 25000,  # Skaliert für Full HD
-        "fps": 30,
-        "resolution": (1920, 1080),  # Full HD
-        "description": "Manuelle Konfiguration - Full HD"
-    }
-}
+def _engine_attribute(name):
+    """Pipeline-Zustand der TrackingEngine am GUI-Objekt durchreichen (Viewer lesen ihn direkt)"""
+    return property(lambda self: getattr(self.engine, name),
+                    lambda self, value: setattr(self.engine, name, value))
 
-# Video-Quellen
-VIDEO_SOURCES = {
-    "📷 Webcam 0 (Primary)": {
-        "type": "webcam",
-        "source": 0,
-        "description": "Standard USB-Webcam (Index 0)"
-    },
-    "📷 Webcam 1": {
-        "type": "webcam", 
-        "source": 1,
-        "description": "Zweite USB-Webcam (Index 1)"
-    },
-    "📷 Webcam 2": {
-        "type": "webcam",
-        "source": 2, 
-        "description": "Dritte USB-Webcam (Index 2)"
-    },
-    "📷📷 Multi-Webcam": {
-        "type": "multi_webcam",
-        "sources": [0, 1, 2],
-        "description": "Alle verfügbaren Webcams gleichzeitig"
-    },
-    "🌊 Niagara Falls Live": {
-        "type": "youtube_dual",
-        "sources": {
-            "NiagaraFallsLive": "https://www.youtube.com/watch?v=4Z6wOToTgh0",
-            "EarthCam": "https://www.youtube.com/watch?v=W3D3dEpR3bs"
-        },
-        "description": "YouTube Live-Streams - Dual-Perspektiven"
-    },
-    "🌊 Niagara Falls (Single)": {
-        "type": "youtube_single",
-        "source": "https://www.youtube.com/watch?v=4Z6wOToTgh0",
-        "description": "YouTube Live-Stream - Einzelperspektive"
-    },
-    "📺 Custom URL": {
-        "type": "custom_url",
-        "source": "",
-        "description": "Eigene URL eingeben"
-    }
-}
 
 class MasterMotionTracker:
+    # Capture/Detection/Filter laufen headless in der Engine
+    caps = _engine_attribute('caps')
+    capture_threads = _engine_attribute('capture_threads')
+    detectors = _engine_attribute('detectors')
+    worker_pool = _engine_attribute('worker_pool')
+    replay_session = _engine_attribute('replay_session')
+    recorder = _engine_attribute('recorder')
+    governor = _engine_attribute('governor')
+    camera_regions = _engine_attribute('camera_regions')
+    region_snapshot_request = _engine_attribute('region_snapshot_request')
+    region_snapshots = _engine_attribute('region_snapshots')
+    detections = _engine_attribute('detections')
+    camera_positions = _engine_attribute('camera_positions')
+    camera_colors = _engine_attribute('camera_colors')
+    current_motion_counts = _engine_attribute('current_motion_counts')
+    current_fps = _engine_attribute('current_fps')
+    tracking_start_time = _engine_attribute('tracking_start_time')
+    last_detection_frame = _engine_attribute('last_detection_frame')
+    last_detection_info = _engine_attribute('last_detection_info')
+    stream_resolver = _engine_attribute('stream_resolver')
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("🎯 Pixeltovoxelprojector - Master Motion Tracker")
@@ -639,21 +551,23 @@ class MasterMotionTracker:
         
         # State
         self.is_tracking = False
-        self.caps = {}
-        self.bg_subtractors = {}
+        # Headless Pipeline - die GUI liefert nur Config-Snapshots und zeigt an
+        self.engine = TrackingEngine(log=self.log)
         self.current_profile = None
         self.current_source = None
         self.tracking_thread = None
-        self.motion_data = deque(maxlen=1000)  # Store motion data for 3D visualization
-        self.camera_motion_data = {}  # Store motion data per camera for triangulation
         self.triangulation_active = False  # Flag für Live-Triangulation
-        self.current_motion_counts = {}  # Für Dashboard
-        self.current_fps = 0  # Für Dashboard
-        self.tracking_start_time = 0  # Für Dashboard
         self.viewer_window = None
         
         # GUI setup
         self.setup_gui()
+        self._push_config()
+
+        # Jede Änderung an den Reglern → neuer Snapshot für die Engine
+        for var in (self.profile_var, self.threshold_var, self.min_area_var, self.max_area_var,
+                    self.min_movement_var, self.anti_cloud_min_area_var, self.anti_cloud_max_area_var,
+                    self.min_speed_var, self.multiprocess_var, self.record_var, self.roi_tracking_var):
+            var.trace_add('write', self._push_config)
         
         # Initial log
         self.log("🎯 Pixeltovoxelprojector Master Motion Tracker gestartet")
@@ -697,6 +611,18 @@ class MasterMotionTracker:
         self.url_entry = ttk.Entry(self.url_frame, textvariable=self.url_var, width=50)
         self.url_entry.pack(side=tk.LEFT, padx=5)
         
+        # Replay session selection (initially hidden)
+        self.replay_frame = ttk.Frame(config_frame)
+        ttk.Label(self.replay_frame, text="📂 Session:").pack(side=tk.LEFT, padx=5)
+        self.replay_path_var = tk.StringVar()
+        ttk.Entry(self.replay_frame, textvariable=self.replay_path_var, width=40).pack(side=tk.LEFT, padx=5)
+        ttk.Button(self.replay_frame, text="...", width=3,
+                   command=self.browse_replay_session).pack(side=tk.LEFT)
+        ttk.Label(self.replay_frame, text="⏩ Tempo:").pack(side=tk.LEFT, padx=5)
+        self.replay_speed_var = tk.StringVar(value=list(REPLAY_SPEEDS.keys())[0])
+        ttk.Combobox(self.replay_frame, textvariable=self.replay_speed_var, width=12,
+                     values=list(REPLAY_SPEEDS.keys()), state="readonly").pack(side=tk.LEFT, padx=5)
+        
         # Webcam selection frame (initially hidden)
         self.webcam_frame = ttk.LabelFrame(config_frame, text="📷 Webcam Auswahl")
         ttk.Label(self.webcam_frame, text="Wählen Sie die gewünschten Webcams aus:").pack(pady=5)
@@ -773,6 +699,10 @@ class MasterMotionTracker:
                                             command=self.open_last_detection_view)
         self.last_detection_btn.pack(side=tk.LEFT, padx=5)
         
+        self.region_btn = ttk.Button(control_frame, text="✂️ ROI / Masken", 
+                                    command=self.open_region_editor)
+        self.region_btn.pack(side=tk.LEFT, padx=5)
+        
         # Advanced settings (collapsible)
         self.settings_visible = False
         self.settings_btn = ttk.Button(control_frame, text="⚙️ Advanced Settings", 
@@ -862,6 +792,26 @@ class MasterMotionTracker:
                     "• ERGEBNIS: Nur schnelle, kompakte Flugobjekte = VÖGEL")
         ttk.Label(self.settings_frame, text=help_text, font=("Arial", 8), foreground="cyan").grid(
             row=9, column=0, columnspan=3, sticky=tk.W, padx=5, pady=(5,0))
+
+        # Multi-Process Detection (ein Prozess pro Kamera, Frames via Shared Memory)
+        self.multiprocess_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.settings_frame, text="⚡ Multi-Process Detection (ein Prozess pro Kamera)",
+                        variable=self.multiprocess_var, command=self._update_roi_tracking_state).grid(
+            row=10, column=0, columnspan=3, sticky=tk.W, padx=5, pady=(5,0))
+        
+        # Session-Aufnahme (Rohframes aller Kameras, replay-fähig)
+        self.record_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.settings_frame, text="⏺️ Session aufnehmen (recordings/, für Replay)",
+                        variable=self.record_var).grid(
+            row=11, column=0, columnspan=3, sticky=tk.W, padx=5)
+        
+        # Suchfenster für aktive Tracks (voller Scan nur jeden n-ten Frame)
+        # (nur im Tracking-Thread - die Worker-Prozesse scannen immer volle Frames)
+        self.roi_tracking_var = tk.BooleanVar(value=False)
+        self.roi_tracking_check = ttk.Checkbutton(
+            self.settings_frame, text="🎯 Aktive Tracks nur in Suchfenstern verarbeiten",
+            variable=self.roi_tracking_var)
+        self.roi_tracking_check.grid(row=12, column=0, columnspan=3, sticky=tk.W, padx=5)
         
         self.settings_frame.columnconfigure(1, weight=1)
         
@@ -903,6 +853,11 @@ class MasterMotionTracker:
         info = f"{profile_name}: {profile['description']}\n"
         info += f"Threshold: {profile['threshold']}, Area: {profile['min_area']}-{profile['max_area']}, "
         info += f"FPS: {profile['fps']}, Resolution: {profile['resolution'][0]}x{profile['resolution'][1]}"
+        scale = profile.get('detection_scale', 1.0)
+        if scale < 1.0:
+            info += (f", Detection: {int(profile['resolution'][0] * scale)}x{int(profile['resolution'][1] * scale)}"
+                     f"{' + Full-HD Verfeinerung' if profile.get('refine') else ''}")
+        info += f", Hintergrund: {profile.get('background', {}).get('model', 'mog2')}"
         self.profile_info_var.set(info)
         
         # Update advanced settings
@@ -920,17 +875,62 @@ class MasterMotionTracker:
         # Show/hide URL entry for custom URL
         if source['type'] == 'custom_url':
             self.url_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
+            self.replay_frame.grid_remove()
+            self.webcam_frame.grid_remove()
+        # Show session selection for replay
+        elif source['type'] == 'replay':
+            self.url_frame.grid_remove()
+            self.replay_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
             self.webcam_frame.grid_remove()
         # Show webcam selection for multi-webcam
         elif source['type'] == 'multi_webcam':
             self.url_frame.grid_remove()
+            self.replay_frame.grid_remove()
             self.webcam_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
         else:
             self.url_frame.grid_remove()
+            self.replay_frame.grid_remove()
             self.webcam_frame.grid_remove()
             
         self.log(f"📺 Quelle gewechselt zu: {source_name} - {source['description']}")
         
+    def browse_replay_session(self):
+        """Session-Verzeichnis für Replay auswählen"""
+        path = filedialog.askdirectory(title="Aufgezeichnete Session auswählen")
+        if path:
+            self.replay_path_var.set(path)
+
+    def pipeline_time(self):
+        """Aktuelle Zeit auf der Uhr der Capture-Zeitstempel (siehe TrackingEngine)"""
+        return self.engine.pipeline_time()
+
+    def _current_config(self):
+        """TrackingConfig-Snapshot aus den Tk-Variablen (nur im GUI-Thread aufrufen)"""
+        return TrackingConfig.from_profile(
+            self.profile_var.get(),
+            threshold=self.threshold_var.get(),
+            min_area=self.min_area_var.get(),
+            max_area=self.max_area_var.get(),
+            min_movement=self.min_movement_var.get(),
+            anti_cloud_min_area=self.anti_cloud_min_area_var.get(),
+            anti_cloud_max_area=self.anti_cloud_max_area_var.get(),
+            min_speed=self.min_speed_var.get(),
+            multiprocess=self.multiprocess_var.get(),
+            record=self.record_var.get(),
+            roi_tracking=self.roi_tracking_var.get() and not self.multiprocess_var.get(),
+        )
+
+    def _update_roi_tracking_state(self):
+        """Suchfenster gibt es nur ohne Multi-Process Detection"""
+        self.roi_tracking_check.config(state=tk.DISABLED if self.multiprocess_var.get() else tk.NORMAL)
+
+    def _push_config(self, *args):
+        """Neuen Snapshot atomar in die Engine tauschen"""
+        try:
+            self.engine.update_config(self._current_config())
+        except (tk.TclError, ValueError):
+            pass  # Regler gerade mitten in der Eingabe - nächste Änderung zählt
+
     def open_dashboard(self):
         """Öffne das Real-time Dashboard"""
         if hasattr(self, 'dashboard_thread') and self.dashboard_thread.is_alive():
@@ -945,8 +945,6 @@ class MasterMotionTracker:
         try:
             import matplotlib.pyplot as plt
             import matplotlib.animation as animation
-            from collections import deque
-            import numpy as np
             
             # Dashboard Daten
             self.dashboard_data = {
@@ -990,12 +988,30 @@ class MasterMotionTracker:
                 if not self.is_tracking:
                     return line1, line2, line3, stats_text
                 
-                # Sammle aktuelle Daten
+                # Sammle aktuelle Daten - Einstellungen aus dem Engine-Snapshot, nicht aus Tk
+                config = self.engine.config
                 current_time = time.time()
                 total_motion = sum(getattr(self, 'current_motion_counts', {}).values())
-                avg_area = np.mean([point[2] for point in list(self.motion_data)[-10:]]) if self.motion_data else 0
+                latest = self.detections.latest(10)
+                avg_area = float(latest['area'].mean()) if len(latest) else 0
                 current_fps = getattr(self, 'current_fps', 0)
-                
+
+                # Verworfene/ueberschriebene Frames pro Kamera
+                capture_stats = "\n".join(
+                    f"   {name}: {reader.frames_captured} / {reader.frames_dropped}"
+                    for name, reader in list(self.capture_threads.items())
+                ) or "   -"
+                governor = self.governor
+                pacing = (f"{LEVEL_NAMES[governor.level]} ({governor.avg_work_time * 1000:.0f}ms/Iteration)"
+                          if governor is not None else "-")
+                recorder = self.recorder
+                record_stats = ""
+                if recorder is not None:
+                    record_stats = "⏺️ AUFNAHME (Geschrieben / Verworfen):\n" + "\n".join(
+                        f"   {name}: {recorder.frames_written[name]} / {recorder.frames_dropped[name]}"
+                        for name in recorder.cameras
+                    )
+
                 # Update Dashboard Daten
                 self.dashboard_data['times'].append(current_time)
                 self.dashboard_data['motion_counts'].append(total_motion)
@@ -1028,7 +1044,7 @@ class MasterMotionTracker:
                 stats = f"""
 🎯 TRACKING STATUS: {'🟢 ACTIVE' if self.is_tracking else '🔴 STOPPED'}
 📹 VIDEO SOURCES: {len(self.caps)}
-🎭 DETECTION PROFILE: {self.profile_var.get()}
+🎭 DETECTION PROFILE: {config.profile}
 
 📊 CURRENT METRICS:
    Motion Objects: {total_motion}
@@ -1036,13 +1052,18 @@ class MasterMotionTracker:
    Processing FPS: {current_fps:.1f}
    
 ⚙️ SETTINGS:
-   Sensitivity: {self.threshold_var.get()}
-   Min Area: {self.min_area_var.get()}
-   Max Area: {self.max_area_var.get()}
+   Sensitivity: {config.threshold}
+   Min Area: {config.min_area}
+   Max Area: {config.max_area}
    
 📈 TOTAL CAPTURED:
-   Motion Events: {len(self.motion_data)}
+   Motion Events: {self.detections.total}
    Runtime: {current_time - getattr(self, 'tracking_start_time', current_time):.1f}s
+
+📷 CAPTURE (Frames / Verworfen):
+{capture_stats}
+⏱️ PACING: {pacing}
+{record_stats}
                 """
                 stats_text.set_text(stats)
                 
@@ -1090,6 +1111,92 @@ class MasterMotionTracker:
         threading.Thread(target=start_last_detection, daemon=True).start()
         self.log("🐦 Last Detection Window gestartet")
         
+    def open_region_editor(self):
+        """Öffne den ROI/Masken-Editor - braucht aktuelle Kamerabilder"""
+        if not self.is_tracking:
+            messagebox.showwarning("ROI / Masken", "Bitte starten Sie zuerst das Motion Tracking!")
+            return
+
+        self.region_snapshots = {}
+        self.region_snapshot_request = True
+        threading.Thread(target=self._region_editor_window, daemon=True).start()
+        self.log("✂️ ROI-Editor gestartet")
+
+    def _region_editor_window(self):
+        """ROI/Ausschluss-Polygone per Maus zeichnen
+
+        Linksklick = Punkt, R = als ROI setzen, X = als Ausschluss hinzufügen,
+        U = Punkt zurück, C = Kamera zurücksetzen, N = nächste Kamera,
+        S = speichern, ESC/Q = schließen
+        """
+        window = '✂️ ROI / Masken'
+        deadline = time.time() + 3.0
+        while self.region_snapshot_request and time.time() < deadline:
+            time.sleep(0.05)
+        snapshots = dict(self.region_snapshots)
+        self.region_snapshot_request = False
+        if not snapshots:
+            self.log("❌ ROI-Editor: keine Kamerabilder verfügbar")
+            return
+
+        names = sorted(snapshots)
+        edits = {name: self.camera_regions.get(name, RegionMask()) for name in names}
+        state = {'index': 0, 'points': []}
+
+        def on_mouse(event, x, y, flags, param):
+            if event == cv2.EVENT_LBUTTONDOWN:
+                height, width = snapshots[names[state['index']]].shape[:2]
+                state['points'].append((x / width, y / height))  # Normiert 0..1
+
+        try:
+            cv2.namedWindow(window, cv2.WINDOW_NORMAL)
+            cv2.setMouseCallback(window, on_mouse)
+
+            while self.is_tracking:
+                name = names[state['index']]
+                region = edits[name]
+                display = snapshots[name].copy()
+                region.draw(display)
+                height, width = display.shape[:2]
+                points = np.array([(px * width, py * height) for px, py in state['points']], np.int32)
+                if len(points):
+                    cv2.polylines(display, [points], False, (0, 0, 255), 1)
+                    for point in points:
+                        cv2.circle(display, tuple(int(v) for v in point), 3, (0, 0, 255), -1)
+                cv2.putText(display, f"{name} ({state['index'] + 1}/{len(names)})",
+                            (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                cv2.putText(display, "Klick=Punkt R=ROI X=Ausschluss U=Undo C=Reset N=Next S=Save Q=Close",
+                            (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
+                cv2.imshow(window, display)
+
+                key = cv2.waitKey(50) & 0xFF
+                if key == ord('q') or key == 27:
+                    break
+                elif key == ord('u') and state['points']:
+                    state['points'].pop()
+                elif key in (ord('r'), ord('x')) and len(state['points']) >= 3:
+                    if key == ord('r'):
+                        edits[name] = RegionMask(state['points'], region.exclusions)
+                    else:
+                        edits[name] = RegionMask(region.roi, region.exclusions + [state['points']])
+                    state['points'] = []
+                elif key == ord('c'):
+                    edits[name] = RegionMask()
+                    state['points'] = []
+                elif key == ord('n'):
+                    state['index'] = (state['index'] + 1) % len(names)
+                    state['points'] = []
+                elif key == ord('s'):
+                    # Dict-Einträge werden atomar ersetzt - die Detection sieht alt oder neu
+                    for camera, edited in edits.items():
+                        self.camera_regions[camera] = edited
+                    save_camera_regions(edits)
+                    self.log(f"💾 ROI/Masken für {len(edits)} Kamera(s) gespeichert")
+
+            cv2.destroyWindow(window)
+        except Exception as e:
+            self.log(f"❌ ROI-Editor Fehler: {str(e)}")
+
     def _last_detection_window(self):
         """Live Last Detection Window - THREAD-SICHER"""
         try:
@@ -1117,9 +1224,9 @@ class MasterMotionTracker:
                             display_frame = cv2.resize(display_frame, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
                         
                         # Add info overlay
-                        if hasattr(self, 'last_detection_info'):
+                        if self.last_detection_info is not None:
                             info = self.last_detection_info
-                            timestamp_str = datetime.fromtimestamp(info['timestamp']).strftime("%H:%M:%S.%f")[:-3]
+                            timestamp_str = datetime.fromtimestamp(monotonic_to_wall(info['timestamp'])).strftime("%H:%M:%S.%f")[:-3]
                             
                             # Info box with close instruction
                             cv2.putText(display_frame, f"Camera: {info['camera']}", 
@@ -1299,7 +1406,7 @@ class MasterMotionTracker:
                 
             try:
                 # Nur bei echten Motion-Updates rendern
-                if hasattr(self, 'camera_motion_data') and self.camera_motion_data:
+                if hasattr(self, 'detections') and len(self.detections):
                     # Clear nur wenn nötig
                     if update_counter % 20 == 0:  # Noch seltener
                         self._clear_motion_objects(plotter)
@@ -1520,87 +1627,8 @@ class MasterMotionTracker:
         }
     
     def _filter_synchronized_motions(self):
-        """Filtere nur zeitgleiche Bewegungen auf beiden Kameras - KERN-FILTER"""
-        try:
-            if not hasattr(self, 'camera_motion_data') or len(self.camera_motion_data) < 2:
-                return {}
-                
-            current_time = time.time()
-            sync_tolerance = 0.3  # 300ms Toleranz für Synchronisation
-            
-            # Sammle nur sehr aktuelle Motion-Events
-            recent_motions = {}
-            for camera_name, motion_list in self.camera_motion_data.items():
-                if camera_name not in self.camera_positions or not motion_list:
-                    continue
-                    
-                # Nur Events der letzten Sekunde
-                very_recent = []
-                for motion in motion_list:
-                    try:
-                        if current_time - motion['timestamp'] < 1.0:
-                            very_recent.append(motion)
-                    except:
-                        continue
-                        
-                if very_recent:
-                    recent_motions[camera_name] = very_recent
-            
-            if len(recent_motions) < 2:
-                return {}
-            
-            # Finde zeitlich synchrone Motion-Paare
-            synchronized_pairs = {}
-            camera_names = list(recent_motions.keys())
-            
-            # Prüfe alle Kamera-Kombinationen
-            for i in range(len(camera_names)):
-                for j in range(i + 1, len(camera_names)):
-                    cam1_name = camera_names[i]
-                    cam2_name = camera_names[j]
-                    
-                    # Finde beste zeitliche Übereinstimmung
-                    best_match = None
-                    best_time_diff = float('inf')
-                    
-                    for motion1 in recent_motions[cam1_name]:
-                        for motion2 in recent_motions[cam2_name]:
-                            try:
-                                time_diff = abs(motion1['timestamp'] - motion2['timestamp'])
-                                if time_diff < sync_tolerance and time_diff < best_time_diff:
-                                    best_time_diff = time_diff
-                                    best_match = (motion1, motion2)
-                            except:
-                                continue
-                    
-                    # Speichere synchrone Paare
-                    if best_match:
-                        synchronized_pairs[f"{cam1_name}_{cam2_name}"] = {
-                            cam1_name: best_match[0],
-                            cam2_name: best_match[1],
-                            'time_diff': best_time_diff
-                        }
-            
-            # Gib das beste synchrone Paar zurück
-            if synchronized_pairs:
-                # Wähle Paar mit kleinster Zeitdifferenz
-                best_pair_key = min(synchronized_pairs.keys(), 
-                                  key=lambda k: synchronized_pairs[k]['time_diff'])
-                best_pair = synchronized_pairs[best_pair_key]
-                
-                # Entferne Metadaten für Rückgabe
-                result = {}
-                for cam_name, motion in best_pair.items():
-                    if cam_name != 'time_diff':
-                        result[cam_name] = motion
-                        
-                return result
-            
-            return {}
-            
-        except Exception as e:
-            # Sicher fallback
-            return {}
+        """Filtere nur zeitgleiche Bewegungen auf beiden Kameras - KERN-FILTER (siehe TrackingEngine)"""
+        return self.engine.synchronized_motions()
     
     def _draw_filtered_camera_rays(self, plotter, synchronized_motions):
         """Zeichne nur gefilterte, synchrone Camera Rays"""
@@ -1617,7 +1645,7 @@ class MasterMotionTracker:
                     camera_color = self.camera_colors.get(camera_name, 'white')
                     
                     # 3D Richtung berechnen
-                    direction = self._pixel_to_3d_direction(motion['x'], motion['y'], camera_name)
+                    direction = self._pixel_to_3d_direction(motion['cx'], motion['cy'], camera_name)
                     
                     # Strahl für Himmel-Tracking (längere Distanz)
                     ray_length = 100.0  # 100m für Flugzeug-Tracking
@@ -1663,10 +1691,10 @@ class MasterMotionTracker:
                         
                         # 3D Strahlen berechnen
                         pos1 = self.camera_positions[cam1_name]
-                        dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'], cam1_name)
+                        dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name)
                         
                         pos2 = self.camera_positions[cam2_name]
-                        dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'], cam2_name)
+                        dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name)
                         
                         # Triangulation berechnen
                         intersection, confidence = self._line_intersection_3d_with_confidence(pos1, dir1, pos2, dir2)
@@ -1749,27 +1777,14 @@ class MasterMotionTracker:
     def _draw_live_camera_rays(self, plotter):
         """Zeichne Live-Sichtstrahlen von den Kameras - reduziert für weniger Clutter"""
         try:
-            if not hasattr(self, 'camera_motion_data') or not self.camera_motion_data:
-                return
-                
-            current_time = time.time()
+            current_time = self.pipeline_time()
             ray_lifetime = 1.0  # Reduziert auf 1 Sekunde für weniger Clutter
             
-            for camera_name, motion_list in self.camera_motion_data.items():
+            # Aktuelle gefilterte Motion-Events als Slices pro Kamera
+            recent = self.detections.recent(current_time - ray_lifetime, cameras=list(self.camera_positions))
+            for camera_name, recent_motions in recent.items():
                 try:
-                    if camera_name not in self.camera_positions or not motion_list:
-                        continue
-                        
-                    # Aktuelle Motion-Events mit sicherer Filterung
-                    recent_motions = []
-                    for motion in motion_list:
-                        try:
-                            if current_time - motion['timestamp'] < ray_lifetime:
-                                recent_motions.append(motion)
-                        except:
-                            continue
-                    
-                    if recent_motions:
+                    if len(recent_motions):
                         camera_pos = self.camera_positions[camera_name]
                         camera_color = self.camera_colors.get(camera_name, 'white')
                         
@@ -1777,7 +1792,7 @@ class MasterMotionTracker:
                         for motion in recent_motions[-1:]:  # Nur das letzte Motion anzeigen
                             try:
                                 # Berechne 3D Richtung
-                                direction = self._pixel_to_3d_direction(motion['x'], motion['y'], camera_name)
+                                direction = self._pixel_to_3d_direction(motion['cx'], motion['cy'], camera_name)
                                 
                                 # Sichtstrahl mit Länge basierend auf Alter
                                 age = current_time - motion['timestamp']
@@ -1808,32 +1823,13 @@ class MasterMotionTracker:
     def _calculate_live_triangulation(self, plotter):
         """Live-Berechnung der Triangulation mit reduzierter Visualisierung für weniger Clutter"""
         try:
-            if not hasattr(self, 'camera_motion_data') or len(self.camera_motion_data) < 2:
-                return
-                
-            current_time = time.time()
+            current_time = self.pipeline_time()
             sync_window = 0.8  # Kürzeres Synchronisations-Fenster
             
-            # Sammle neueste synchrone Motion-Events
-            synchronized_motions = {}
-            
-            for camera_name, motion_list in self.camera_motion_data.items():
-                try:
-                    if camera_name not in self.camera_positions or not motion_list:
-                        continue
-                    # Neueste Events in Zeitfenster mit sicherer Filterung
-                    recent_motions = []
-                    for motion in motion_list:
-                        try:
-                            if current_time - motion['timestamp'] < sync_window:
-                                recent_motions.append(motion)
-                        except:
-                            continue
-                    
-                    if recent_motions:
-                        synchronized_motions[camera_name] = recent_motions[-1]
-                except:
-                    continue  # Ignoriere Kamera-Fehler
+            # Neuestes Motion-Event pro Kamera im Zeitfenster
+            recent = self.detections.recent(current_time - sync_window, cameras=list(self.camera_positions),
+                                            limit=1)
+            synchronized_motions = {camera_name: records[-1] for camera_name, records in recent.items()}
             
             if len(synchronized_motions) < 2:
                 return
@@ -1854,10 +1850,10 @@ class MasterMotionTracker:
                         
                         # Berechne 3D Strahlen sicher
                         pos1 = self.camera_positions[cam1_name]
-                        dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'], cam1_name)
+                        dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name)
                         
                         pos2 = self.camera_positions[cam2_name]
-                        dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'], cam2_name)
+                        dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name)
                         
                         # Finde Kreuzungspunkt
                         intersection, confidence = self._line_intersection_3d_with_confidence(pos1, dir1, pos2, dir2)
@@ -1904,59 +1900,8 @@ class MasterMotionTracker:
             pass
     
     def _line_intersection_3d_with_confidence(self, p1, d1, p2, d2):
-        """Finde Kreuzungspunkt mit Confidence-Score - optimiert für Himmel-Tracking (große Entfernungen)"""
-        w = p1 - p2
-        a = np.dot(d1, d1)
-        b = np.dot(d1, d2)
-        c = np.dot(d2, d2)
-        d = np.dot(d1, w)
-        e = np.dot(d2, w)
-        
-        denominator = a * c - b * b
-        if abs(denominator) < 1e-8:  # Strengere Parallel-Erkennung für Himmel-Tracking
-            return None, 0.0
-            
-        t1 = (b * e - c * d) / denominator
-        t2 = (a * e - b * d) / denominator
-        
-        # Für Himmel-Tracking: Nur positive t-Werte (vor den Kameras)
-        if t1 < 0.1 or t2 < 0.1:  # Mindestabstand 10cm
-            return None, 0.0
-        
-        # Berechne nächste Punkte auf beiden Linien
-        closest1 = p1 + t1 * d1
-        closest2 = p2 + t2 * d2
-        
-        # Mittelpunkt als Triangulation
-        intersection = (closest1 + closest2) / 2
-        
-        # Confidence für große Entfernungen angepasst
-        distance = np.linalg.norm(closest1 - closest2)
-        
-        # Für Flugzeuge/Vögel: Toleriere größere Abstände zwischen den Strahlen
-        confidence = max(0.0, 1.0 - distance / 50.0)  # 50m Toleranz statt 2m
-        
-        # Winkel zwischen Strahlen - für parallele Kameras sind kleine Winkel OK
-        cos_angle = abs(np.dot(d1, d2))
-        angle_confidence = 1.0 - cos_angle * 0.5  # Weniger Penalty für parallele Strahlen
-        
-        # Entfernung zu Kameras - Flugzeuge sind weit weg
-        dist1 = np.linalg.norm(intersection - p1)
-        dist2 = np.linalg.norm(intersection - p2)
-        avg_distance = (dist1 + dist2) / 2
-        
-        # Optimaler Bereich für Flugzeuge: 100m - 10km
-        if 100 <= avg_distance <= 10000:
-            distance_confidence = 1.0
-        elif avg_distance < 100:
-            distance_confidence = avg_distance / 100.0  # Reduziere Confidence für zu nahe Objekte
-        else:
-            distance_confidence = 1.0 / (1.0 + (avg_distance - 10000) / 5000.0)  # Reduziere für sehr weit entfernte
-        
-        # Kombinierte Confidence
-        final_confidence = confidence * angle_confidence * distance_confidence
-        
-        return intersection, final_confidence
+        """Finde Kreuzungspunkt mit Confidence-Score (siehe tracking_engine)"""
+        return line_intersection_3d_with_confidence(p1, d1, p2, d2)
                 
     def _create_camera_mesh(self, position):
         """Erstelle eine Kamera-Pyramide"""
@@ -1967,28 +1912,18 @@ class MasterMotionTracker:
         
     def _draw_camera_rays(self, plotter):
         """Zeichne Sichtstrahlen von Kameras zu Motion-Punkten"""
-        if not self.camera_motion_data:
-            return
-            
         # Aktuelle Zeit für zeitliche Synchronisation
-        current_time = time.time()
+        current_time = self.pipeline_time()
         time_window = 2.0  # 2 Sekunden Fenster
         
         for camera_name, camera_pos in self.camera_positions.items():
-            if camera_name not in self.camera_motion_data:
-                continue
-                
             camera_color = self.camera_colors.get(camera_name, 'white')
             
-            # Filtere Motion-Daten nach Zeit
-            recent_motions = [
-                motion for motion in self.camera_motion_data[camera_name]
-                if current_time - motion['timestamp'] < time_window
-            ]
+            # Motion-Daten im Zeitfenster - nur die letzten 5
+            recent_motions = self.detections.window(camera_name, since=current_time - time_window)[-5:]
             
             # Zeichne Strahlen für jedes Motion-Event
-            for motion_data in recent_motions[-5:]:  # Nur die letzten 5
-                x, y = motion_data['x'], motion_data['y']
+            for x, y in zip(recent_motions['cx'], recent_motions['cy']):
                 
                 # Konvertiere 2D Bildkoordinaten zu 3D Richtung
                 direction = self._pixel_to_3d_direction(x, y, camera_name)
@@ -2010,68 +1945,20 @@ class MasterMotionTracker:
                 plotter.add_mesh(motion_point, color=camera_color, opacity=0.9)
                     
     def _pixel_to_3d_direction(self, pixel_x, pixel_y, camera_name):
-        """Konvertiere 2D Pixel-Koordinaten zu 3D Richtungsvektor - Full HD optimiert"""
-        # Vereinfachte Kamera-Transformation für Full HD
-        # In einer echten Implementierung würden hier Kamera-Intrinsics verwendet
-        
-        # Normalisiere Pixel-Koordinaten zu [-1, 1] für Full HD (1920x1080)
-        norm_x = (pixel_x - 960) / 960  # Full HD: 1920/2 = 960
-        norm_y = (pixel_y - 540) / 540  # Full HD: 1080/2 = 540
-        
-        # Standard Field of View Annahme (60° typisch für Webcams)
-        fov_factor = 0.7  # Für 60° FOV
-        
-        # Basis-Richtung für jede Kamera (Himmel-Tracking Setup)
-        if camera_name == 'webcam_0':
-            # Linke Kamera: nach oben-vorne gerichtet (Himmel-Tracking)
-            base_dir = np.array([0, 0.5, 0.866])  # 60° Elevation für Himmel
-            right_vec = np.array([1, 0, 0])  # X-Achse für horizontale Bewegung
-            up_vec = np.array([0, 0.866, -0.5])  # Hoch-Vektor angepasst für 60° Neigung
-        elif camera_name == 'webcam_1':
-            # Rechte Kamera: parallel zur linken (Himmel-Tracking)
-            base_dir = np.array([0, 0.5, 0.866])  # 60° Elevation für Himmel (parallel)
-            right_vec = np.array([1, 0, 0])  # X-Achse für horizontale Bewegung
-            up_vec = np.array([0, 0.866, -0.5])  # Hoch-Vektor angepasst für 60° Neigung
-        elif camera_name == 'webcam_2':
-            # Zentrum: gerade nach vorne
-            base_dir = np.array([0, 1, 0])
-            right_vec = np.array([1, 0, 0])
-            up_vec = np.array([0, 0, 1])
-        else:
-            # Default: gerade nach vorne
-            base_dir = np.array([0, 1, 0])
-            right_vec = np.array([1, 0, 0])
-            up_vec = np.array([0, 0, 1])
-        
-        # Kombiniere Basis-Richtung mit Pixel-Offset
-        direction = base_dir + (right_vec * norm_x * fov_factor) + (up_vec * norm_y * fov_factor)
-            
-        # Normalisiere Richtungsvektor
-        return direction / np.linalg.norm(direction)
+        """Konvertiere 2D Pixel-Koordinaten zu 3D Richtungsvektor (siehe tracking_engine)"""
+        return pixel_to_3d_direction(pixel_x, pixel_y, camera_name)
         
     def _calculate_triangulation(self, plotter):
         """Berechne und visualisiere Triangulation von Kreuzungspunkten"""
-        if len(self.camera_motion_data) < 2:  # Brauchen mindestens 2 Kameras
-            return
-            
         # Aktuelle Zeit für Synchronisation
-        current_time = time.time()
+        current_time = self.pipeline_time()
         sync_window = 1.0  # 1 Sekunde Synchronisations-Fenster
         
-        # Sammle synchrone Motion-Events von verschiedenen Kameras
-        synchronized_motions = {}
-        
-        for camera_name, motion_list in self.camera_motion_data.items():
-            if camera_name in self.camera_positions:
-                # Neueste Motion-Events in Zeitfenster
-                recent_motions = [
-                    motion for motion in motion_list
-                    if current_time - motion['timestamp'] < sync_window
-                ]
-                if recent_motions:
-                    synchronized_motions[camera_name] = recent_motions[-1]  # Neuestes Event
+        # Neuestes Motion-Event pro Kamera im Zeitfenster
+        recent = self.detections.recent(current_time - sync_window, cameras=list(self.camera_positions), limit=1)
+        synchronized_motions = {camera_name: records[-1] for camera_name, records in recent.items()}
         
-        if len(synchronized_motions) < 2:
+        if len(synchronized_motions) < 2:  # Brauchen mindestens 2 Kameras
             return
             
         # Berechne Triangulation für alle Kamera-Paare
@@ -2089,10 +1976,10 @@ class MasterMotionTracker:
                 
                 # Berechne 3D Strahlen
                 pos1 = self.camera_positions[cam1_name]
-                dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'], cam1_name)
+                dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name)
                 
                 pos2 = self.camera_positions[cam2_name]
-                dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'], cam2_name)
+                dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name)
                 
                 # Finde Kreuzungspunkt
                 intersection = self._line_intersection_3d(pos1, dir1, pos2, dir2)
@@ -2153,7 +2040,7 @@ class MasterMotionTracker:
 
     def open_3d_viewer(self):
         """Open 3D motion visualization viewer"""
-        if len(self.motion_data) < 10:
+        if len(self.detections) < 10:
             messagebox.showwarning("3D Viewer", 
                                  "Nicht genügend Motion-Daten für 3D-Visualisierung.\n"
                                  "Starten Sie erst Motion Tracking und sammeln Sie Daten.")
@@ -2168,57 +2055,46 @@ class MasterMotionTracker:
             # Create 3D plot
             plotter = pv.Plotter(title="🎲 Motion Tracking - 3D Visualization")
             
-            # Convert motion data to 3D points
-            if self.motion_data:
-                points = []
-                colors = []
-                sizes = []
+            # Convert motion data to 3D points - neueste 1000 Blobs aller Kameras (auch gefilterte)
+            records = self.detections.latest(1000)
+            if len(records):
+                area = records['area']
+                # Time dimension: z = Reihenfolge der Detections
+                points = np.column_stack((records['cx'], records['cy'],
+                                          np.arange(len(records)) * 0.1)).astype(np.float32)
+                
+                # Color based on object size: Green=small, Yellow=medium, Red=large
+                colors = np.select([area[:, None] < 100, area[:, None] < 500],
+                                   [[0, 1, 0], [1, 1, 0]], [1, 0, 0])
+                sizes = np.maximum(1, area / 100)
+                
+                # Create point cloud with proper float32 type
+                point_cloud = pv.PolyData(points)
+                point_cloud['colors'] = colors
+                point_cloud['sizes'] = sizes
+                
+                # Add to plotter
+                plotter.add_mesh(point_cloud, 
+                               scalars='colors', 
+                               rgb=True,
+                               point_size=10,
+                               render_points_as_spheres=True)
+                
+                # Add coordinate system
+                plotter.add_axes()
+                plotter.show_grid()
+                
+                # Add text info
+                plotter.add_text(f"Motion Points: {len(points)}", 
+                               position='upper_left', font_size=12)
+                plotter.add_text("Green=Small, Yellow=Medium, Red=Large", 
+                               position='lower_left', font_size=10)
+                
+                self.log(f"🎲 3D Viewer: {len(points)} Motion-Punkte visualisiert")
+                
+                # Show the plot
+                plotter.show()
                 
-                for i, motion_point in enumerate(self.motion_data):
-                    x, y, area, timestamp = motion_point
-                    z = i * 0.1  # Time dimension
-                    
-                    points.append([x, y, z])
-                    
-                    # Color based on object size
-                    if area < 100:
-                        colors.append([0, 1, 0])  # Green for small objects
-                    elif area < 500:
-                        colors.append([1, 1, 0])  # Yellow for medium objects
-                    else:
-                        colors.append([1, 0, 0])  # Red for large objects
-                        
-                    sizes.append(max(1, area / 100))
-                
-                if points:
-                    # Create point cloud with proper float32 type
-                    points_f = np.array(points, dtype=np.float32)
-                    point_cloud = pv.PolyData(points_f)
-                    point_cloud['colors'] = colors
-                    point_cloud['sizes'] = sizes
-                    
-                    # Add to plotter
-                    plotter.add_mesh(point_cloud, 
-                                   scalars='colors', 
-                                   rgb=True,
-                                   point_size=10,
-                                   render_points_as_spheres=True)
-                    
-                    # Add coordinate system
-                    plotter.add_axes()
-                    plotter.show_grid()
-                    
-                    # Add text info
-                    plotter.add_text(f"Motion Points: {len(points)}", 
-                                   position='upper_left', font_size=12)
-                    plotter.add_text("Green=Small, Yellow=Medium, Red=Large", 
-                                   position='lower_left', font_size=10)
-                    
-                    self.log(f"🎲 3D Viewer: {len(points)} Motion-Punkte visualisiert")
-                    
-                    # Show the plot
-                    plotter.show()
-                    
         except Exception as e:
             self.log(f"❌ 3D Viewer Fehler: {str(e)}")
             
@@ -2283,11 +2159,9 @@ class MasterMotionTracker:
             elif source['type'] in ['youtube_single', 'youtube_dual']:
                 # Test YouTube URLs
                 if source['type'] == 'youtube_dual':
-                    urls = source['sources']
-                    results = {}
-                    for name, url in urls.items():
-                        self.log(f"🔍 Testing {name}...")
-                        results[name] = self._test_youtube_url(url)
+                    self.log(f"🔍 Testing {', '.join(source['sources'])}...")
+                    resolved = self.stream_resolver.resolve_many(source['sources'])
+                    results = {name: bool(url) for name, url in resolved.items()}
                     result = any(results.values())
                     working = sum(results.values())
                     self.log(f"📊 YouTube Test: {working}/{len(results)} Streams verfügbar")
@@ -2302,6 +2176,9 @@ class MasterMotionTracker:
                 else:
                     self.log(f"🔍 Testing custom URL: {url}")
                     result = self._test_custom_url(url)
+                    
+            elif source['type'] == 'replay':
+                result = self._test_replay_session(self.replay_path_var.get().strip())
             else:
                 self.log(f"❌ Unbekannter Source-Typ: {source['type']}")
                 result = False
@@ -2318,18 +2195,10 @@ class MasterMotionTracker:
             
     def _test_youtube_url(self, url):
         """Test a YouTube URL"""
-        try:
-            cmd = ['python', '-m', 'yt_dlp', '--get-url', '--format', 'best[height<=720]', url]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                self.log("✅ YouTube URL verfügbar")
-                return True
-            else:
-                self.log(f"❌ YouTube Fehler: {result.stderr.strip()}")
-                return False
-        except Exception as e:
-            self.log(f"❌ YouTube Test-Fehler: {str(e)}")
-            return False
+        if self.stream_resolver.resolve(url):
+            self.log("✅ YouTube URL verfügbar")
+            return True
+        return False
             
     def _test_custom_url(self, url):
         """Test a custom URL"""
@@ -2352,6 +2221,21 @@ class MasterMotionTracker:
             self.log(f"❌ Custom URL Test-Fehler: {str(e)}")
             return False
             
+    def _test_replay_session(self, session_dir):
+        """Test a recorded session"""
+        if not session_dir:
+            self.log("❌ Keine Session ausgewählt")
+            return False
+        try:
+            session = ReplaySession(session_dir)
+            for name, index in session.indices.items():
+                self.log(f"🎞️ {name}: {len(index)} Frames")
+            self.log(f"✅ Session: {len(session.indices)} Kameras, {session.duration:.1f}s aufgezeichnet")
+            return True
+        except Exception as e:
+            self.log(f"❌ Session Test-Fehler: {str(e)}")
+            return False
+            
     def start_tracking(self):
         """Start motion tracking"""
         if self.is_tracking:
@@ -2364,8 +2248,19 @@ class MasterMotionTracker:
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         
+        # Tk-Variablen nur hier im GUI-Thread lesen - der Worker bekommt fertige Werte
+        self._push_config()
+        source_name = self.source_var.get()
+        source_options = {
+            'url': self.url_var.get(),
+            'webcams': [i for i in range(4) if self.webcam_vars[f'webcam_{i}'].get()],
+            'replay_dir': self.replay_path_var.get(),
+            'replay_speed': REPLAY_SPEEDS[self.replay_speed_var.get()],
+        }
+        
         # Start tracking thread
-        self.tracking_thread = threading.Thread(target=self._tracking_worker, daemon=True)
+        self.tracking_thread = threading.Thread(target=self._tracking_worker,
+                                                args=(source_name, source_options), daemon=True)
         self.tracking_thread.start()
         
     def stop_tracking(self):
@@ -2377,6 +2272,7 @@ class MasterMotionTracker:
         
         # Set stop flag first
         self.is_tracking = False
+        self.engine.stop()
         
         # Stop Live Triangulation
         if hasattr(self, 'triangulation_active'):
@@ -2423,31 +2319,8 @@ class MasterMotionTracker:
             except Exception as e:
                 self.log(f"⚠️ OpenCV Window-Cleanup: {str(e)}")
             
-            # Release captures safely
-            caps_to_release = list(self.caps.items()) if self.caps else []
-            for name, cap in caps_to_release:
-                try:
-                    if cap and hasattr(cap, 'isOpened'):
-                        if cap.isOpened():
-                            # For webcams, clear buffer first
-                            if 'webcam' in name.lower():
-                                try:
-                                    # Quick buffer clear
-                                    for _ in range(3):
-                                        ret, _ = cap.read()
-                                        if not ret:
-                                            break
-                                except Exception:
-                                    pass
-                            cap.release()
-                            self.log(f"✅ {name} released")
-                        
-                except Exception as e:
-                    self.log(f"⚠️ {name} release error: {str(e)}")
-                    
-            # Clear data structures
-            self.caps.clear()
-            self.bg_subtractors.clear()
+            # Replay, Reader-Threads, Aufnahme, Worker-Prozesse und Captures freigeben
+            self.engine.close()
             
             # Final OpenCV cleanup
             try:
@@ -2474,32 +2347,25 @@ class MasterMotionTracker:
         except Exception as e:
             self.log(f"⚠️ GUI finalize error: {str(e)}")
         
-    def _tracking_worker(self):
+    def _tracking_worker(self, source_name, source_options):
         """Main tracking worker thread"""
         try:
             # Get current configuration
-            profile_name = self.profile_var.get()
-            profile = DETECTION_PROFILES[profile_name]
-            source_name = self.source_var.get()
+            config = self.engine.config
             source = VIDEO_SOURCES[source_name]
             
-            # Use advanced settings if modified
-            threshold = self.threshold_var.get()
-            min_area = self.min_area_var.get()
-            max_area = self.max_area_var.get()
-            
-            self.log(f"🎯 Profile: {profile_name}")
+            self.log(f"🎯 Profile: {config.profile}")
             self.log(f"📺 Source: {source_name}")
-            self.log(f"⚙️ Settings: Threshold={threshold}, Area={min_area}-{max_area}")
+            self.log(f"⚙️ Settings: Threshold={config.threshold}, Area={config.min_area}-{config.max_area}")
             
             # Initialize video sources
-            if not self._initialize_sources(source):
+            if not self.engine.open_sources(source, **source_options):
                 self.log("❌ Konnte Video-Quellen nicht initialisieren")
-                self.stop_tracking()
                 return
                 
-            # Main tracking loop
-            self._tracking_loop(threshold, min_area, max_area)
+            # Main tracking loop - Anzeige und Tasten über den Frame-Hook
+            self.engine.on_frames = self._on_engine_frames
+            self.engine.run()
             
         except Exception as e:
             self.log(f"❌ Tracking-Fehler: {str(e)}")
@@ -2507,448 +2373,49 @@ class MasterMotionTracker:
             # Ensure cleanup happens
             self.root.after(0, self.stop_tracking)
             
-    def _initialize_sources(self, source):
-        """Initialize video sources based on type"""
-        if source['type'] == 'webcam':
-            cap = cv2.VideoCapture(source['source'])
-            if cap.isOpened():
-                webcam_name = f"webcam_{source['source']}"
-                self.caps[webcam_name] = cap
-                self.bg_subtractors[webcam_name] = cv2.createBackgroundSubtractorMOG2()
-                self.log(f"✅ Webcam {source['source']} initialisiert")
-                return True
-            else:
-                self.log(f"❌ Webcam {source['source']} konnte nicht geöffnet werden")
-                return False
-                
-        elif source['type'] == 'multi_webcam':
-            success_count = 0
-            # Verwende nur ausgewählte Webcams
-            selected_webcams = [i for i in range(4) if self.webcam_vars[f'webcam_{i}'].get()]
-            
-            if not selected_webcams:
-                self.log("❌ Keine Webcams ausgewählt!")
-                return False
-                
-            self.log(f"🎯 Verwende ausgewählte Webcams: {selected_webcams}")
-            
-            for webcam_idx in selected_webcams:
-                try:
-                    cap = cv2.VideoCapture(webcam_idx)
-                    if cap.isOpened():
-                        # Set Full HD resolution (1920x1080) at 30 FPS
-                        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-                        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
-                        cap.set(cv2.CAP_PROP_FPS, 30)
-                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                        
-                        # Test ob die Webcam wirklich verfügbar ist
-                        ret, frame = cap.read()
-                        if ret and frame is not None:
-                            actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                            actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                            self.log(f"🎥 Webcam {webcam_idx} Auflösung: {actual_width}x{actual_height}")
-                            
-                            webcam_name = f"webcam_{webcam_idx}"
-                            self.caps[webcam_name] = cap
-                            self.bg_subtractors[webcam_name] = cv2.createBackgroundSubtractorMOG2()
-                            self.log(f"✅ Webcam {webcam_idx} initialisiert")
-                            success_count += 1
-                        else:
-                            cap.release()
-                            self.log(f"⚠️ Webcam {webcam_idx} verfügbar aber liefert keine Frames")
-                    else:
-                        self.log(f"⚠️ Webcam {webcam_idx} nicht verfügbar")
-                except Exception as e:
-                    self.log(f"❌ Webcam {webcam_idx} Fehler: {str(e)}")
-                    
-            if success_count > 0:
-                self.log(f"✅ Multi-Webcam: {success_count}/{len(selected_webcams)} Kameras aktiv")
-                # Update Kamera-Positionen basierend auf aktiven Webcams
-                self._update_camera_positions_for_active_webcams(selected_webcams)
-                return True
-            else:
-                self.log("❌ Keine ausgewählten Webcams konnten initialisiert werden")
-                return False
-                
-        elif source['type'] == 'youtube_single':
-            return self._init_youtube_single(source['source'])
-            
-        elif source['type'] == 'youtube_dual':
-            return self._init_youtube_dual(source['sources'])
-            
-        elif source['type'] == 'custom_url':
-            url = self.url_var.get().strip()
-            if not url:
-                self.log("❌ Keine Custom URL eingegeben")
-                return False
-            return self._init_custom_url(url)
-            
-        return False
-                
-    def _update_camera_positions_for_active_webcams(self, active_webcams):
-        """Update Kamera-Positionen basierend auf aktive Webcams"""
-        # Nur für aktive Webcams Positionen setzen
-        self.camera_positions = {}
-        self.camera_colors = {}
-        
-        if len(active_webcams) == 1:
-            # Eine Kamera - zentral
-            webcam_name = f"webcam_{active_webcams[0]}"
-            self.camera_positions[webcam_name] = np.array([0, 0, 0])
-            self.camera_colors[webcam_name] = 'red'
-            
-        elif len(active_webcams) == 2:
-            # Zwei Kameras - nebeneinander mit 30° Rotation (optimal)
-            webcam_0 = f"webcam_{active_webcams[0]}"
-            webcam_1 = f"webcam_{active_webcams[1]}"
-            
-            self.camera_positions[webcam_0] = np.array([-1, 0, 0])  # Links
-            self.camera_positions[webcam_1] = np.array([1, 0, 0])   # Rechts
-            
-            self.camera_colors[webcam_0] = 'red'
-            self.camera_colors[webcam_1] = 'green'
-            
-        else:
-            # Drei oder mehr Kameras - erweiterte Anordnung
-            colors = ['red', 'green', 'blue', 'yellow']
-            for i, webcam_idx in enumerate(active_webcams):
-                webcam_name = f"webcam_{webcam_idx}"
-                
-                if i == 0:
-                    self.camera_positions[webcam_name] = np.array([-1, 0, 0])  # Links
-                elif i == 1:
-                    self.camera_positions[webcam_name] = np.array([1, 0, 0])   # Rechts
-                elif i == 2:
-                    self.camera_positions[webcam_name] = np.array([0, 0, 0])   # Zentrum
-                else:
-                    # Weitere Kameras in einem Kreis anordnen
-                    angle = (i - 2) * (2 * np.pi / max(1, len(active_webcams) - 2))
-                    radius = 1.5
-                    x = radius * np.cos(angle)
-                    y = radius * np.sin(angle)
-                    self.camera_positions[webcam_name] = np.array([x, y, 0])
-                
-                self.camera_colors[webcam_name] = colors[min(i, len(colors) - 1)]
-        
-        self.log(f"📍 Kamera-Positionen aktualisiert für {len(active_webcams)} aktive Webcams")
-        
-    def _init_youtube_single(self, youtube_url):
-        """Initialize single YouTube stream"""
-        try:
-            self.log("🔗 Extrahiere YouTube Stream-URL...")
-            cmd = ['python', '-m', 'yt_dlp', '--get-url', '--format', 'best[height<=720]', youtube_url]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                stream_url = result.stdout.strip()
-                cap = cv2.VideoCapture(stream_url)
-                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                
-                if cap.isOpened():
-                    self.caps['youtube'] = cap
-                    self.bg_subtractors['youtube'] = cv2.createBackgroundSubtractorMOG2()
-                    self.log("✅ YouTube Stream initialisiert")
-                    return True
-                else:
-                    self.log("❌ YouTube Stream konnte nicht geöffnet werden")
-            else:
-                self.log(f"❌ YouTube URL-Extraktion fehlgeschlagen: {result.stderr}")
-                
-        except Exception as e:
-            self.log(f"❌ YouTube Initialisierung fehlgeschlagen: {str(e)}")
-            
-        return False
-        
-    def _init_youtube_dual(self, youtube_urls):
-        """Initialize dual YouTube streams"""
-        success_count = 0
-        
-        for name, youtube_url in youtube_urls.items():
-            try:
-                self.log(f"🔗 Extrahiere {name} Stream-URL...")
-                cmd = ['python', '-m', 'yt_dlp', '--get-url', '--format', 'best[height<=720]', youtube_url]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-                
-                if result.returncode == 0:
-                    stream_url = result.stdout.strip()
-                    cap = cv2.VideoCapture(stream_url)
-                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-                    
-                    if cap.isOpened():
-                        self.caps[name] = cap
-                        self.bg_subtractors[name] = cv2.createBackgroundSubtractorMOG2()
-                        self.log(f"✅ {name} Stream initialisiert")
-                        success_count += 1
-                    else:
-                        self.log(f"❌ {name} Stream konnte nicht geöffnet werden")
-                else:
-                    self.log(f"❌ {name} URL-Extraktion fehlgeschlagen")
-                    
-            except Exception as e:
-                self.log(f"❌ {name} Initialisierung fehlgeschlagen: {str(e)}")
-                
-        return success_count > 0
-        
-    def _init_custom_url(self, url):
-        """Initialize custom URL"""
-        try:
-            cap = cv2.VideoCapture(url)
-            if cap.isOpened():
-                self.caps['custom'] = cap
-                self.bg_subtractors['custom'] = cv2.createBackgroundSubtractorMOG2()
-                self.log("✅ Custom URL initialisiert")
-                return True
-            else:
-                self.log("❌ Custom URL konnte nicht geöffnet werden")
-        except Exception as e:
-            self.log(f"❌ Custom URL Initialisierung fehlgeschlagen: {str(e)}")
-            
-        return False
-        
-    def _tracking_loop(self, threshold, min_area, max_area):
-        """Main tracking loop"""
-        self.log("🎯 Starte Motion Detection...")
-        
-        frame_count = 0
-        start_time = time.time()
-        self.tracking_start_time = start_time
-        fps_update_interval = 30  # Update FPS every 30 frames
-        
-        while self.is_tracking:
-            frame_count += 1
-            frames = {}
-            motion_counts = {}
-            
-            # Update FPS für Dashboard
-            if frame_count % fps_update_interval == 0:
-                elapsed = time.time() - start_time
-                self.current_fps = frame_count / elapsed if elapsed > 0 else 0
-            
-            # Capture and process frames
-            for name, cap in list(self.caps.items()):
-                if not self.is_tracking:
-                    break
-                    
-                try:
-                    ret, frame = cap.read()
-                    if ret:
-                        processed_frame, motion_count = self._process_motion(
-                            frame, name, threshold, min_area, max_area
-                        )
-                        frames[name] = processed_frame
-                        motion_counts[name] = motion_count
-                    else:
-                        self.log(f"⚠️ {name}: Kein Frame empfangen")
-                except Exception as e:
-                    self.log(f"❌ {name} Capture-Fehler: {str(e)}")
-                    
-            # Update Dashboard Daten
-            self.current_motion_counts = motion_counts.copy()
-                    
-            # Display frames
-            if frames and self.is_tracking:
-                self._display_frames(frames, motion_counts, frame_count, start_time)
-                
-            # Handle OpenCV events
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q') or not self.is_tracking:
-                break
-            elif key == ord('s'):
-                self._save_screenshots(frames)
-            elif key == ord('+'):
-                # Increase sensitivity (lower threshold)
-                new_threshold = max(5, self.threshold_var.get() - 5)
-                self.threshold_var.set(new_threshold)
-                self.log(f"🔧 Sensitivity increased (threshold: {new_threshold})")
-            elif key == ord('-'):
-                # Decrease sensitivity (higher threshold)  
-                new_threshold = min(100, self.threshold_var.get() + 5)
-                self.threshold_var.set(new_threshold)
-                self.log(f"🔧 Sensitivity decreased (threshold: {new_threshold})")
-            elif key == ord('a'):
-                # Decrease min area
-                new_area = max(1, self.min_area_var.get() - 50)
-                self.min_area_var.set(new_area)
-                self.log(f"🔧 Min area decreased: {new_area}")
-            elif key == ord('A'):
-                # Increase min area
-                new_area = min(1000, self.min_area_var.get() + 50)
-                self.min_area_var.set(new_area)
-                self.log(f"🔧 Min area increased: {new_area}")
-                
-            # Get live settings updates for next iteration
-            threshold = self.threshold_var.get()
-            min_area = self.min_area_var.get()
-            max_area = self.max_area_var.get()
-            
-            time.sleep(0.03)  # ~30 FPS
-            
-    def _process_motion(self, frame, stream_name, threshold, min_area, max_area):
-        """Process motion detection on frame"""
-        if frame is None:
-            return frame, 0
-            
-        bg_subtractor = self.bg_subtractors[stream_name]
-        
-        # Background subtraction
-        fg_mask = bg_subtractor.apply(frame)
-        
-        # Apply threshold for sensitivity control
-        _, fg_mask = cv2.threshold(fg_mask, threshold, 255, cv2.THRESH_BINARY)
-        
-        # Morphological operations
-        kernel = np.ones((3,3), np.uint8)
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, kernel)
-        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, kernel)
-        
-        # Find contours
-        contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Process contours with ERWEITERTE Anti-Stationary Filter
-        motion_count = 0
-        filtered_motion_count = 0
-        result_frame = frame.copy()
-        
-        # Get live filter settings (PERFORMANCE-OPTIMIERT)
-        min_movement = self.min_movement_var.get() if hasattr(self, 'min_movement_var') else 5  # Sehr niedrig
-        time_window = self.movement_window_var.get() if hasattr(self, 'movement_window_var') else 1.0
-        consistency_frames = self.consistency_var.get() if hasattr(self, 'consistency_var') else 3
-        current_time = time.time()
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if min_area <= area <= max_area:
-                motion_count += 1
-                
-                # Get contour info
-                x, y, w, h = cv2.boundingRect(contour)
-                center_x = x + w // 2
-                center_y = y + h // 2
-                timestamp = current_time
-                
-                # ANTI-WOLKEN FILTER - INTELLIGENTE HIMMELBEOBACHTUNG
-                passes_filter = True  # Start optimistisch
-                filter_reasons = []
-                
-                # 1. Mindest-Bewegung (gegen Wolken-Drift)
-                min_movement = getattr(self, 'min_movement_var', type('obj', (object,), {'get': lambda: 15})).get()
-                if stream_name in self.camera_motion_data and len(self.camera_motion_data[stream_name]) >= 2:
-                    last_motion = list(self.camera_motion_data[stream_name])[-1]
-                    last_x = last_motion.get('x', 0)
-                    last_y = last_motion.get('y', 0)
-                    distance = ((center_x - last_x)**2 + (center_y - last_y)**2)**0.5
-                    
-                    if distance < min_movement:
-                        passes_filter = False
-                        filter_reasons.append("SLOW")
-                    else:
-                        filter_reasons.append("FAST")
-                
-                # 2. Area Filter (gegen Reflexionen und große Wolken) - NEUE VARIABLEN
-                anti_cloud_min_area = getattr(self, 'anti_cloud_min_area_var', type('obj', (object,), {'get': lambda: 60})).get()
-                anti_cloud_max_area = getattr(self, 'anti_cloud_max_area_var', type('obj', (object,), {'get': lambda: 2500})).get()
-                
-                if area < anti_cloud_min_area:
-                    passes_filter = False
-                    filter_reasons.append("TINY")
-                elif area > anti_cloud_max_area:
-                    passes_filter = False 
-                    filter_reasons.append("HUGE")
-                else:
-                    filter_reasons.append("SIZE_OK")
-                
-                # 3. Speed Filter (Vogel-typische Geschwindigkeit)
-                min_speed = getattr(self, 'min_speed_var', type('obj', (object,), {'get': lambda: 20})).get()
-                if stream_name in self.camera_motion_data and len(self.camera_motion_data[stream_name]) >= 3:
-                    # Berechne Geschwindigkeit über letzte Frames
-                    motions = list(self.camera_motion_data[stream_name])[-3:]
-                    if len(motions) >= 2:
-                        time_diff = motions[-1]['timestamp'] - motions[-2]['timestamp']
-                        if time_diff > 0:
-                            speed = distance / time_diff  # Pixel pro Sekunde
-                            speed_per_frame = speed / 30  # Annahme: 30 FPS
-                            
-                            if speed_per_frame < min_speed:
-                                passes_filter = False
-                                filter_reasons.append("CRAWL")
-                            else:
-                                filter_reasons.append("BIRD_SPEED")
-                
-                # Zusammenfassung der Filter-Gründe
-                if not filter_reasons:
-                    filter_reasons = ["FIRST"]
-                    
-                filter_reason = " ".join(filter_reasons[:2])  # Maximal 2 Gründe
-                
-                # Draw based on filter result
-                if passes_filter:
-                    filtered_motion_count += 1
-                    # Green = passes filter
-                    cv2.rectangle(result_frame, (x, y), (x+w, y+h), (0, 255, 0), 3)
-                    cv2.putText(result_frame, f'F{filtered_motion_count}', 
-                               (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                    cv2.putText(result_frame, filter_reason, 
-                               (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 255, 0), 1)
-                    
-                    # Store for Last Detection Window
-                    if not hasattr(self, 'last_detection_frame'):
-                        self.last_detection_frame = None
-                    
-                    # Extract detection region (größerer Bereich)
-                    padding = 30
-                    detection_region = frame[max(0, y-padding):min(frame.shape[0], y+h+padding), 
-                                           max(0, x-padding):min(frame.shape[1], x+w+padding)]
-                    if detection_region.size > 0:
-                        self.last_detection_frame = detection_region.copy()
-                        self.last_detection_info = {
-                            'timestamp': timestamp,
-                            'camera': stream_name,
-                            'area': area,
-                            'center': (center_x, center_y),
-                            'bbox': (x, y, w, h),
-                            'reason': filter_reason
-                        }
-                else:
-                    # Red = filtered out
-                    cv2.rectangle(result_frame, (x, y), (x+w, y+h), (0, 0, 255), 2)
-                    cv2.putText(result_frame, f'M{motion_count}', 
-                               (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1)
-                    cv2.putText(result_frame, filter_reason, 
-                               (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 0, 255), 1)
-                           
-                # Motion point für 3D viewer (auch für gefilterte)
-                self.motion_data.append((center_x, center_y, area, timestamp))
-                
-                # Kamera-spezifische Daten für Triangulation (nur filtered)
-                if passes_filter:
-                    if stream_name not in self.camera_motion_data:
-                        self.camera_motion_data[stream_name] = deque(maxlen=20)  # Reduziert für bessere Performance
-                    self.camera_motion_data[stream_name].append({
-                        'x': center_x,
-                        'y': center_y, 
-                        'area': area,
-                        'timestamp': timestamp,
-                        'camera': stream_name
-                    })
-                           
-        # Add stream info with enhanced Anti-Wolken filter stats
-        timestamp_str = datetime.now().strftime("%H:%M:%S")
-        cv2.putText(result_frame, f'{stream_name} - {timestamp_str}', 
-                   (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-        cv2.putText(result_frame, f'Total Motion: {motion_count} | 🦅 Vögel: {filtered_motion_count}', 
-                   (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # Filter-Parameter anzeigen - KORREKTE VARIABLEN
-        min_movement = getattr(self, 'min_movement_var', type('obj', (object,), {'get': lambda: 15})).get()
-        anti_cloud_min = getattr(self, 'anti_cloud_min_area_var', type('obj', (object,), {'get': lambda: 60})).get()
-        anti_cloud_max = getattr(self, 'anti_cloud_max_area_var', type('obj', (object,), {'get': lambda: 2500})).get()
-        min_speed_val = getattr(self, 'min_speed_var', type('obj', (object,), {'get': lambda: 20})).get()
-        
-        cv2.putText(result_frame, f'🌤️ Anti-Wolken: Move≥{min_movement}px Area{anti_cloud_min}-{anti_cloud_max}px² Speed≥{min_speed_val}', 
-                   (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
-                   
-        return result_frame, filtered_motion_count  # Return filtered count
+    def _on_engine_frames(self, frames, motion_counts, frame_count, start_time, new_frames):
+        """Frame-Hook der Engine: Anzeige + OpenCV-Tasten (False beendet das Tracking)
+
+        frames: DetectionResults - Overlays werden nur für angezeigte Frames
+        gezeichnet, höchstens mit der Anzeige-Wiederholrate
+        """
+        # Display frames
+        if new_frames and self.is_tracking and self.engine.overlay_renderer.due():
+            self._display_frames(self.engine.render_frames(frames), motion_counts, frame_count, start_time)
+            
+        # Handle OpenCV events
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q') or not self.is_tracking:
+            return False
+        elif key == ord('s'):
+            self._save_screenshots(self.engine.render_frames(frames))
+        elif key in (ord('+'), ord('-'), ord('a'), ord('A')):
+            # Tk-Variablen nur im GUI-Thread ändern - der Trace tauscht den Snapshot
+            self.root.after(0, self._adjust_setting, chr(key))
+        return True
+        
+    def _adjust_setting(self, key):
+        """Tastatur-Tuning aus dem Video-Fenster"""
+        if key == '+':
+            # Increase sensitivity (lower threshold)
+            new_threshold = max(5, self.threshold_var.get() - 5)
+            self.threshold_var.set(new_threshold)
+            self.log(f"🔧 Sensitivity increased (threshold: {new_threshold})")
+        elif key == '-':
+            # Decrease sensitivity (higher threshold)  
+            new_threshold = min(100, self.threshold_var.get() + 5)
+            self.threshold_var.set(new_threshold)
+            self.log(f"🔧 Sensitivity decreased (threshold: {new_threshold})")
+        elif key == 'a':
+            # Decrease min area
+            new_area = max(1, self.min_area_var.get() - 50)
+            self.min_area_var.set(new_area)
+            self.log(f"🔧 Min area decreased: {new_area}")
+        elif key == 'A':
+            # Increase min area
+            new_area = min(1000, self.min_area_var.get() + 50)
+            self.min_area_var.set(new_area)
+            self.log(f"🔧 Min area increased: {new_area}")
         
     def _display_frames(self, frames, motion_counts, frame_count, start_time):
         """Display processed frames - supports unlimited cameras"""
@@ -3063,6 +2530,7 @@ class MasterMotionTracker:
     def on_closing(self):
         """Handle window closing"""
         self.stop_tracking()
+        self.stream_resolver.stop()
         time.sleep(0.5)  # Give time for cleanup
         self.root.destroy()
         
@@ -2,29 +2,19 @@
 
 import json
 import numpy as np
-from PIL import Image
 import os
 import random
 import math
 
-def create_mosquito_test_data():
+def generate_mosquito_frames(num_frames=30, img_width=640, img_height=480, num_mosquitos=3):
     """
-    Erstellt realistische Testdaten für Mücken-Tracking
+    Frame-Generator für Mücken-Szenen (auch vom Benchmark genutzt)
     - Sehr kleine Objekte (1-3 Pixel)
     - Unregelmäßige, zufällige Bewegungsmuster
     - Verschiedene Geschwindigkeiten
-    - Realistische Größen und Bewegungen
+
+    Liefert RGB-Frames (np.uint8, img_height x img_width x 3).
     """
-    
-    # Erstelle Testverzeichnis
-    os.makedirs("mosquito_test", exist_ok=True)
-    
-    # Parameter für realistische Mückensimulation
-    num_frames = 30  # 30 Frames für ein kurzes Video
-    img_width, img_height = 640, 480  # Normale Webcam-Auflösung
-    num_mosquitos = 3  # Mehrere Mücken gleichzeitig
-    
-    frames = []
     mosquito_positions = []
     
     # Initialisiere Mückenpositionen
@@ -81,6 +71,28 @@ def create_mosquito_test_data():
                         # Machen die Mücke dunkler als der Hintergrund
                         img[y+dy, x+dx] = [brightness//3, brightness//3, brightness//3]
         
+        yield img
+
+def create_mosquito_test_data():
+    """
+    Erstellt realistische Testdaten für Mücken-Tracking
+    - Sehr kleine Objekte (1-3 Pixel)
+    - Unregelmäßige, zufällige Bewegungsmuster
+    - Verschiedene Geschwindigkeiten
+    - Realistische Größen und Bewegungen
+    """
+    from PIL import Image
+    
+    # Erstelle Testverzeichnis
+    os.makedirs("mosquito_test", exist_ok=True)
+    
+    # Parameter für realistische Mückensimulation
+    num_frames = 30  # 30 Frames für ein kurzes Video
+    num_mosquitos = 3  # Mehrere Mücken gleichzeitig
+    
+    frames = []
+    
+    for frame_idx, img in enumerate(generate_mosquito_frames(num_frames, 640, 480, num_mosquitos)):
         # Speichere Bild
         image_path = f"mosquito_test/mosquito_frame_{frame_idx:03d}.png"
         Image.fromarray(img).save(image_path)
@@ -112,18 +124,12 @@ def create_mosquito_test_data():
     print(f"📋 metadata.json mit Frame-Informationen")
     print(f"🎯 Optimiert für das 'Mosquito 🦟' Profil")
 
-def create_real_mosquito_simulation():
+def generate_realistic_mosquito_frames(img_width=640, img_height=480, scenario_frames=20):
     """
-    Erstellt eine noch realistischere Simulation basierend auf echtem Mückenverhalten
+    Frame-Generator für die Verhaltensszenarien (schweben, suchen, fliehen)
+
+    Liefert (Frame, Szenario-dict) - 3 * scenario_frames Frames.
     """
-    os.makedirs("realistic_mosquito_test", exist_ok=True)
-    
-    # Realistische Parameter
-    num_frames = 60  # 2 Sekunden bei 30 FPS
-    img_width, img_height = 640, 480
-    
-    frames = []
-    
     # Simuliere verschiedene Mückenarten und -verhalten
     mosquito_scenarios = [
         {"name": "hovering", "description": "Mücke schwebt an einer Stelle"},
@@ -131,9 +137,7 @@ def create_real_mosquito_simulation():
         {"name": "escaping", "description": "Mücke flieht schnell"}
     ]
     
-    for scenario_idx, scenario in enumerate(mosquito_scenarios):
-        scenario_frames = 20  # 20 Frames pro Szenario
-        
+    for scenario in mosquito_scenarios:
         # Mückenposition für dieses Szenario
         mosquito = {
             'x': random.randint(100, img_width - 100),
@@ -173,26 +177,39 @@ def create_real_mosquito_simulation():
             x, y = int(mosquito['x']), int(mosquito['y'])
             img[y-1:y+2, x-1:x+2] = [60, 60, 60]  # Dunkler Punkt
             
-            # Speichere Bild
-            frame_number = scenario_idx * scenario_frames + frame_idx
-            image_path = f"realistic_mosquito_test/realistic_mosquito_{frame_number:03d}.png"
-            Image.fromarray(img).save(image_path)
-            
-            # Metadaten
-            frame_info = {
-                "filename": f"realistic_mosquito_{frame_number:03d}.png",
-                "timestamp": frame_number * 0.033,
-                "camera_index": 0,
-                "camera_x": 0.0,
-                "camera_y": 0.0,
-                "camera_z": 1.5,
-                "rotation_x": 0.0,
-                "rotation_y": 0.0,
-                "rotation_z": 0.0,
-                "scenario": scenario["name"],
-                "description": scenario["description"]
-            }
-            frames.append(frame_info)
+            yield img, scenario
+
+def create_real_mosquito_simulation():
+    """
+    Erstellt eine noch realistischere Simulation basierend auf echtem Mückenverhalten
+    """
+    from PIL import Image
+    
+    os.makedirs("realistic_mosquito_test", exist_ok=True)
+    
+    frames = []
+    
+    # 3 Szenarien à 20 Frames = 2 Sekunden bei 30 FPS
+    for frame_number, (img, scenario) in enumerate(generate_realistic_mosquito_frames(640, 480, 20)):
+        # Speichere Bild
+        image_path = f"realistic_mosquito_test/realistic_mosquito_{frame_number:03d}.png"
+        Image.fromarray(img).save(image_path)
+        
+        # Metadaten
+        frame_info = {
+            "filename": f"realistic_mosquito_{frame_number:03d}.png",
+            "timestamp": frame_number * 0.033,
+            "camera_index": 0,
+            "camera_x": 0.0,
+            "camera_y": 0.0,
+            "camera_z": 1.5,
+            "rotation_x": 0.0,
+            "rotation_y": 0.0,
+            "rotation_z": 0.0,
+            "scenario": scenario["name"],
+            "description": scenario["description"]
+        }
+        frames.append(frame_info)
     
     # Speichere Metadaten
     with open("realistic_mosquito_test/metadata.json", "w") as f:
@@ -9,6 +9,43 @@ from datetime import datetime
 import threading
 import queue
 
+class ApproximateMedianBackground:
+    """
+    Inkrementeller Näherungs-Median als Hintergrundmodell
+
+    Jeder Pixel wandert pro Update um `step` Graustufen in Richtung des
+    aktuellen Frames - konvergiert gegen den Median, braucht nur ein Bild
+    Speicher und passt sich laufend an Lichtänderungen an. Pro Frame wird
+    nur jede `row_stride`-te Zeile aktualisiert (rotierend), damit kostet
+    das Update etwa so viel wie ein einzelnes absdiff über das ganze Bild.
+    Anpassungsrate: step / row_stride Graustufen pro Frame.
+    """
+
+    def __init__(self, step=1, row_stride=4):
+        self.step = step
+        self.row_stride = max(1, row_stride)
+        self.background = None
+        self._phase = 0
+
+    def apply(self, gray):
+        """Differenz zum Hintergrund, danach Hintergrund in-place fortschreiben"""
+        if self.background is None or self.background.shape != gray.shape:
+            # Erster Frame ist der Start-Hintergrund - Detection läuft sofort
+            self.background = gray.copy()
+            return np.zeros_like(gray)
+
+        diff = cv2.absdiff(self.background, gray)
+
+        rows = slice(self._phase, None, self.row_stride)
+        self._phase = (self._phase + 1) % self.row_stride
+        background, current = self.background[rows], gray[rows]
+        cv2.add(background, self.step, dst=background,
+                mask=cv2.compare(current, background, cv2.CMP_GT))
+        cv2.subtract(background, self.step, dst=background,
+                     mask=cv2.compare(current, background, cv2.CMP_LT))
+        return diff
+
+
 class LiveMosquitoTracker:
     def __init__(self):
         self.recording = False
@@ -23,12 +60,20 @@ class LiveMosquitoTracker:
             "max_area": 100,        # Mücken sind nie sehr groß
             "blur_kernel": 3,       # Kleiner Blur um Rauschen zu reduzieren
             "morph_kernel": 2,      # Kleine morphologische Operationen
+            "background_step": 2,        # Graustufen pro Hintergrund-Update
+            "background_row_stride": 4,  # Jede 4. Zeile pro Frame → 0.5 Graustufen/Frame
         }
         
-    def detect_mosquitos(self, frame, background):
+    def detect_mosquitos(self, frame, background, timer=None):
         """
         Erkennt Mücken in einem Frame
+
+        background: ApproximateMedianBackground (wird laufend angepasst)
+        oder ein festes Graustufen-Hintergrundbild
+        timer: optionaler motion_detection.StageTimer (Benchmark)
         """
+        if timer is not None:
+            timer.start()
         # Konvertiere zu Graustufen
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         
@@ -37,10 +82,17 @@ class LiveMosquitoTracker:
                                       self.mosquito_params["blur_kernel"]), 0)
         
         # Background Subtraction
-        diff = cv2.absdiff(background, gray)
+        if isinstance(background, ApproximateMedianBackground):
+            diff = background.apply(gray)
+        else:
+            diff = cv2.absdiff(background, gray)
+        if timer is not None:
+            timer.lap('background')
         
         # Threshold für Motion Detection
         _, thresh = cv2.threshold(diff, self.mosquito_params["threshold"], 255, cv2.THRESH_BINARY)
+        if timer is not None:
+            timer.lap('threshold')
         
         # Morphological operations um Rauschen zu reduzieren
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, 
@@ -48,6 +100,8 @@ class LiveMosquitoTracker:
                                           self.mosquito_params["morph_kernel"]))
         thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
         thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        if timer is not None:
+            timer.lap('morphology')
         
         # Finde Konturen
         contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -82,6 +136,8 @@ class LiveMosquitoTracker:
                     }
                     detections.append(detection)
         
+        if timer is not None:
+            timer.lap('contours')
         return detections, thresh
     
     def draw_detections(self, frame, detections):
@@ -167,21 +223,10 @@ class LiveMosquitoTracker:
         cap.set(cv2.CAP_PROP_FPS, 30)
         
         print("📹 Kamera erfolgreich geöffnet")
-        print("⏳ Erstelle Hintergrundmodell (5 Sekunden)...")
-        
-        # Erstelle Hintergrundmodell
-        background_frames = []
-        for i in range(50):  # 50 Frames für Hintergrund
-            ret, frame = cap.read()
-            if ret:
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                gray = cv2.GaussianBlur(gray, (5, 5), 0)
-                background_frames.append(gray)
-            time.sleep(0.1)
         
-        # Berechne mittleren Hintergrund
-        background = np.median(background_frames, axis=0).astype(np.uint8)
-        print("✅ Hintergrundmodell erstellt")
+        # Hintergrund lernt ab dem ersten Frame mit - keine Wartezeit
+        background = ApproximateMedianBackground(self.mosquito_params["background_step"],
+                                                 self.mosquito_params["background_row_stride"])
         
         # Erstelle Session-Verzeichnis
         session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTION BENCHMARK - Durchsatz der Detection-Pipeline messen
+==========================================================
+Synthetische Frame-Streams (640x480, 1080p, 4K) laufen durch die Detection-
+Pfade der Tracker; gemessen wird pro Stufe:
+
+    gate        Motion-Gate (Blockmittel-Vergleich, nur Profile mit 'gate')
+    background  Hintergrundmodell (inkl. Verkleinern/Graustufen)
+    threshold   Schwellwert
+    morphology  Öffnen/Schließen (+ ROI-Maske)
+    contours    Blob-Extraktion (+ Verfeinerung)
+    kernel      Nativer C++-Kernel: background bis Komponenten (master_native)
+    roi         Nur Suchfenster aktiver Tracks (master_roi, Fenster-Frames)
+    filter      Anti-Wolken Filter
+    overlay     Boxen/Texte zeichnen
+
+Ergebnis: FPS (Wall-Clock) und FPS pro Kern (Frames / CPU-Sekunden) je
+Pipeline × Szenario × Auflösung, dazu der Anteil vom Gate übersprungener
+und vom Contour-Storm Guard verworfener Frames sowie der Anteil tatsächlich
+verarbeiteter Pixel (master_roi) - als JSON zum Vergleich zwischen Builds:
+
+    python motion_benchmark.py --resolutions 640x480 1080p --frames 60
+    python motion_benchmark.py --compare benchmarks/motion_alt.json
+
+Die Frame-Erzeugung läuft außerhalb der Messung.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'mosquito_tracking'))
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from create_mosquito_test_data import generate_mosquito_frames, generate_realistic_mosquito_frames
+from create_test_data import generate_moving_square_frames
+from live_mosquito_tracker import ApproximateMedianBackground, LiveMosquitoTracker
+from motion_detection import NATIVE_KERNEL_AVAILABLE, MotionDetector, StageTimer
+from overlay_renderer import DetectionResult
+from tracking_engine import DETECTION_PROFILES, TrackingConfig, TrackingEngine
+
+RESOLUTIONS = {
+    '640x480': (640, 480),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160),
+}
+STAGES = ('gate', 'background', 'threshold', 'morphology', 'kernel', 'contours', 'roi', 'filter',
+          'overlay')
+NOISE_BANK_SIZE = 4  # Vorberechnete Rausch-Frames - 4K-Rauschen pro Frame wäre zu teuer
+
+
+# ------------------------------------------------------------------ Szenarien
+
+def _sky(width, height):
+    """Himmel-Verlauf (BGR, oben dunkler blau)"""
+    ramp = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    sky = np.empty((height, width, 3), np.float32)
+    sky[..., 0] = 200 + 40 * ramp   # B
+    sky[..., 1] = 140 + 60 * ramp   # G
+    sky[..., 2] = 90 + 80 * ramp    # R
+    return sky
+
+
+def _noise_bank(width, height, sigma=3.0):
+    """Sensorrauschen als int16-Frames (zyklisch verwendet)"""
+    rng = np.random.default_rng(1)
+    return [rng.normal(0, sigma, (height, width, 3)).astype(np.int16) for _ in range(NOISE_BANK_SIZE)]
+
+
+def _with_noise(image, noise):
+    return np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def generate_cloud_drift_frames(num_frames, width, height, drift=2.0):
+    """Langsam driftende Wolkenbänke mit leichtem Helligkeitsflackern - ohne echtes Objekt"""
+    unit = width / 640.0
+    rng = np.random.default_rng(7)
+    # Niederfrequentes Rauschen → weiche Wolken, doppelt so breit wie das Bild
+    coarse = rng.random((max(2, height // 64), max(4, (2 * width) // 64)), dtype=np.float32)
+    clouds = cv2.resize(coarse, (2 * width, height), interpolation=cv2.INTER_CUBIC)
+    clouds = cv2.GaussianBlur(clouds, (0, 0), sigmaX=8 * unit)
+    clouds = np.clip((clouds - 0.45) * 3.0, 0.0, 1.0)[..., None]
+
+    sky = _sky(2 * width, height)
+    scene = sky * (1 - clouds) + 235.0 * clouds
+    noise = _noise_bank(width, height)
+    for i in range(num_frames):
+        offset = int(i * drift * unit) % width
+        flicker = 1.0 + 0.02 * np.sin(i * 0.3)
+        frame = np.clip(scene[:, offset:offset + width] * flicker, 0, 255)
+        yield _with_noise(frame, noise[i % NOISE_BANK_SIZE])
+
+
+def generate_bird_frames(num_frames, width, height, num_birds=3):
+    """Dunkle Vögel mit Flügelschlag auf Wellenbahnen vor leicht bewölktem Himmel"""
+    unit = width / 640.0
+    rng = np.random.default_rng(11)
+    sky = _sky(width, height)
+    clouds = cv2.GaussianBlur(rng.random((height, width), dtype=np.float32), (0, 0), sigmaX=20 * unit)
+    sky += ((clouds - clouds.mean()) * 400.0)[..., None]
+    background = np.clip(sky, 0, 255).astype(np.uint8)
+    noise = _noise_bank(width, height)
+
+    birds = [{
+        'x': rng.uniform(0, width),
+        'y': rng.uniform(0.2, 0.8) * height,
+        'vx': rng.uniform(6, 12) * unit * rng.choice((-1, 1)),
+        'phase': rng.uniform(0, 2 * np.pi),
+        'size': rng.uniform(6, 10) * unit,
+    } for _ in range(num_birds)]
+
+    for i in range(num_frames):
+        frame = background.copy()
+        for bird in birds:
+            bird['x'] = (bird['x'] + bird['vx']) % width
+            y = bird['y'] + 20 * unit * np.sin(i * 0.1 + bird['phase'])
+            wing = 0.4 + 0.6 * abs(np.sin(i * 0.8 + bird['phase']))  # Flügelschlag
+            axes = (max(1, int(bird['size'] * 1.5)), max(1, int(bird['size'] * wing)))
+            cv2.ellipse(frame, (int(bird['x']), int(y)), axes, 0, 0, 360, (40, 40, 40), -1)
+        yield _with_noise(frame, noise[i % NOISE_BANK_SIZE])
+
+
+def generate_empty_sky_frames(num_frames, width, height, interval=45, burst=8):
+    """Leerer Himmel mit Sensorrauschen - alle interval Frames kreuzt ein kleines,
+    schnelles Objekt (burst Frames lang). Misst Motion-Gate Ersparnis und Treffer."""
+    unit = width / 640.0
+    background = np.clip(_sky(width, height), 0, 255).astype(np.uint8)
+    noise = _noise_bank(width, height)
+    size = max(2, int(3 * unit))
+    for i in range(num_frames):
+        frame = background.copy()
+        step = i % interval
+        if step < burst:
+            # Schnell (~40 px/Frame bei 640 Breite), diagonal durchs Bild
+            x = int((0.2 + 0.08 * step) * width)
+            y = int((0.3 + 0.04 * step) * height)
+            cv2.circle(frame, (x, y), size, (30, 30, 30), -1)
+        yield _with_noise(frame, noise[i % NOISE_BANK_SIZE])
+
+
+def generate_exposure_jump_frames(num_frames, width, height, period=40):
+    """Vögel vor bewölktem Himmel, die Auto-Belichtung springt alle period Frames
+    (+30 % / -20 %) - ohne Contour-Storm Guard Blob-Flut bei jedem Sprung"""
+    gains = (1.0, 1.3, 0.8)
+    for i, frame in enumerate(generate_bird_frames(num_frames, width, height)):
+        gain = gains[(i // period) % len(gains)]
+        yield frame if gain == 1.0 else cv2.convertScaleAbs(frame, alpha=gain)
+
+
+SCENARIOS = {
+    'mosquito': lambda n, w, h: generate_mosquito_frames(n, w, h),
+    'mosquito_behaviour': lambda n, w, h: (img for img, _ in
+                                           generate_realistic_mosquito_frames(w, h, -(-n // 3))),
+    'moving_square': lambda n, w, h: (img for _, img in generate_moving_square_frames(n, w, h)),
+    'cloud_drift': generate_cloud_drift_frames,
+    'empty_sky': generate_empty_sky_frames,
+    'birds': generate_bird_frames,
+    'exposure_jump': generate_exposure_jump_frames,
+}
+
+
+# ---------------------------------------------------------------- Pipelines
+
+class _TrackerPipeline:
+    """MotionDetector + Anti-Wolken Filter der TrackingEngine
+
+    'overlay' misst das Rendern jedes Frames (Anzeige ohne Drosselung).
+    """
+
+    warmup_frames = 0
+
+    def __init__(self, config, detector_kwargs):
+        self.config = config
+        self.detector = MotionDetector(**detector_kwargs)
+        self.gated = False
+        self.storm = False
+        self.engine = TrackingEngine(config, log=lambda message: None)
+        self.engine.camera_regions = {}  # Keine lokale camera_config.json im Benchmark
+
+    def process(self, frame, timestamp, timer):
+        config = self.config
+        # Wie TrackingEngine.process_motion: Suchfenster aktiver Tracks oder voller Frame
+        windows = self.engine._plan_windows('bench', self.detector, config, frame, timestamp,
+                                            config.detection_scale)
+        if windows is not None:
+            blobs = self.detector.detect_windows(frame, windows, config.min_area, config.max_area,
+                                                 self.engine.camera_regions.get('bench'), timer=timer)
+        else:
+            blobs = self.detector.detect(frame, config.threshold, config.min_area, config.max_area,
+                                         config.detection_scale, config.refine, timer=timer)
+        self.gated = self.detector.gated
+        self.storm = self.detector.storm
+        if self.gated or self.storm:
+            # Kein Filter, nur Rohbild-Anzeige
+            result = DetectionResult.empty('bench', frame, timestamp, gated=self.gated,
+                                           storm=self.detector.foreground_fraction if self.storm else 0.0)
+        else:
+            result = self.engine.apply_motion_filters(frame, 'bench', blobs, config, timestamp,
+                                                      rois=windows)
+        timer.lap('filter')
+        self.engine.render_frames({'bench': result})
+        timer.lap('overlay')
+        return len(blobs)
+
+    @property
+    def pixel_ratio(self):
+        scheduler = self.engine.roi_schedulers.get('bench')
+        return scheduler.pixel_ratio if scheduler is not None else 1.0
+
+    def close(self):
+        self.engine.stream_resolver.stop()
+
+
+class _LiveMosquitoPipeline:
+    """Differenzbild gegen Näherungs-Median (mosquito_tracking/live_mosquito_tracker.py)"""
+
+    warmup_frames = 0
+
+    def __init__(self):
+        self.tracker = LiveMosquitoTracker()
+        params = self.tracker.mosquito_params
+        self.background = ApproximateMedianBackground(params["background_step"],
+                                                      params["background_row_stride"])
+
+    def process(self, frame, timestamp, timer):
+        detections, _ = self.tracker.detect_mosquitos(frame, self.background, timer=timer)
+        start = time.perf_counter()
+        self.tracker.draw_detections(frame, detections)
+        timer.totals['overlay'] = timer.totals.get('overlay', 0.0) + time.perf_counter() - start
+        return len(detections)
+
+    def close(self):
+        pass
+
+
+def _master_pipeline(profile):
+    config = TrackingConfig.from_profile(profile)
+    return _TrackerPipeline(config, config.detector_kwargs)
+
+
+def _master_native_pipeline(profile):
+    # Ohne gebautes motion_kernel_cpp identisch mit 'master' (siehe meta.native_kernel)
+    config = TrackingConfig.from_profile(profile, backend='native')
+    return _TrackerPipeline(config, config.detector_kwargs)
+
+
+def _master_roi_pipeline(profile):
+    # Aktive Tracks nur in vorhergesagten Suchfenstern, voller Scan jeden roi_scan_interval-ten Frame
+    config = TrackingConfig.from_profile(profile, roi_tracking=True)
+    return _TrackerPipeline(config, config.detector_kwargs)
+
+
+def _bird_mosquito_pipeline(profile):
+    # Parameter wie in bird_mosquito_tracker.py (gleiche Anti-Wolken Regeln)
+    config = TrackingConfig.from_profile(profile, detection_scale=1.0, refine=False)
+    return _TrackerPipeline(config, {'history': 300, 'var_threshold': 16,
+                                     'detect_shadows': False, 'kernel_size': 2,
+                                     'gate': {'block': 8, 'sample': 2, 'noise_threshold': 6}})
+
+
+PIPELINES = {
+    'master': _master_pipeline,
+    'master_native': _master_native_pipeline,
+    'master_roi': _master_roi_pipeline,
+    'bird_mosquito': _bird_mosquito_pipeline,
+    'live_mosquito': lambda profile: _LiveMosquitoPipeline(),
+}
+
+
+# ------------------------------------------------------------------- Messung
+
+def run_case(pipeline_name, scenario, resolution, num_frames, profile, warmup=10, seed=42):
+    """Eine Kombination messen - Frames werden ungemessen erzeugt"""
+    width, height = RESOLUTIONS[resolution]
+    random.seed(seed)
+    np.random.seed(seed)
+    pipeline = PIPELINES[pipeline_name](profile)
+    warmup = max(warmup, pipeline.warmup_frames)
+    timer = StageTimer()
+    wall = cpu = 0.0
+    measured = blobs = gated = storms = 0
+    try:
+        frames = SCENARIOS[scenario](num_frames + warmup, width, height)
+        for index, frame in enumerate(frames):
+            timestamp = index / 30.0  # Nominell 30 FPS
+            if index < warmup:
+                # Hintergrundmodell einschwingen lassen - nicht gemessen
+                pipeline.process(frame, timestamp, StageTimer())
+                continue
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            blobs += pipeline.process(frame, timestamp, timer)
+            wall += time.perf_counter() - wall_start
+            cpu += time.process_time() - cpu_start
+            measured += 1
+            gated += getattr(pipeline, 'gated', False)
+            storms += getattr(pipeline, 'storm', False)
+        pixel_ratio = getattr(pipeline, 'pixel_ratio', 1.0)
+    finally:
+        pipeline.close()
+
+    return {
+        'pipeline': pipeline_name,
+        'scenario': scenario,
+        'resolution': resolution,
+        'profile': profile,
+        'frames': measured,
+        'fps': measured / wall if wall > 0 else 0.0,
+        'fps_per_core': measured / cpu if cpu > 0 else 0.0,
+        'stages_ms': {stage: round(timer.totals.get(stage, 0.0) * 1000.0 / max(1, measured), 4)
+                      for stage in STAGES if stage in timer.totals},
+        'blobs_per_frame': blobs / max(1, measured),
+        'gated_ratio': gated / max(1, measured),
+        'storm_ratio': storms / max(1, measured),
+        'pixel_ratio': pixel_ratio,
+    }
+
+
+def _metadata(threads):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        commit = ''
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'opencv_threads': threads,
+        'native_kernel': NATIVE_KERNEL_AVAILABLE,
+    }
+
+
+def _case_key(result):
+    return (result['pipeline'], result['scenario'], result['resolution'], result['profile'])
+
+
+def compare(results, baseline_path):
+    """FPS-Verhältnis zu einem früheren Lauf ausgeben"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {_case_key(result): result for result in json.load(f)['results']}
+    print(f"\n📊 Vergleich mit {baseline_path}")
+    for result in results:
+        old = baseline.get(_case_key(result))
+        if old and old['fps'] > 0:
+            print(f"   {result['pipeline']:14s} {result['scenario']:18s} {result['resolution']:8s} "
+                  f"{old['fps']:8.1f} → {result['fps']:8.1f} FPS ({result['fps'] / old['fps']:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark der Motion-Detection-Pipelines")
+    parser.add_argument('--pipelines', nargs='+', choices=list(PIPELINES), default=list(PIPELINES))
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--resolutions', nargs='+', choices=list(RESOLUTIONS), default=list(RESOLUTIONS))
+    parser.add_argument('--profile', default="🐦 Bird", choices=list(DETECTION_PROFILES),
+                        help="Detection-Profil für master/bird_mosquito")
+    parser.add_argument('--frames', type=int, default=60, help="Gemessene Frames pro Kombination")
+    parser.add_argument('--warmup', type=int, default=10, help="Ungemessene Frames zum Einschwingen")
+    parser.add_argument('--threads', type=int, help="cv2.setNumThreads (Standard: OpenCV-Vorgabe)")
+    parser.add_argument('--output', help="JSON-Datei (Standard: benchmarks/motion_<Zeit>.json)")
+    parser.add_argument('--compare', help="Früheres Ergebnis-JSON zum Vergleich")
+    args = parser.parse_args(argv)
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+
+    results = []
+    for resolution in args.resolutions:
+        for scenario in args.scenarios:
+            for pipeline_name in args.pipelines:
+                result = run_case(pipeline_name, scenario, resolution, args.frames, args.profile, args.warmup)
+                results.append(result)
+                stages = " ".join(f"{stage}={ms:.2f}" for stage, ms in result['stages_ms'].items())
+                print(f"⏱️ {pipeline_name:14s} {scenario:18s} {resolution:8s} "
+                      f"{result['fps']:8.1f} FPS {result['fps_per_core']:8.1f} FPS/Kern "
+                      f"gated {result['gated_ratio']:4.0%} storm {result['storm_ratio']:4.0%} "
+                      f"pixels {result['pixel_ratio']:4.0%} | ms: {stages}")
+
+    output = args.output or os.path.join('benchmarks', datetime.now().strftime("motion_%Y%m%d_%H%M%S.json"))
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'meta': _metadata(cv2.getNumThreads()), 'results': results}, f, indent=2)
+    print(f"💾 Ergebnisse gespeichert: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTION DETECTION - Detection-Pipeline einer Kamera
+==================================================
+Hintergrund-Subtraktion → Threshold → Morphologie → Komponenten → Blobs.
+
+Detection-Pyramide: bei scale < 1 laufen Hintergrundmodell und Blob-Extraktion
+auf einem verkleinerten (optional Graustufen-) Frame. Bounding Boxes und
+Zentren werden auf Vollauflösung zurückgerechnet; optional verfeinert ein
+zweiter Schritt jede Box in Vollauflösung - nur innerhalb der Box. Liegen
+Blobs dicht beieinander, können ihre gepolsterten Boxen zur selben Box
+verfeinert werden - solche Duplikate entfernt suppress_duplicates.
+
+Die Pipeline ist bewusst frei von GUI-/Tracker-Zustand, damit sie sowohl
+im Tracking-Thread als auch in einem eigenen Worker-Prozess laufen kann.
+Ergebnis sind kompakte Blob-Records (NumPy structured array).
+
+Motion-Gate (motion_gate.py): Frames ohne globale Veränderung füttern nur
+das Hintergrundmodell, Threshold/Morphologie/Komponenten entfallen.
+
+Contour-Storm Guard: springt die Belichtung (Sonne, Auto-Exposure), markiert
+das Hintergrundmodell fast das ganze Bild als Vordergrund und es entstehen
+tausende Blobs. Springt der Vordergrund-Anteil um mehr als storm_fraction
+über seine stabile Grundlinie, wird der Frame ohne Blobs zurückgegeben und
+das Hintergrundmodell lernt EINMAL neu. Nach Start, Reset und Größenwechsel
+(Frame-Pacing) wird die Grundlinie erst storm_warmup Frames lang gelernt -
+ein frisches Modell meldet im ersten Frame alles als Vordergrund.
+
+Suchfenster (roi_scheduler.py): detect_windows prüft nur vorhergesagte
+Fenster aktiver Tracks in Vollauflösung gegen das Hintergrundbild des letzten
+vollen Frames - das Hintergrundmodell lernt nur in vollen Frames.
+
+Optionales Backend 'native': der C++-Kernel aus core/motion_kernel.cpp
+(cd core && python setup.py build_ext --inplace) erledigt Graustufen,
+Hintergrund, Threshold, Morphologie und Komponenten in einem OpenMP-Durchlauf
+ohne GIL. Ist das Modul nicht gebaut, bleibt es bei der OpenCV-Pipeline.
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from background_models import create_background_model
+from motion_gate import MotionGate
+from spatial_hash import SpatialHash
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'core'))
+try:
+    import motion_kernel_cpp  # Fusionierter C++-Kernel (optional)
+except ImportError:
+    motion_kernel_cpp = None
+
+NATIVE_KERNEL_AVAILABLE = motion_kernel_cpp is not None
+
+# Kompakter Detection-Record: Bounding Box, Fläche, Zentrum
+BLOB_DTYPE = np.dtype([
+    ('x', np.int32), ('y', np.int32),
+    ('w', np.int32), ('h', np.int32),
+    ('area', np.float32),
+    ('cx', np.int32), ('cy', np.int32),
+])
+
+
+def empty_blobs():
+    """Leeres Blob-Array"""
+    return np.zeros(0, dtype=BLOB_DTYPE)
+
+
+def blobs_from_mask(mask, min_area, max_area):
+    """Binärmaske → Blob-Records (nur Flächen im Bereich min_area..max_area)
+
+    Ein einziger nativer Aufruf (Connected Components mit Statistiken) liefert Boxen,
+    Flächen und Schwerpunkte aller Komponenten als Arrays - der Flächenfilter
+    läuft als Array-Maske, Python sieht keine einzelne Kontur mehr.
+    """
+    # Grana (BBDT): mit Statistiken ~3x schneller als die Standard-Variante
+    count, _, stats, centroids = cv2.connectedComponentsWithStatsWithAlgorithm(
+        mask, 8, cv2.CV_32S, cv2.CCL_GRANA)
+    if count <= 1:
+        return empty_blobs()
+    # Label 0 = Hintergrund
+    return blobs_from_stats(stats[1:], centroids[1:], min_area, max_area)
+
+
+def blobs_from_stats(stats, centroids, min_area, max_area):
+    """Komponenten-Statistiken (x, y, w, h, area je Zeile) + Schwerpunkte → Blob-Records"""
+    if not len(stats):
+        return empty_blobs()
+    areas = stats[:, cv2.CC_STAT_AREA]
+    keep = (areas >= min_area) & (areas <= max_area)
+    if not keep.any():
+        return empty_blobs()
+
+    stats = stats[keep]
+    blobs = np.empty(len(stats), dtype=BLOB_DTYPE)
+    blobs['x'] = stats[:, cv2.CC_STAT_LEFT]
+    blobs['y'] = stats[:, cv2.CC_STAT_TOP]
+    blobs['w'] = stats[:, cv2.CC_STAT_WIDTH]
+    blobs['h'] = stats[:, cv2.CC_STAT_HEIGHT]
+    blobs['area'] = stats[:, cv2.CC_STAT_AREA]
+    centers = np.rint(centroids[keep])
+    blobs['cx'] = centers[:, 0]
+    blobs['cy'] = centers[:, 1]
+    return blobs
+
+
+def scale_blobs(blobs, scale):
+    """Blob-Koordinaten einer verkleinerten Detection auf Vollauflösung abbilden"""
+    if scale == 1.0 or not len(blobs):
+        return blobs
+    inv = 1.0 / scale
+    for field in ('x', 'y', 'w', 'h', 'cx', 'cy'):
+        blobs[field] = np.round(blobs[field] * inv)
+    blobs['area'] *= inv * inv
+    return blobs
+
+
+def suppress_duplicates(blobs, radius):
+    """Blobs, deren Zentrum höchstens radius Pixel neben einem größeren Blob liegt, entfernen"""
+    if len(blobs) < 2:
+        return blobs
+    # Nach Fläche absteigend - der größte Blob einer Gruppe bleibt
+    order = np.argsort(-blobs['area'], kind='stable')
+    centers = np.column_stack((blobs['cx'][order], blobs['cy'][order]))
+    queries, neighbours, _ = SpatialHash(max(radius, 1.0)).build(centers).pairs(centers, radius)
+    duplicate = np.zeros(len(blobs), bool)
+    duplicate[queries[neighbours < queries]] = True
+    if not duplicate.any():
+        return blobs
+    return blobs[np.sort(order[~duplicate])]
+
+
+class StageTimer:
+    """Summiert die Laufzeit pro Pipeline-Stufe (Benchmark/Profiling)
+
+        timer = StageTimer()
+        timer.start()
+        ... ; timer.lap('threshold')   # Zeit seit start()/letztem lap()
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self._last = None
+
+    def start(self):
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.totals[stage] = self.totals.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def reset(self):
+        self.totals = {}
+        self._last = None
+
+
+def _to_gray(image):
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+class NativeMotionKernel:
+    """Zustand des C++-Kernels einer Kamera: Graustufen-Mittelwert (float32)
+
+    Der Kernel kennt nur den laufenden Mittelwert - die Profil-Angabe wird
+    darauf abgebildet: frame_diff = Lernrate 1, sonst learning_rate bzw.
+    1/history. noise_floor erhöht den Threshold.
+    """
+
+    def __init__(self, background=None, history=500):
+        spec = dict(background or {})
+        if spec.get('model') == 'frame_diff':
+            self.learning_rate = 1.0
+        else:
+            rate = spec.get('learning_rate')
+            self.learning_rate = rate if rate is not None and rate >= 0 else \
+                1.0 / max(1, spec.get('history', history))
+        self.noise_floor = spec.get('noise_floor', 0)
+        self.reset()
+
+    def reset(self):
+        self._average = None
+
+    def detect(self, frame, threshold, mask=None):
+        """Ein Kernel-Durchlauf (BGR oder Graustufen) - ROI-Maske wirkt schon vor der Morphologie
+
+        Returns:
+            (stats, centroids, foreground) - stats/centroids wie connectedComponentsWithStats
+            ohne Label 0, foreground = Vordergrund-Pixel nach Threshold, vor der Morphologie
+        """
+        if self._average is None or self._average.shape != frame.shape[:2]:
+            self._average = _to_gray(frame).astype(np.float32)  # Größenwechsel: neu lernen
+            return np.zeros((0, 5), np.int32), np.zeros((0, 2)), 0
+        return motion_kernel_cpp.detect(frame, self._average, threshold + self.noise_floor,
+                                        self.learning_rate, mask)
+
+    def apply(self, frame):
+        """Nur den Mittelwert fortschreiben (gated Frames) - keine Blob-Extraktion"""
+        gray = _to_gray(frame)
+        if self._average is None or self._average.shape != gray.shape:
+            self._average = gray.astype(np.float32)
+        else:
+            cv2.accumulateWeighted(gray, self._average, self.learning_rate)
+
+    def background_image(self):
+        return None if self._average is None else cv2.convertScaleAbs(self._average)
+
+
+class MotionDetector:
+    """Detection-Pipeline mit eigenem Hintergrundmodell (eine Instanz pro Kamera)
+
+    grayscale: Hintergrundmodell auf Graustufen (1 statt 3 Kanäle)
+    refine_threshold: Helligkeitsdifferenz für die Vollauflösungs-Verfeinerung
+    background: Modell-Angabe für background_models (Standard: MOG2 mit
+    history/var_threshold/detect_shadows)
+    backend: 'opencv' oder 'native' (C++-Kernel, 3x3 Morphologie; ohne
+    gebautes Modul bleibt es bei 'opencv' - siehe self.backend)
+    gate: Parameter für motion_gate.MotionGate (None = jeder Frame voll);
+    self.gated sagt, ob der letzte Frame übersprungen wurde
+    storm_fraction: Sprung des Vordergrund-Anteils (0..1) über die stabile
+    Grundlinie, ab dem ein Frame als Helligkeitssprung verworfen wird (0 = aus);
+    self.storm / self.foreground_fraction beschreiben den letzten Frame
+    storm_relearn: Frames, die das Modell nach einem Sprung zum Neulernen bekommt
+    (Reset beim Sprung, währenddessen kein weiterer); wer danach noch über der
+    Schwelle liegt, gilt als neue Grundlinie (0 = kein Reset, Modell passt sich
+    nur mit seiner Lernrate an)
+    storm_warmup: Frames nach Start/Reset/Größenwechsel ohne Prüfung (Grundlinie lernen)
+    """
+
+    REFINE_PADDING = 4  # Pixel (verkleinerte Auflösung) rund um jede Box
+    DUPLICATE_RADIUS = 2.0  # Pixel (Vollauflösung) - verfeinerte Blobs näher beieinander sind eins
+
+    def __init__(self, history=500, var_threshold=16, detect_shadows=True, kernel_size=3,
+                 grayscale=False, refine_threshold=25, background=None, backend='opencv', gate=None,
+                 storm_fraction=0.3, storm_relearn=30, storm_warmup=30):
+        self.native = None
+        if backend == 'native' and NATIVE_KERNEL_AVAILABLE:
+            self.native = NativeMotionKernel(background, history)
+            self.background = self.native  # background_image() für die Verfeinerung
+        else:
+            self.background = create_background_model(
+                background, history=history, var_threshold=var_threshold, detect_shadows=detect_shadows)
+        self.backend = 'native' if self.native is not None else 'opencv'
+        self.gate = MotionGate(**gate) if gate else None
+        self.gated = False
+        self.storm_fraction = storm_fraction
+        self.storm_relearn = storm_relearn
+        self.storm_warmup = storm_warmup
+        self.storm = False
+        self.foreground_fraction = 0.0
+        self._storm_baseline = 0.0  # Geglätteter Vordergrund-Anteil ruhiger Frames
+        self._storm_warmup_left = storm_warmup
+        self._storm_relearn_left = 0  # > 0: Sprung erkannt, Modell lernt neu
+        self._storm_shape = None  # Maskengröße - Wechsel = Modell lernt neu
+        self._window_background = None  # Graustufen-Hintergrund für detect_windows (Cache)
+        self._window_geometry = (1.0, (0, 0))  # (scale, ROI-Offset) des letzten detect()
+        self.kernel = np.ones((kernel_size, kernel_size), np.uint8)
+        self.grayscale = grayscale
+        self.refine_threshold = refine_threshold
+
+    def detect(self, frame, threshold, min_area, max_area, scale=1.0, refine=False, region=None,
+               timer=None):
+        """Finde Bewegungs-Blobs im Frame
+
+        scale < 1.0: Detection auf verkleinertem Frame (Profil-Pyramide bzw.
+        Frame-Pacing bei Überlast). Flächenfilter und Ergebnis gelten
+        trotzdem in Pixeln der Vollauflösung.
+        refine: Boxen anschließend in Vollauflösung verfeinern (nur bei scale < 1)
+        region: camera_config.RegionMask - Zuschnitt auf die ROI vor dem
+        Hintergrundmodell, Ausschluss-Maske vor der Blob-Extraktion
+        timer: optionaler StageTimer - misst gate/background/threshold/morphology/contours
+        (contours = Blob-Extraktion inkl. Verfeinerung), beim nativen Backend
+        gate/kernel/contours
+
+        Returns:
+            np.ndarray mit BLOB_DTYPE (Koordinaten im Frame-Koordinatensystem)
+        """
+        if timer is not None:
+            timer.start()
+        offset = (0, 0)
+        source_shape = frame.shape
+        if region is not None and region.active:
+            frame, offset = region.crop(frame)
+
+        # Globaler Änderungstest auf Blockmittelwerten - fast immer billiger als der Rest
+        self.storm = False
+        self.gated = self.gate is not None and not self.gate.check(frame)
+        if self.gate is not None and timer is not None:
+            timer.lap('gate')
+
+        # Hintergrundmodell ändert sich - Cache der Suchfenster verwerfen
+        self._window_background = None
+        self._window_geometry = (scale, offset)
+
+        full_frame = frame
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            min_area *= scale * scale
+            max_area *= scale * scale
+
+        if self.gated:
+            # Hintergrundmodell lernt weiter, Blob-Extraktion entfällt
+            if self.grayscale and self.native is None:
+                frame = _to_gray(frame)
+            self.background.apply(frame)
+            if timer is not None:
+                timer.lap('background')
+            return empty_blobs()
+
+        if self.native is not None:
+            # Ein Kernel-Aufruf bis zu den Komponenten-Statistiken (Graustufen im Kernel)
+            mask = region.mask_for(source_shape, frame.shape) if region is not None and region.active else None
+            stats, centroids, foreground = self.native.detect(frame, threshold, mask)
+            if timer is not None:
+                timer.lap('kernel')
+            if self._check_storm(foreground, frame.shape[:2]):
+                stats = stats[:0]
+            blobs = scale_blobs(blobs_from_stats(stats, centroids, min_area, max_area), scale)
+        else:
+            blobs = scale_blobs(self._detect_opencv(frame, threshold, min_area, max_area,
+                                                    region, source_shape, timer), scale)
+        if self.gate is not None:
+            self.gate.detected(len(blobs))
+        if refine and scale < 1.0 and len(blobs):
+            blobs = self._refine(full_frame, blobs, scale)
+        if offset != (0, 0) and len(blobs):
+            # Ausschnitt-Koordinaten → Vollbild
+            blobs['x'] += offset[0]
+            blobs['cx'] += offset[0]
+            blobs['y'] += offset[1]
+            blobs['cy'] += offset[1]
+        if timer is not None:
+            timer.lap('contours')
+        return blobs
+
+    def _detect_opencv(self, frame, threshold, min_area, max_area, region, source_shape, timer):
+        """OpenCV-Pipeline: Hintergrundmodell → Threshold → Morphologie → Komponenten"""
+        if self.grayscale:
+            frame = _to_gray(frame)  # Nach dem Verkleinern - weniger Pixel zu konvertieren
+
+        # Background subtraction (Modelle lernen bei Größenwechsel neu)
+        fg_mask = self.background.apply(frame)
+        if timer is not None:
+            timer.lap('background')
+
+        # Apply threshold for sensitivity control
+        _, fg_mask = cv2.threshold(fg_mask, threshold, 255, cv2.THRESH_BINARY)
+
+        # ROI/Ausschlüsse maskieren - Bäume, Dächer etc. liefern keine Blobs
+        # (wie im nativen Kernel vor der Morphologie → gleiches Storm-Maß)
+        if region is not None and region.active:
+            fg_mask = cv2.bitwise_and(fg_mask, region.mask_for(source_shape, fg_mask.shape))
+        if timer is not None:
+            timer.lap('threshold')
+
+        # Helligkeitssprung? Dann weder Morphologie noch Komponenten
+        if self._check_storm(cv2.countNonZero(fg_mask), fg_mask.shape):
+            return empty_blobs()
+
+        # Morphological operations
+        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_OPEN, self.kernel)
+        fg_mask = cv2.morphologyEx(fg_mask, cv2.MORPH_CLOSE, self.kernel)
+        if timer is not None:
+            timer.lap('morphology')
+
+        # Zusammenhängende Komponenten → Blobs (Boxen, Flächen, Zentren in einem Aufruf)
+        return blobs_from_mask(fg_mask, min_area, max_area)
+
+    @property
+    def supports_windows(self):
+        """detect_windows braucht ein gelerntes Hintergrundbild - beim Differenzbild
+        wäre die Referenz nur der letzte volle Frame (Geisterbilder)"""
+        if self.native is not None:
+            return self.native.learning_rate < 1.0
+        return self.background.name != 'frame_diff'
+
+    def detect_windows(self, frame, windows, min_area, max_area, region=None, timer=None):
+        """Blobs nur innerhalb der Suchfenster (K × 4: x0, y0, x1, y1 im Frame)
+
+        Differenz in Vollauflösung zum Hintergrundbild des letzten detect()-Aufrufs
+        → Threshold (refine_threshold) → Morphologie → Komponenten. Das
+        Hintergrundmodell lernt dabei nicht weiter.
+        region: camera_config.RegionMask wie bei detect() - Ausschlüsse gelten
+        auch in den Fenstern
+        timer: optionaler StageTimer - misst 'roi'
+
+        Returns:
+            np.ndarray mit BLOB_DTYPE (Frame-Koordinaten)
+        """
+        if timer is not None:
+            timer.start()
+        self.gated = self.storm = False
+        if self._window_background is None:
+            background = self.background.background_image()
+            if background is None:
+                return empty_blobs()
+            self._window_background = _to_gray(background)
+        background = self._window_background
+        scale, (offset_x, offset_y) = self._window_geometry
+
+        # Fenster auf Frame und den vom Hintergrund abgedeckten ROI-Ausschnitt begrenzen
+        height, width = frame.shape[:2]
+        right = min(width, offset_x + int(background.shape[1] / scale))
+        bottom = min(height, offset_y + int(background.shape[0] / scale))
+        region_mask = None
+        if region is not None and region.active:
+            # Vollauflösungs-Maske des ROI-Ausschnitts (Ursprung = ROI-Offset)
+            _, region_mask = region.prepare(frame.shape)
+            right = min(right, offset_x + region_mask.shape[1])
+            bottom = min(bottom, offset_y + region_mask.shape[0])
+        parts = []
+        for x0, y0, x1, y1 in windows:
+            x0, y0 = max(int(x0), offset_x), max(int(y0), offset_y)
+            x1, y1 = min(int(x1), right), min(int(y1), bottom)
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            bg_crop = self._background_crop(background, x0 - offset_x, y0 - offset_y,
+                                            x1 - offset_x, y1 - offset_y, scale)
+            diff = cv2.absdiff(_to_gray(frame[y0:y1, x0:x1]), bg_crop)
+            _, mask = cv2.threshold(diff, self.refine_threshold, 255, cv2.THRESH_BINARY)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
+            if region_mask is not None:
+                mask = cv2.bitwise_and(mask, region_mask[y0 - offset_y:y1 - offset_y,
+                                                         x0 - offset_x:x1 - offset_x])
+            blobs = blobs_from_mask(mask, min_area, max_area)
+            if len(blobs):
+                blobs['x'] += x0
+                blobs['cx'] += x0
+                blobs['y'] += y0
+                blobs['cy'] += y0
+                parts.append(blobs)
+        blobs = np.concatenate(parts) if parts else empty_blobs()
+        if timer is not None:
+            timer.lap('roi')
+        return blobs
+
+    @staticmethod
+    def _background_crop(background, x0, y0, x1, y1, scale):
+        """Ausschnitt (Vollauflösung) des ggf. verkleinerten Hintergrundbilds"""
+        bx0, by0 = int(x0 * scale), int(y0 * scale)
+        bx1 = min(background.shape[1], max(bx0 + 1, int(np.ceil(x1 * scale))))
+        by1 = min(background.shape[0], max(by0 + 1, int(np.ceil(y1 * scale))))
+        return cv2.resize(background[by0:by1, bx0:bx1], (x1 - x0, y1 - y0),
+                          interpolation=cv2.INTER_LINEAR)
+
+    STORM_BASELINE_RATE = 0.05  # Lernrate der Grundlinie (EMA pro ruhigem Frame)
+
+    def _check_storm(self, foreground, shape):
+        """Contour-Storm: Sprung des Vordergrund-Anteils über die Grundlinie → Frame verwerfen
+
+        Beim Sprung wird das Hintergrundmodell einmal zurückgesetzt; danach werden
+        höchstens storm_relearn Frames verworfen, bis der Anteil wieder nahe der
+        Grundlinie liegt - ohne erneuten Reset. Bleibt er hoch, ist das die
+        neue Grundlinie (z.B. Rauschen einer dunklen Szene).
+        """
+        self.foreground_fraction = foreground / max(1, shape[0] * shape[1])
+        self.storm = False
+        if not self.storm_fraction:
+            return False
+        if shape != self._storm_shape:
+            # Neues/verkleinertes Modell: erster Frame ist komplett Vordergrund
+            self._storm_shape = shape
+            self._storm_warmup_left = self.storm_warmup
+            self._storm_relearn_left = 0
+
+        if self._storm_warmup_left:
+            # Grundlinie lernen - noch nicht prüfen
+            self._storm_warmup_left -= 1
+            self._storm_baseline = self.foreground_fraction
+            return False
+
+        jump = self.foreground_fraction - self._storm_baseline > self.storm_fraction
+        if self._storm_relearn_left:
+            self._storm_relearn_left -= 1
+            if jump and self._storm_relearn_left:
+                self.storm = True
+                return True
+            if jump:
+                # Modell konvergiert nicht zurück - neuer Zustand ist die Grundlinie
+                self._storm_baseline = self.foreground_fraction
+            self._storm_relearn_left = 0
+            return False
+
+        if jump:
+            self.storm = True
+            if self.storm_relearn:
+                self.background.reset()
+            self._storm_relearn_left = max(1, self.storm_relearn or self.storm_warmup)
+            return True
+        self._storm_baseline += self.STORM_BASELINE_RATE * (self.foreground_fraction - self._storm_baseline)
+        return False
+
+    def _refine(self, full_frame, blobs, scale):
+        """Boxen in Vollauflösung nachschärfen - Differenz zum hochskalierten
+        Hintergrundmodell, ausgewertet nur innerhalb jeder (gepolsterten) Box"""
+        background = self.background.background_image()
+        if background is None:
+            return blobs
+        background = _to_gray(background)
+        height, width = full_frame.shape[:2]
+        pad = int(np.ceil(self.REFINE_PADDING / scale))
+
+        for blob in blobs:
+            x0 = max(0, int(blob['x']) - pad)
+            y0 = max(0, int(blob['y']) - pad)
+            x1 = min(width, int(blob['x'] + blob['w']) + pad)
+            y1 = min(height, int(blob['y'] + blob['h']) + pad)
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+
+            # Passender Ausschnitt des (kleinen) Hintergrunds → auf Ausschnittgröße
+            bg_crop = self._background_crop(background, x0, y0, x1, y1, scale)
+            diff = cv2.absdiff(_to_gray(full_frame[y0:y1, x0:x1]), bg_crop)
+            _, mask = cv2.threshold(diff, self.refine_threshold, 255, cv2.THRESH_BINARY)
+            moments = cv2.moments(mask, binaryImage=True)
+            if moments['m00'] < 1:
+                continue  # Nichts gefunden - grobe Box behalten
+
+            points = cv2.findNonZero(mask)
+            x, y, w, h = cv2.boundingRect(points)
+            blob['x'], blob['y'], blob['w'], blob['h'] = x0 + x, y0 + y, w, h
+            blob['cx'] = x0 + int(round(moments['m10'] / moments['m00']))
+            blob['cy'] = y0 + int(round(moments['m01'] / moments['m00']))
+            blob['area'] = moments['m00']
+        return suppress_duplicates(blobs, self.DUPLICATE_RADIUS)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTION GATE - Billiger Vorab-Test auf globale Veränderung
+=========================================================
+Meistens ist der Himmel leer - trotzdem lief pro Frame die komplette
+Pipeline (Threshold, Morphologie, Komponenten, Anti-Wolken Filter). Der Gate
+vergleicht pro Frame nur ein Vorschaubild aus Blockmittelwerten (Standard:
+1/16 Kantenlänge) mit dem des zuletzt voll verarbeiteten Frames:
+
+    max |Blockmittel - Referenz| <= noise_threshold  →  Frame "gated"
+
+Gated Frames füttern weiterhin das Hintergrundmodell, Blob-Extraktion und
+Filter entfallen. Sicherheitsnetze gegen verpasste Objekte:
+
+    Referenz      = letzter VOLL verarbeiteter Frame - langsame Bewegung
+                    summiert sich auf, bis sie die Schwelle überschreitet
+    hold_frames   nach einem Frame mit Blobs bleibt der Gate offen
+    max_gated     spätestens nach so vielen Frames wird voll verarbeitet
+
+Das Vorschaubild entsteht aus einer Stichprobe jedes sample-ten Pixels
+(INTER_NEAREST) und exakt ganzzahligem INTER_AREA - ~0.6 ms bei 1080p statt
+~4 ms für INTER_AREA auf dem Vollbild. sample muss kleiner als die kleinsten
+Objekte sein (Mücken: sample=2).
+"""
+
+import cv2
+
+
+class MotionGate:
+    """Gate einer Kamera
+
+    block: Blockgröße in Pixeln (16 = Vorschau in 1/16 Kantenlänge)
+    noise_threshold: max. Änderung eines Blockmittels (Helligkeitsstufen), die
+    noch als Rauschen gilt
+    sample: Stichproben-Abstand für das Vorschaubild (Teiler von block)
+    hold_frames: Frames, die nach einer Detection ungegated bleiben
+    max_gated: höchstens so viele Frames in Folge überspringen (0 = unbegrenzt)
+    """
+
+    def __init__(self, block=16, noise_threshold=8, sample=4, hold_frames=5, max_gated=15):
+        if block % sample:
+            raise ValueError("block muss ein Vielfaches von sample sein")
+        self.block = block
+        self.noise_threshold = noise_threshold
+        self.sample = sample
+        self.hold_frames = hold_frames
+        self.max_gated = max_gated
+        self.frames = 0
+        self.gated = 0
+        self.last_score = 0.0
+        self.reset()
+
+    def reset(self):
+        """Referenz verwerfen (z.B. nach Größenwechsel) - nächster Frame wird voll verarbeitet"""
+        self._reference = None
+        self._hold = 0
+        self._gated_run = 0
+
+    @property
+    def gated_ratio(self):
+        return self.gated / self.frames if self.frames else 0.0
+
+    def thumbnail(self, frame):
+        """Blockmittelwerte (uint8) - Randpixel, die keinen ganzen Block füllen, entfallen"""
+        height, width = frame.shape[:2]
+        rows, cols = height // self.block, width // self.block
+        if not rows or not cols:
+            return None
+        step = self.block // self.sample
+        if self.sample > 1:
+            frame = cv2.resize(frame, (width // self.sample, height // self.sample),
+                               interpolation=cv2.INTER_NEAREST)
+        return cv2.resize(frame[:rows * step, :cols * step], (cols, rows), interpolation=cv2.INTER_AREA)
+
+    def check(self, frame):
+        """True = Frame voll verarbeiten, False = gated (nur Hintergrundmodell füttern)"""
+        self.frames += 1
+        thumb = self.thumbnail(frame)
+        reference = self._reference
+        if thumb is None or reference is None or reference.shape != thumb.shape:
+            self._open(thumb)
+            return True
+
+        self.last_score = float(cv2.absdiff(thumb, reference).max())
+        if (self.last_score > self.noise_threshold or self._hold > 0 or
+                (self.max_gated and self._gated_run >= self.max_gated)):
+            self._hold = max(0, self._hold - 1)
+            self._open(thumb)
+            return True
+
+        self.gated += 1
+        self._gated_run += 1
+        return False
+
+    def detected(self, count):
+        """Ergebnis des voll verarbeiteten Frames - Blobs halten den Gate offen"""
+        if count:
+            self._hold = self.hold_frames
+
+    def _open(self, thumb):
+        self._reference = thumb
+        self._gated_run = 0
+
+    def summary(self):
+        return f"{self.gated}/{self.frames} Frames ohne Bewegung übersprungen ({self.gated_ratio:.0%})"
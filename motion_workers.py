@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MOTION WORKERS - Detection-Pipeline pro Kamera in eigenem Prozess
+=================================================================
+Jede Kamera bekommt einen Worker-Prozess mit eigenem Hintergrundmodell.
+Frames werden NICHT gepickelt, sondern über multiprocessing.shared_memory
+übergeben - über die Queues laufen nur kleine Task-Tupel und die kompakten
+Blob-Records zurück. Damit skaliert die Detection mit der Anzahl Kerne.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from motion_detection import MotionDetector
+
+
+def _detection_worker(shm_name, shape, dtype_str, task_queue, result_queue, detector_kwargs):
+    """Worker-Prozess: liest Frames aus Shared Memory, liefert Blobs zurück"""
+    import cv2
+    cv2.setNumThreads(1)  # Ein Kern pro Kamera - keine Überbelegung
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frame = np.ndarray(shape, dtype=np.dtype(dtype_str), buffer=shm.buf)
+    detector = MotionDetector(**detector_kwargs)
+    current_region = None
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            seq, threshold, min_area, max_area, scale, refine, region = task
+            if region is not None and region == current_region:
+                region = current_region  # Gecachte Masken weiterverwenden
+            current_region = region
+            try:
+                blobs = detector.detect(frame, threshold, min_area, max_area, scale, refine, region)
+                storm = detector.foreground_fraction if detector.storm else 0.0
+                result_queue.put((seq, blobs, None, detector.gated, storm))
+            except Exception as e:
+                result_queue.put((seq, None, str(e), False, 0.0))
+    finally:
+        del frame
+        shm.close()
+
+
+class _CameraWorker:
+    """Ein Worker-Prozess + Shared-Memory-Frame für eine Kamera"""
+
+    def __init__(self, ctx, shape, dtype, detector_kwargs):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.frame = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        self.task_queue = ctx.Queue(maxsize=2)
+        self.result_queue = ctx.Queue(maxsize=2)
+        self.seq = 0
+        self.in_flight = 0  # seq der laufenden Aufgabe (0 = frei) - liest self.frame
+        self.late = False   # Letzte Frist verpasst (nur einmal pro Episode loggen)
+        self.process = ctx.Process(
+            target=_detection_worker,
+            args=(self.shm.name, self.shape, self.dtype.str,
+                  self.task_queue, self.result_queue, detector_kwargs),
+            daemon=True,
+        )
+        self.process.start()
+
+    def ready(self):
+        """Ist die laufende Aufgabe fertig? Verspätete Ergebnisse werden verworfen"""
+        while self.in_flight:
+            try:
+                seq = self.result_queue.get_nowait()[0]
+            except queue.Empty:
+                return False
+            if seq == self.in_flight:
+                self.in_flight = 0
+        return True
+
+    def close(self, timeout=1.0):
+        try:
+            self.task_queue.put_nowait(None)
+        except Exception:
+            pass
+        self.process.join(timeout=timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        del self.frame
+        self.shm.close()
+        self.shm.unlink()
+
+
+class DetectionWorkerPool:
+    """Ein Detection-Prozess pro Kamera mit Shared-Memory-Frametransport
+
+    Verwendung pro Tracking-Iteration:
+        pool.submit(name, frame, ...)   # für alle Kameras mit neuem Frame
+        deadline = pool.deadline()      # EINE Frist für alle Kameras
+        blobs = pool.collect(name, deadline=deadline)  # danach Ergebnisse einsammeln
+    """
+
+    COLLECT_TIMEOUT = 2.0  # Sekunden - Frist für die Ergebnisse einer Iteration
+
+    def __init__(self, log=None, detector_kwargs=None):
+        self.ctx = mp.get_context('spawn')  # Identisch auf Windows und Linux
+        self.detector_kwargs = detector_kwargs or {}  # MotionDetector-Konfiguration
+        self.workers = {}
+        self.gated = {}  # Motion-Gate: letzter Frame pro Kamera übersprungen?
+        self.storm = {}  # Contour-Storm: Vordergrund-Anteil des verworfenen Frames (0 = keiner)
+        self.log = log or print
+
+    def submit(self, name, frame, threshold, min_area, max_area, scale=1.0, refine=False, region=None):
+        """Kopiere Frame ins Shared Memory und starte die Detection
+
+        Returns:
+            seq der Aufgabe oder None, wenn der Worker noch am vorigen Frame
+            rechnet (z.B. nach einem Timeout) - der Frame wird übersprungen
+        """
+        worker = self.workers.get(name)
+        if worker is not None and not worker.process.is_alive():
+            self.log(f"⚠️ {name}: Detection-Prozess beendet - starte neu")
+            worker.close()
+            worker = None
+        if worker is None or worker.shape != frame.shape or worker.dtype != frame.dtype:
+            if worker is not None:
+                worker.close()
+            worker = _CameraWorker(self.ctx, frame.shape, frame.dtype, self.detector_kwargs)
+            self.workers[name] = worker
+            self.log(f"⚡ Detection-Prozess für {name} gestartet (PID {worker.process.pid})")
+        elif not worker.ready():
+            return None  # Shared Memory wird noch gelesen - nicht überschreiben
+
+        np.copyto(worker.frame, frame)
+        worker.seq += 1
+        try:
+            # RegionMask wird nur als Polygone übertragen (klein), Masken baut der Worker
+            worker.task_queue.put((worker.seq, threshold, min_area, max_area, scale, refine, region),
+                                  timeout=1.0)
+        except queue.Full:
+            self.log(f"⚠️ {name}: Detection-Prozess überlastet - Frame übersprungen")
+            return None
+        worker.in_flight = worker.seq
+        return worker.seq
+
+    def deadline(self, timeout=None):
+        """Gemeinsame Frist (time.monotonic) für collect() aller Kameras einer Iteration"""
+        return time.monotonic() + (self.COLLECT_TIMEOUT if timeout is None else timeout)
+
+    def collect(self, name, timeout=None, deadline=None):
+        """Warte auf das Ergebnis des zuletzt übergebenen Frames
+
+        deadline: gemeinsame Frist aus deadline() - ein hängender Worker kostet
+        die Iteration höchstens einmal COLLECT_TIMEOUT, nicht einmal pro Kamera
+        timeout: ohne deadline die Wartezeit dieser Kamera (Standard COLLECT_TIMEOUT)
+
+        Returns:
+            Blob-Array oder None bei Fehler/Timeout (self.gated[name]: vom Gate übersprungen,
+            self.storm[name]: wegen Helligkeitssprung verworfen)
+        """
+        worker = self.workers.get(name)
+        if worker is None:
+            return None
+        if deadline is None:
+            deadline = self.deadline(timeout)
+        while True:
+            try:
+                seq, blobs, error, gated, storm = worker.result_queue.get(
+                    timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                if not worker.late:
+                    self.log(f"⚠️ {name}: Detection-Prozess antwortet nicht - Frames werden übersprungen")
+                worker.late = True
+                if not worker.process.is_alive():
+                    worker.close()
+                    del self.workers[name]
+                return None
+            worker.late = False
+            if seq == worker.in_flight:
+                worker.in_flight = 0
+            if seq != worker.seq:
+                continue  # Veraltetes Ergebnis verwerfen
+            if error:
+                self.log(f"❌ {name} Detection-Fehler: {error}")
+                return None
+            self.gated[name] = gated
+            self.storm[name] = storm
+            return blobs
+
+    def close(self):
+        """Beende alle Worker-Prozesse und gib Shared Memory frei"""
+        for name, worker in list(self.workers.items()):
+            try:
+                worker.close()
+            except Exception as e:
+                self.log(f"⚠️ {name} Worker-Stop-Fehler: {str(e)}")
+        self.workers.clear()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MULTI-OBJECT TRACKER - Kalman-Tracks mit globaler Zuordnung pro Frame
+=====================================================================
+Statt jede Detection per Python-Schleife an die nächstgelegene letzte
+Position zu hängen (O(Detections × Tracks), neuer Track bei jedem Fehlgriff),
+hält der Tracker pro Objekt einen 2D-Kalman-Zustand (Position +
+Geschwindigkeit, konstantes Tempo) in vorab allokierten Arrays:
+
+    1. Vorhersage      alle Tracks auf einmal (gemeinsames dt)
+    2. Kandidaten      Paare Vorhersage ↔ Detection innerhalb max_distance
+                       über ein Raster (spatial_hash) - nur Nachbarzellen
+    3. Zuordnung       global optimal (Hungarian) - zerlegt in unabhängige
+                       Gruppen, eindeutige Paare ohne Solver
+    4. Korrektur       Kalman-Update aller zugeordneten Tracks auf einmal
+
+Track-Zustände:
+
+    TENTATIVE   neu - wird nach confirm_hits Treffern CONFIRMED,
+                verschwindet beim ersten Fehlgriff
+    CONFIRMED   bestätigtes Objekt
+    LOST        bestätigt, aber ohne Treffer - nach max_lost Frames gelöscht
+
+Für die Zuordnung wird scipy.optimize.linear_sum_assignment verwendet,
+falls installiert, sonst eine eigene Hungarian-Implementierung.
+
+    tracker = MultiObjectTracker(max_distance=50)
+    ids = tracker.update(points, timestamp)   # Track-ID pro Detection
+    confirmed = tracker.tracks(CONFIRMED)
+"""
+
+import numpy as np
+
+from spatial_hash import SpatialHash
+
+try:
+    from scipy.optimize import linear_sum_assignment  # Optional - schneller für große Gruppen
+except ImportError:
+    linear_sum_assignment = None
+
+FREE, TENTATIVE, CONFIRMED, LOST = 0, 1, 2, 3
+STATE_NAMES = ('FREE', 'TENTATIVE', 'CONFIRMED', 'LOST')
+
+TRACK_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('x', np.float32), ('y', np.float32),     # Geschätzte Position (Pixel)
+    ('vx', np.float32), ('vy', np.float32),   # Geschwindigkeit (Pixel pro Sekunde)
+    ('state', np.int8),
+    ('hits', np.int32),
+    ('misses', np.int32),                     # Frames in Folge ohne Treffer
+])
+
+
+def hungarian(cost):
+    """Minimale Zuordnung für eine (n × m) Kostenmatrix
+
+    Kürzeste augmentierende Pfade mit Potentialen (O(n² m)), die innere
+    Schleife über die Spalten läuft als Array-Operation.
+
+    Returns:
+        (rows, cols) wie scipy.optimize.linear_sum_assignment
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = hungarian(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, np.int64)   # owner[j] = Zeile (1-basiert) in Spalte j, 0 = frei
+    way = np.zeros(m + 1, np.int64)
+    for row in range(1, n + 1):
+        owner[0] = row
+        column = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, bool)
+        while True:
+            used[column] = True
+            current = owner[column]
+            free = ~used[1:]
+            slack = cost[current - 1] - u[current] - v[1:]
+            better = free & (slack < min_slack[1:])
+            min_slack[1:][better] = slack[better]
+            way[1:][better] = column
+            candidates = np.where(free, min_slack[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_slack[~used] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        # Augmentierenden Pfad umlegen
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+
+    cols = np.flatnonzero(owner[1:])
+    rows = owner[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def _solve(cost):
+    if cost.shape[0] == 1:  # Eine Zeile/Spalte: einfach das Minimum
+        return np.zeros(1, np.int64), np.array([np.argmin(cost[0])])
+    if cost.shape[1] == 1:
+        return np.array([np.argmin(cost[:, 0])]), np.zeros(1, np.int64)
+    if linear_sum_assignment is not None:
+        return linear_sum_assignment(cost)
+    return hungarian(cost)
+
+
+def assign(rows, cols, costs, num_rows, num_cols):
+    """Global minimale Zuordnung auf einer dünnen Kandidatenliste
+
+    rows/cols/costs: erlaubte Paare (außerhalb des Gates gar nicht enthalten).
+    Paare, deren Zeile und Spalte nur diesen einen Kandidaten haben, werden
+    direkt übernommen; der Rest zerfällt in unabhängige Gruppen, die jeweils
+    einzeln gelöst werden.
+
+    Returns:
+        (rows, cols) der zugeordneten Paare
+    """
+    if not len(rows):
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    row_degree = np.bincount(rows, minlength=num_rows)
+    col_degree = np.bincount(cols, minlength=num_cols)
+    unique = (row_degree[rows] == 1) & (col_degree[cols] == 1)
+    matched_rows = [rows[unique]]
+    matched_cols = [cols[unique]]
+
+    rows, cols, costs = rows[~unique], cols[~unique], costs[~unique]
+    if len(rows):
+        # Gruppen = Zusammenhangskomponenten des Kandidaten-Graphen (Union-Find)
+        parent = np.arange(num_rows + num_cols)
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            a, b = find(row), find(num_rows + col)
+            if a != b:
+                parent[a] = b
+        groups = np.array([find(row) for row in rows.tolist()])
+
+        order = np.argsort(groups, kind='stable')
+        boundaries = np.flatnonzero(np.diff(groups[order])) + 1
+        for members in np.split(order, boundaries):
+            group_rows, row_index = np.unique(rows[members], return_inverse=True)
+            group_cols, col_index = np.unique(cols[members], return_inverse=True)
+            # Nicht erlaubte Paare teurer als jede erlaubte Zuordnung
+            blocked = costs[members].max() * (len(group_rows) + 1) + 1.0
+            cost = np.full((len(group_rows), len(group_cols)), blocked)
+            cost[row_index, col_index] = costs[members]
+            solved_rows, solved_cols = _solve(cost)
+            allowed = cost[solved_rows, solved_cols] < blocked
+            matched_rows.append(group_rows[solved_rows[allowed]])
+            matched_cols.append(group_cols[solved_cols[allowed]])
+
+    return np.concatenate(matched_rows), np.concatenate(matched_cols)
+
+
+class MultiObjectTracker:
+    """Kalman-Multi-Object-Tracker einer Kamera (eine Instanz pro Kamera)
+
+    max_distance: max. Abstand (Pixel) Detection ↔ vorhergesagte Position
+    confirm_hits: Treffer, bis ein Track als bestätigt gilt
+    max_lost: Frames ohne Treffer, nach denen ein bestätigter Track gelöscht wird
+    measurement_noise: Messrauschen der Zentren (Pixel, Standardabweichung)
+    acceleration_noise: Beschleunigungsrauschen (Pixel/s², Standardabweichung) -
+    hoch für zackig fliegende Insekten, niedrig für Flugzeuge
+    initial_speed: Unsicherheit der Startgeschwindigkeit (Pixel/s)
+    capacity: Startgröße der Track-Arrays (wächst bei Bedarf)
+    """
+
+    def __init__(self, max_distance=50.0, confirm_hits=3, max_lost=10, measurement_noise=2.0,
+                 acceleration_noise=1000.0, initial_speed=300.0, capacity=64):
+        self.max_distance = max_distance
+        self.confirm_hits = confirm_hits
+        self.max_lost = max_lost
+        self.measurement_noise = measurement_noise
+        self.acceleration_noise = acceleration_noise
+        self.initial_speed = initial_speed
+        self.next_id = 0
+        self._index = SpatialHash(max_distance)
+        self._allocate(capacity)
+        self.reset()
+
+    def _allocate(self, capacity):
+        self.state = np.zeros((capacity, 4))          # x, y, vx, vy
+        self.covariance = np.zeros((capacity, 4, 4))
+        self.status = np.zeros(capacity, np.int8)     # FREE/TENTATIVE/CONFIRMED/LOST
+        self.ids = np.full(capacity, -1, np.int64)
+        self.hits = np.zeros(capacity, np.int32)
+        self.misses = np.zeros(capacity, np.int32)
+
+    def _grow(self, needed):
+        capacity = len(self.status)
+        while capacity < needed:
+            capacity *= 2
+        old = (self.state, self.covariance, self.status, self.ids, self.hits, self.misses)
+        self._allocate(capacity)
+        for new, previous in zip((self.state, self.covariance, self.status, self.ids, self.hits,
+                                  self.misses), old):
+            new[:len(previous)] = previous
+
+    def reset(self):
+        self.status[:] = FREE
+        self.ids[:] = -1
+        self.last_timestamp = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.status))
+
+    def predict(self, dt):
+        """Alle aktiven Tracks um dt Sekunden fortschreiben (konstante Geschwindigkeit)"""
+        active = np.flatnonzero(self.status)
+        if not len(active) or dt <= 0:
+            return active
+        transition = np.eye(4)
+        transition[0, 2] = transition[1, 3] = dt
+        # Diskretes Weißes-Rauschen-Beschleunigungsmodell
+        q = self.acceleration_noise ** 2
+        noise = np.zeros((4, 4))
+        noise[[0, 1], [0, 1]] = q * dt ** 4 / 4
+        noise[[0, 1, 2, 3], [2, 3, 0, 1]] = q * dt ** 3 / 2
+        noise[[2, 3], [2, 3]] = q * dt ** 2
+        self.state[active] = self.state[active] @ transition.T
+        self.covariance[active] = transition @ self.covariance[active] @ transition.T + noise
+        return active
+
+    def forecast(self, timestamp):
+        """Vorhersage aller aktiven Tracks für timestamp, ohne den Zustand zu ändern
+
+        Returns:
+            (positions, sigma) - je (K, 2): Position und Standardabweichung
+            der erwarteten Messung (Pixel) in x/y
+        """
+        active = np.flatnonzero(self.status)
+        dt = 0.0 if self.last_timestamp is None else max(0.0, timestamp - self.last_timestamp)
+        state, covariance = self.state[active], self.covariance[active]
+        positions = state[:, :2] + state[:, 2:] * dt
+        variance = (covariance[:, [0, 1], [0, 1]] + 2 * dt * covariance[:, [0, 1], [2, 3]]
+                    + dt ** 2 * covariance[:, [2, 3], [2, 3]]
+                    + self.acceleration_noise ** 2 * dt ** 4 / 4 + self.measurement_noise ** 2)
+        return positions, np.sqrt(variance)
+
+    def _candidate_pairs(self, predicted, points):
+        """Alle Paare (Track, Detection) innerhalb max_distance → (rows, cols, Abstand)"""
+        if self._index.cell_size != self.max_distance:
+            self._index = SpatialHash(self.max_distance)  # max_distance zur Laufzeit geändert
+        return self._index.build(points).pairs(predicted, self.max_distance)
+
+    def update(self, points, timestamp):
+        """Detections eines Frames zuordnen und Tracks fortschreiben
+
+        points: (N, 2) Zentren in Pixeln
+        timestamp: Capture-Zeit (Sekunden)
+
+        Returns:
+            Track-ID pro Detection (int64, N) - nicht zugeordnete Detections
+            eröffnen einen neuen (TENTATIVE) Track
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        dt = 0.0 if self.last_timestamp is None else timestamp - self.last_timestamp
+        self.last_timestamp = timestamp
+        active = self.predict(dt)
+
+        track_index, detection_index = assign(
+            *self._candidate_pairs(self.state[active, :2], points), len(active), len(points))
+        matched_tracks = active[track_index]
+        self._correct(matched_tracks, points[detection_index])
+
+        # Zustandswechsel: Treffer bestätigen, Fehlgriffe altern lassen
+        self.hits[matched_tracks] += 1
+        self.misses[matched_tracks] = 0
+        matched = self.status[matched_tracks]
+        self.status[matched_tracks] = np.where(
+            (matched == LOST) | (self.hits[matched_tracks] >= self.confirm_hits), CONFIRMED, matched)
+
+        missed = np.setdiff1d(active, matched_tracks, assume_unique=True)
+        self.misses[missed] += 1
+        state = self.status[missed]
+        state = np.where(state == CONFIRMED, LOST, state)
+        state[(state == TENTATIVE) | (self.misses[missed] > self.max_lost)] = FREE
+        self.status[missed] = state
+        self.ids[missed[state == FREE]] = -1
+
+        ids = np.full(len(points), -1, np.int64)
+        ids[detection_index] = self.ids[matched_tracks]
+        unmatched = np.setdiff1d(np.arange(len(points)), detection_index, assume_unique=True)
+        if len(unmatched):
+            ids[unmatched] = self._spawn(points[unmatched])
+        return ids
+
+    def _correct(self, tracks, points):
+        """Kalman-Update der zugeordneten Tracks (Messung = Position)"""
+        if not len(tracks):
+            return
+        covariance = self.covariance[tracks]
+        innovation = points - self.state[tracks, :2]
+        innovation_cov = covariance[:, :2, :2] + np.eye(2) * self.measurement_noise ** 2
+        gain = covariance[:, :, :2] @ np.linalg.inv(innovation_cov)     # (n, 4, 2)
+        self.state[tracks] += (gain @ innovation[:, :, None])[:, :, 0]
+        self.covariance[tracks] = covariance - gain @ covariance[:, :2, :]
+
+    def _spawn(self, points):
+        """Neue TENTATIVE Tracks für nicht zugeordnete Detections → IDs"""
+        free = np.flatnonzero(self.status == FREE)
+        if len(free) < len(points):
+            self._grow(len(self.status) - len(free) + len(points))
+            free = np.flatnonzero(self.status == FREE)
+        slots = free[:len(points)]
+        ids = np.arange(self.next_id, self.next_id + len(points), dtype=np.int64)
+        self.next_id += len(points)
+
+        self.state[slots, :2] = points
+        self.state[slots, 2:] = 0.0
+        self.covariance[slots] = np.diag([self.measurement_noise ** 2] * 2 + [self.initial_speed ** 2] * 2)
+        self.status[slots] = CONFIRMED if self.confirm_hits <= 1 else TENTATIVE
+        self.ids[slots] = ids
+        self.hits[slots] = 1
+        self.misses[slots] = 0
+        return ids
+
+    def tracks(self, *states):
+        """Aktive Tracks als TRACK_DTYPE-Records (optional nur bestimmte Zustände)"""
+        mask = np.isin(self.status, states) if states else self.status != FREE
+        slots = np.flatnonzero(mask)
+        records = np.zeros(len(slots), TRACK_DTYPE)
+        records['id'] = self.ids[slots]
+        records['x'], records['y'] = self.state[slots, 0], self.state[slots, 1]
+        records['vx'], records['vy'] = self.state[slots, 2], self.state[slots, 3]
+        records['state'] = self.status[slots]
+        records['hits'] = self.hits[slots]
+        records['misses'] = self.misses[slots]
+        return records
+
+    def states_of(self, ids):
+        """Zustand (TENTATIVE/CONFIRMED/LOST, FREE = gelöscht) zu Track-IDs"""
+        ids = np.asarray(ids)
+        states = np.zeros(len(ids), np.int8)
+        active = np.flatnonzero(self.status)
+        if len(active):
+            slots = active[np.argsort(self.ids[active])]
+            position = np.minimum(np.searchsorted(self.ids[slots], ids), len(slots) - 1)
+            found = self.ids[slots[position]] == ids
+            states[found] = self.status[slots[position[found]]]
+        return states
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OVERLAY RENDERER - Annotationen nur für angezeigte Frames
+=========================================================
+Die Detection liefert pro Kamera nur ein strukturiertes DetectionResult
+(Rohframe-Referenz, Blobs, Filter-Ergebnis) - ohne Frame-Kopie und ohne
+Zeichnen. Boxen, Filter-Gründe und Kopfzeilen zeichnet der OverlayRenderer
+erst, wenn ein Frame wirklich angezeigt oder gespeichert wird, und höchstens
+mit der Anzeige-Wiederholrate:
+
+    if renderer.due():
+        image = renderer.render(result, header_lines)
+"""
+
+import time
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from anti_cloud_filter import describe_reasons
+from motion_detection import BLOB_DTYPE
+
+
+@dataclass
+class DetectionResult:
+    """Ergebnis einer Kamera für einen Frame (keine Zeichnungen, keine Kopie)"""
+    camera: str
+    frame: np.ndarray       # Rohframe - nur lesen, Renderer kopiert vor dem Zeichnen
+    timestamp: float        # Capture-Zeit (time.monotonic() Sekunden)
+    blobs: np.ndarray       # BLOB_DTYPE
+    passes: np.ndarray      # bool pro Blob - Anti-Wolken Filter bestanden
+    reasons: np.ndarray     # Regel-Codes pro Blob (anti_cloud_filter)
+    gated: bool = False     # Motion-Gate: Frame ohne Blob-Extraktion/Filter
+    storm: float = 0.0      # Contour-Storm: Vordergrund-Anteil des verworfenen Frames (0 = keiner)
+    track_ids: np.ndarray = None  # Track-ID pro Blob (multi_object_tracker, -1 = keine)
+    rois: np.ndarray = None  # Suchfenster (K × 4: x0, y0, x1, y1) - None = voller Frame verarbeitet
+
+    @classmethod
+    def empty(cls, camera, frame, timestamp, gated=False, storm=0.0):
+        """Ergebnis ohne Blobs (z.B. vom Motion-Gate übersprungener Frame)"""
+        return cls(camera, frame, timestamp, np.zeros(0, dtype=BLOB_DTYPE),
+                   np.zeros(0, bool), np.zeros((0, 3), np.uint8), gated, storm)
+
+    @property
+    def motion_count(self):
+        return len(self.blobs)
+
+    @property
+    def filtered_count(self):
+        return int(np.count_nonzero(self.passes))
+
+
+class OverlayRenderer:
+    """Zeichnet DetectionResults bei Bedarf, gedrosselt auf max_fps
+
+    Kopfzeilen: Liste von (Text, (x, y), Schriftgröße, Farbe, Strichstärke)
+    """
+
+    def __init__(self, max_fps=30.0):
+        self.max_fps = max_fps
+        self._last_render = -np.inf
+
+    def due(self, now=None):
+        """True wenn seit dem letzten Anzeige-Frame genug Zeit vergangen ist"""
+        now = time.monotonic() if now is None else now
+        if self.max_fps and now - self._last_render < 1.0 / self.max_fps:
+            return False
+        self._last_render = now
+        return True
+
+    def render(self, result, header_lines=(), region=None, annotate=True):
+        """Annotierte Kopie des Frames (annotate=False: nur Kopie - Frame-Pacing bei Überlast)"""
+        image = result.frame.copy()
+        if not annotate:
+            return image
+
+        blobs, passes, reasons = result.blobs, result.passes, result.reasons
+        # Red = filtered out
+        for index in np.flatnonzero(~passes):
+            blob = blobs[index]
+            x, y, w, h = int(blob['x']), int(blob['y']), int(blob['w']), int(blob['h'])
+            cv2.rectangle(image, (x, y), (x+w, y+h), (0, 0, 255), 2)
+            cv2.putText(image, f'M{index + 1}',
+                       (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1)
+            cv2.putText(image, describe_reasons(reasons[index]),
+                       (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 0, 255), 1)
+
+        # Green = passes filter (Label = Track-ID, falls getrackt)
+        track_ids = result.track_ids
+        for number, index in enumerate(np.flatnonzero(passes), 1):
+            blob = blobs[index]
+            x, y, w, h = int(blob['x']), int(blob['y']), int(blob['w']), int(blob['h'])
+            label = f'#{track_ids[index]}' if track_ids is not None and track_ids[index] >= 0 else f'F{number}'
+            cv2.rectangle(image, (x, y), (x+w, y+h), (0, 255, 0), 3)
+            cv2.putText(image, label,
+                       (x, y-25), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            cv2.putText(image, describe_reasons(reasons[index]),
+                       (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.3, (0, 255, 0), 1)
+
+        if result.rois is not None:
+            # Nur die vorhergesagten Suchfenster aktiver Tracks wurden verarbeitet
+            for x0, y0, x1, y1 in result.rois:
+                cv2.rectangle(image, (int(x0), int(y0)), (int(x1), int(y1)), (255, 255, 0), 1)
+
+        if result.storm:
+            # Helligkeitssprung - Hintergrundmodell lernt neu
+            cv2.putText(image, f'LIGHT CHANGE {result.storm:.0%} - relearning',
+                        (10, image.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
+
+        if region is not None:
+            region.draw(image)
+
+        for text, origin, font_scale, color, thickness in header_lines:
+            cv2.putText(image, text, origin, cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, thickness)
+        return image
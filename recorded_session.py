@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RECORDED SESSION - Multi-Kamera-Sessions aufnehmen und abspielen
+================================================================
+Eine Session ist ein Verzeichnis mit einem Unterordner pro Kamera:
+
+    <session>/session.json              Metadaten (Kameras, Erstellzeit)
+    <session>/<kamera>/index.bin        Zeitstempel-Index (binär)
+    <session>/<kamera>/segment_00000.avi  Video-Segmente
+
+Jeder Index-Record (INDEX_RECORD, little endian) enthält:
+    frame_no          fortlaufende Frame-Nummer der Kamera
+    capture_ns        Capture-Zeitstempel (monotonic ns der Aufnahme)
+    segment           Nummer der Segment-Datei
+    frame_in_segment  Frame-Offset innerhalb des Segments
+
+ReplayCapture verhält sich wie cv2.VideoCapture und liefert die Frames
+mit ihren ORIGINALEN Capture-Zeitstempeln - entweder im aufgezeichneten
+Tempo (optional beschleunigt) oder so schnell wie die CPU erlaubt.
+
+SessionRecorder schreibt genau dieses Format: Rohframes aller Kameras
+laufen über eine begrenzte Queue in einen Encoder-Thread. Kommt der
+Encoder nicht hinterher, werden Frames verworfen und gezählt - die
+Capture-/Tracking-Threads blockieren nie.
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+SESSION_FILE = "session.json"
+INDEX_FILE = "index.bin"
+SEGMENT_PATTERN = "segment_{:05d}.avi"
+
+INDEX_RECORD = struct.Struct('<QqII')
+INDEX_DTYPE = np.dtype([
+    ('frame_no', '<u8'),
+    ('capture_ns', '<i8'),
+    ('segment', '<u4'),
+    ('frame_in_segment', '<u4'),
+])
+
+
+def load_index(index_path):
+    """Lese den Zeitstempel-Index einer Kamera (unvollständiger letzter Record wird ignoriert)"""
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % INDEX_DTYPE.itemsize
+    return np.frombuffer(data[:usable], dtype=INDEX_DTYPE)
+
+
+def list_session_cameras(session_dir):
+    """Kameranamen einer Session (aus session.json, sonst aus den Unterordnern)"""
+    meta_path = os.path.join(session_dir, SESSION_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            cameras = json.load(f).get('cameras', [])
+        if cameras:
+            return list(cameras)
+    return sorted(
+        name for name in os.listdir(session_dir)
+        if os.path.exists(os.path.join(session_dir, name, INDEX_FILE))
+    )
+
+
+class ReplaySession:
+    """Gemeinsame Replay-Uhr aller Kameras einer Session
+
+    speed > 0: aufgezeichnetes Tempo (1.0 = Echtzeit, 4.0 = 4x schneller)
+    speed <= 0: maximale Geschwindigkeit - Kameras werden nach Capture-
+                Zeitstempel gemischt, damit sie synchron bleiben
+    """
+
+    MAX_SPEED_SLACK_NS = 50_000_000  # Kameras dürfen sich um 50ms überholen
+
+    def __init__(self, session_dir, speed=1.0):
+        self.session_dir = session_dir
+        self.speed = float(speed or 0)
+        self.indices = {}
+        for name in list_session_cameras(session_dir):
+            index_path = os.path.join(session_dir, name, INDEX_FILE)
+            if not os.path.exists(index_path):
+                continue
+            index = load_index(index_path)
+            if len(index):
+                self.indices[name] = index
+
+        if not self.indices:
+            raise ValueError(f"Keine aufgezeichneten Kameras in {session_dir}")
+
+        self.start_ns = int(min(int(index['capture_ns'][0]) for index in self.indices.values()))
+        self.end_ns = int(max(int(index['capture_ns'][-1]) for index in self.indices.values()))
+
+        self._cond = threading.Condition()
+        self._pending_ns = {name: int(index['capture_ns'][0]) for name, index in self.indices.items()}
+        self._wall_start_ns = None
+        self._latest_ns = self.start_ns
+        self._closed = False
+
+    @property
+    def max_speed(self):
+        return self.speed <= 0
+
+    @property
+    def duration(self):
+        """Aufgezeichnete Dauer in Sekunden"""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def finished(self):
+        """Alle Kameras haben ihren letzten Frame gegrabbt - ob er schon verarbeitet
+        wurde, sagt erst CameraCaptureThread.drained"""
+        with self._cond:
+            return not self._pending_ns
+
+    def open_captures(self):
+        """Eine ReplayCapture pro Kamera"""
+        return {name: ReplayCapture(self, name) for name in self.indices}
+
+    def now(self):
+        """Aktuelle Zeit auf der Uhr der Aufnahme (Sekunden)"""
+        with self._cond:
+            if self.max_speed or self._wall_start_ns is None:
+                return self._latest_ns / 1e9
+            elapsed_ns = (time.monotonic_ns() - self._wall_start_ns) * self.speed
+            return min(self.start_ns + elapsed_ns, self.end_ns) / 1e9
+
+    def wait_turn(self, name, capture_ns):
+        """Blockiert bis der Frame mit capture_ns ausgegeben werden darf
+
+        Returns:
+            False wenn die Session geschlossen wurde
+        """
+        if self.max_speed:
+            with self._cond:
+                self._pending_ns[name] = capture_ns
+                self._cond.notify_all()
+                # Nur ausgeben wenn keine andere Kamera deutlich ältere Frames hat
+                self._cond.wait_for(
+                    lambda: self._closed or
+                    capture_ns <= min(self._pending_ns.values()) + self.MAX_SPEED_SLACK_NS
+                )
+                self._latest_ns = max(self._latest_ns, capture_ns)
+                return not self._closed
+
+        with self._cond:
+            if self._wall_start_ns is None:
+                self._wall_start_ns = time.monotonic_ns()
+            target_ns = self._wall_start_ns + (capture_ns - self.start_ns) / self.speed
+        while not self._closed:
+            remaining = (target_ns - time.monotonic_ns()) / 1e9
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.1))
+        with self._cond:
+            self._latest_ns = max(self._latest_ns, capture_ns)
+        return not self._closed
+
+    def finish(self, name):
+        """Kamera hat keine Frames mehr"""
+        with self._cond:
+            self._pending_ns.pop(name, None)
+            self._cond.notify_all()
+
+    def close(self):
+        """Weckt alle wartenden Kameras auf (vor dem Stoppen der Capture-Threads)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class ReplayCapture:
+    """cv2.VideoCapture-kompatibler Reader für eine aufgezeichnete Kamera
+
+    capture_time_ns enthält den Original-Zeitstempel des zuletzt
+    gegrabbten Frames (wird von frame_capture.CaptureClock übernommen).
+    ended wird True, sobald grab() nach dem letzten Frame ins Leere greift
+    (der Capture-Thread beendet sich dann).
+    """
+
+    def __init__(self, session, name):
+        self.session = session
+        self.name = name
+        self.camera_dir = os.path.join(session.session_dir, name)
+        self.index = session.indices[name]
+        self.capture_time_ns = None
+        self.ended = False
+
+        self._pos = 0               # Nächster Index-Record
+        self._cap = None
+        self._segment = -1
+        self._segment_pos = 0       # Nächster Frame im offenen Segment
+        self._released = False
+
+    def isOpened(self):
+        return not self._released and len(self.index) > 0
+
+    def _open_segment(self, segment):
+        if self._cap is not None:
+            self._cap.release()
+        path = os.path.join(self.camera_dir, SEGMENT_PATTERN.format(segment))
+        self._cap = cv2.VideoCapture(path)
+        self._segment = segment
+        self._segment_pos = 0
+        return self._cap.isOpened()
+
+    def grab(self):
+        """Nächsten Frame gemäß Index greifen (wartet auf die Replay-Uhr)"""
+        while not self._released:
+            if self._pos >= len(self.index):
+                self.ended = True
+                self.session.finish(self.name)
+                return False
+
+            record = self.index[self._pos]
+            self._pos += 1
+            capture_ns = int(record['capture_ns'])
+            if not self.session.wait_turn(self.name, capture_ns):
+                return False
+
+            segment = int(record['segment'])
+            frame_in_segment = int(record['frame_in_segment'])
+            if segment != self._segment and not self._open_segment(segment):
+                continue  # Segment fehlt - nächsten Record versuchen
+            if frame_in_segment != self._segment_pos:
+                self._cap.set(cv2.CAP_PROP_POS_FRAMES, frame_in_segment)
+
+            if self._cap.grab():
+                self._segment_pos = frame_in_segment + 1
+                self.capture_time_ns = capture_ns
+                return True
+            self._segment = -1  # Segment defekt/zu kurz - beim nächsten Record neu öffnen
+        return False
+
+    def retrieve(self, image=None, flag=0):
+        if self._cap is None:
+            return False, None
+        return self._cap.retrieve(image, flag)
+
+    def read(self, image=None):
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.index))
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return float(self._pos)
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            if self.capture_time_ns is None:
+                return 0.0
+            return (self.capture_time_ns - self.session.start_ns) / 1e6
+        if prop_id == cv2.CAP_PROP_FPS:
+            if len(self.index) < 2:
+                return 0.0
+            span_ns = int(self.index['capture_ns'][-1]) - int(self.index['capture_ns'][0])
+            return (len(self.index) - 1) * 1e9 / span_ns if span_ns > 0 else 0.0
+        if self._cap is None and len(self.index):
+            self._open_segment(int(self.index['segment'][0]))  # Für Auflösung etc.
+        return self._cap.get(prop_id) if self._cap is not None else 0.0
+
+    def set(self, prop_id, value):
+        return False  # Aufzeichnung ist unveränderlich (Buffer, Auflösung, FPS)
+
+    def release(self):
+        self._released = True
+        self.session.finish(self.name)
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class _CameraSegmentWriter:
+    """Rollende Segment-Dateien + Index einer Kamera (nur im Encoder-Thread)"""
+
+    def __init__(self, camera_dir, fourcc, fps, segment_seconds):
+        self.camera_dir = camera_dir
+        self.fourcc = fourcc
+        self.fps = fps
+        self.segment_ns = int(segment_seconds * 1e9)
+        os.makedirs(camera_dir, exist_ok=True)
+        self.index_file = open(os.path.join(camera_dir, INDEX_FILE), 'ab')
+
+        self.writer = None
+        self.segment = -1
+        self.frame_in_segment = 0
+        self.segment_start_ns = 0
+        self.frame_size = None
+
+    def write(self, frame_no, frame, capture_ns):
+        frame_size = (frame.shape[1], frame.shape[0])
+        if (self.writer is None or frame_size != self.frame_size or
+                capture_ns - self.segment_start_ns >= self.segment_ns):
+            self._next_segment(frame_size, capture_ns)
+
+        self.writer.write(frame)
+        self.index_file.write(INDEX_RECORD.pack(frame_no, capture_ns, self.segment, self.frame_in_segment))
+        self.frame_in_segment += 1
+
+    def _next_segment(self, frame_size, capture_ns):
+        if self.writer is not None:
+            self.writer.release()
+        self.segment += 1
+        self.frame_in_segment = 0
+        self.segment_start_ns = capture_ns
+        self.frame_size = frame_size
+        path = os.path.join(self.camera_dir, SEGMENT_PATTERN.format(self.segment))
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, frame_size)
+        self.index_file.flush()  # Index bis zum Segmentwechsel sicher auf Platte
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+        self.index_file.close()
+
+
+class SessionRecorder:
+    """Nimmt Rohframes mehrerer Kameras als replay-fähige Session auf
+
+    submit() ist nicht-blockierend und wird direkt aus den Capture-Threads
+    aufgerufen; der Frame wird kopiert, da Ringpuffer-Slots wiederverwendet
+    werden.
+    """
+
+    def __init__(self, session_dir, cameras, fps=30.0, segment_seconds=60,
+                 queue_size=64, fourcc='MJPG', log=None):
+        self.session_dir = session_dir
+        self.cameras = list(cameras)
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.fourcc = fourcc
+        self.log = log or print
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.is_recording = False
+
+        # Statistik pro Kamera
+        self.frames_submitted = {name: 0 for name in self.cameras}
+        self.frames_written = {name: 0 for name in self.cameras}
+        self.frames_dropped = {name: 0 for name in self.cameras}
+
+    def start(self):
+        """Lege das Session-Verzeichnis an und starte den Encoder-Thread"""
+        os.makedirs(self.session_dir, exist_ok=True)
+        self._write_metadata()
+        self.is_recording = True
+        self.thread = threading.Thread(target=self._encoder_loop, name="session-encoder", daemon=True)
+        self.thread.start()
+
+    def submit(self, name, frame, capture_ns):
+        """Frame zur Aufnahme einreihen - blockiert nie
+
+        Returns:
+            False wenn der Frame verworfen wurde (Encoder zu langsam)
+        """
+        if not self.is_recording or name not in self.frames_submitted:
+            return False
+        frame_no = self.frames_submitted[name]
+        self.frames_submitted[name] = frame_no + 1
+        try:
+            self.queue.put_nowait((name, frame_no, frame.copy(), capture_ns))
+            return True
+        except queue.Full:
+            self.frames_dropped[name] += 1
+            return False
+
+    def stop(self, timeout=10.0):
+        """Restliche Frames schreiben, Dateien schließen, Statistik speichern"""
+        if not self.is_recording:
+            return
+        self.is_recording = False
+        self.queue.put(None)  # Encoder leert die Queue bis zu diesem Marker
+        if self.thread is not None:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+        self._write_metadata()
+
+    def _encoder_loop(self):
+        writers = {}
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                name, frame_no, frame, capture_ns = item
+                try:
+                    writer = writers.get(name)
+                    if writer is None:
+                        writer = _CameraSegmentWriter(os.path.join(self.session_dir, name),
+                                                      self.fourcc, self.fps, self.segment_seconds)
+                        writers[name] = writer
+                    writer.write(frame_no, frame, capture_ns)
+                    self.frames_written[name] += 1
+                except Exception as e:
+                    self.frames_dropped[name] += 1
+                    self.log(f"❌ {name} Aufnahme-Fehler: {str(e)}")
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+    def _write_metadata(self):
+        meta = {
+            'version': 1,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'cameras': self.cameras,
+            'fps': self.fps,
+            'segment_seconds': self.segment_seconds,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+        }
+        meta_path = os.path.join(self.session_dir, SESSION_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta['created'] = json.load(f).get('created', meta['created'])
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
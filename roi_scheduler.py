@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ROI SCHEDULER - Vorhergesagte Suchfenster für aktive Tracks
+===========================================================
+Sobald ein Vogel oder eine Mücke verfolgt wird, ist bekannt, wo das Objekt
+im nächsten Frame ungefähr sein wird (multi_object_tracker.forecast). Statt
+jeden Frame komplett zu verarbeiten, plant der Scheduler pro Frame:
+
+    Scan-Frame     jeder scan_interval-te Frame (oder ohne aktive Tracks):
+                   volle Pipeline - Hintergrundmodell lernt, neue Objekte
+                   werden gefunden (mit der Pyramide des Profils)
+    Fenster-Frame  nur die Suchfenster um die vorhergesagten Positionen, in
+                   Vollauflösung gegen das Hintergrundbild des letzten Scans
+                   (MotionDetector.detect_windows)
+
+Fenstergröße pro Track: margin + sigmas × Unsicherheit der Vorhersage,
+höchstens max_window. Überlappende Fenster werden auf einem groben Raster
+(block Pixel) zusammengefasst, bis alle Fenster disjunkte Rechtecke sind -
+jedes Pixel wird höchstens einmal geprüft, kein Blob kommt doppelt.
+Decken die Fenster mehr als max_coverage des Bildes ab, wird gescannt.
+
+    scheduler = RoiScheduler(scan_interval=5)
+    windows = scheduler.plan(tracker, timestamp, frame.shape)
+    blobs = detector.detect(...) if windows is None else detector.detect_windows(frame, windows, ...)
+"""
+
+import cv2
+import numpy as np
+
+
+class RoiScheduler:
+    """Scan-/Fenster-Planung einer Kamera
+
+    scan_interval: jeder wievielte Frame voll gescannt wird (1 = immer)
+    margin: Pixel rund um die vorhergesagte Position (Objektgröße + Reserve)
+    sigmas: Vielfaches der Vorhersage-Unsicherheit, das das Fenster abdeckt
+    max_window: maximale Kantenlänge eines Fensters (Pixel)
+    max_coverage: Flächenanteil, ab dem statt der Fenster gescannt wird
+    block: Rastergröße zum Zusammenfassen überlappender Fenster
+    """
+
+    def __init__(self, scan_interval=5, margin=32, sigmas=3.0, max_window=256, max_coverage=0.25,
+                 block=16):
+        self.scan_interval = scan_interval
+        self.margin = margin
+        self.sigmas = sigmas
+        self.max_window = max_window
+        self.max_coverage = max_coverage
+        self.block = block
+        self.pixels = 0       # Verarbeitete Pixel (Scans in Detection-Auflösung + Fenster)
+        self.frame_pixels = 0  # Pixel, die ohne Scheduler verarbeitet worden wären
+        self.window_frames = 0
+        self.frames = 0
+        self.reset()
+
+    def reset(self):
+        """Nächster Frame wird gescannt (z.B. nach Quellen- oder Größenwechsel)"""
+        self._since_scan = None
+
+    @property
+    def pixel_ratio(self):
+        """Verarbeitete Pixel relativ zur Verarbeitung jedes vollen Frames"""
+        return self.pixels / self.frame_pixels if self.frame_pixels else 1.0
+
+    def plan(self, tracker, timestamp, frame_shape, scale=1.0):
+        """Suchfenster (K × 4: x0, y0, x1, y1, int32) oder None = Frame voll scannen
+
+        scale: Detection-Pyramide der Scans (nur für die Pixel-Statistik)
+        """
+        height, width = frame_shape[:2]
+        self.frames += 1
+        self.frame_pixels += height * width
+        windows = None
+        due = self._since_scan is None or self._since_scan + 1 >= self.scan_interval
+        if tracker is not None and not due:
+            windows = self.windows(tracker, timestamp, width, height)
+
+        if windows is None:
+            self._since_scan = 0
+            self.pixels += int(height * width * scale * scale)
+            return None
+        self._since_scan += 1
+        self.window_frames += 1
+        self.pixels += int(((windows[:, 2] - windows[:, 0]) * (windows[:, 3] - windows[:, 1])).sum())
+        return windows
+
+    def windows(self, tracker, timestamp, width, height):
+        """Zusammengefasste Fenster aller aktiven Tracks (None = keine Tracks/zu viel Fläche)"""
+        positions, sigma = tracker.forecast(timestamp)
+        if not len(positions):
+            return None
+        half = np.minimum(self.margin + self.sigmas * sigma, self.max_window / 2)
+
+        # Fenster auf ein grobes Raster legen - Komponenten = zusammengefasste Fenster
+        block = self.block
+        grid = np.zeros((-(-height // block), -(-width // block)), np.uint8)
+        low = np.floor((positions - half) / block).astype(np.int64)
+        high = np.ceil((positions + half) / block).astype(np.int64)
+        low = np.maximum(low, 0)
+        high = np.minimum(high, (grid.shape[1], grid.shape[0]))
+        visible = np.flatnonzero((high > low).all(axis=1))
+        if not len(visible):
+            return None
+        for (gx0, gy0), (gx1, gy1) in zip(low[visible], high[visible]):
+            grid[gy0:gy1, gx0:gx1] = 1
+
+        # Bounding Boxes zweier Komponenten können sich überlappen (L-Formen) -
+        # Boxen füllen, bis jede Komponente ihre Box ganz ausfüllt (dann disjunkt)
+        while True:
+            count, _, stats, _ = cv2.connectedComponentsWithStats(grid, 8, cv2.CV_32S)
+            stats = stats[1:count]
+            boxes = stats[:, cv2.CC_STAT_WIDTH] * stats[:, cv2.CC_STAT_HEIGHT]
+            if boxes.sum() == np.count_nonzero(grid):
+                break
+            for x, y, w, h in stats[:, :4]:
+                grid[y:y + h, x:x + w] = 1
+        if np.count_nonzero(grid) > self.max_coverage * grid.size:
+            return None
+
+        windows = np.empty((len(stats), 4), np.int32)
+        windows[:, 0] = stats[:, cv2.CC_STAT_LEFT] * block
+        windows[:, 1] = stats[:, cv2.CC_STAT_TOP] * block
+        windows[:, 2] = np.minimum((stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH]) * block, width)
+        windows[:, 3] = np.minimum((stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT]) * block, height)
+        return windows
+
+    def summary(self):
+        return (f"{self.window_frames}/{self.frames} Frames nur in Suchfenstern, "
+                f"{self.pixel_ratio:.0%} der Pixel verarbeitet")
@@ -14,6 +14,8 @@ import time
 import threading
 from collections import deque
 
+from detection_store import best_synchronized, match_synchronized
+
 class Stable3DTriangulation:
     """Crash-sichere 3D Triangulation mit matplotlib - OPTIMIERT"""
     
@@ -252,7 +254,7 @@ class Stable3DTriangulation:
                 return
                 
             # Pruefe ob Motion-Daten vorhanden
-            if not hasattr(self.tracker, 'camera_motion_data'):
+            if not hasattr(self.tracker, 'detections'):
                 return
                 
             # Synchrone Motion-Filter anwenden
@@ -278,55 +280,21 @@ class Stable3DTriangulation:
     def _filter_synchronized_motions(self):
         """Filtere nur zeitgleiche Bewegungen - OPTIMIERT"""
         try:
-            if not hasattr(self.tracker, 'camera_motion_data') or \
-               len(self.tracker.camera_motion_data) < 2:
+            if not hasattr(self.tracker, 'detections'):
                 return {}
                 
-            current_time = time.time()
-            sync_tolerance = 0.2  # 200ms Toleranz - SCHNELLER
+            current_time = getattr(self.tracker, 'pipeline_time', time.monotonic)()  # Uhr der Capture-Zeitstempel
+            sync_tolerance = 0.05  # 50ms - echter Kamera-Versatz dank Capture-Zeitstempel
             
-            # Sammle aktuelle Motion-Events
-            recent_motions = {}
-            for camera_name, motion_list in self.tracker.camera_motion_data.items():
-                if camera_name not in self.camera_positions or not motion_list:
-                    continue
-                    
-                # Nur Events der letzten Sekunde
-                very_recent = []
-                for motion in motion_list:
-                    try:
-                        if current_time - motion['timestamp'] < 0.8:  # Kuerzer
-                            very_recent.append(motion)
-                    except Exception:
-                        continue
-                        
-                if very_recent:
-                    recent_motions[camera_name] = very_recent
+            # Gefilterte Motion-Events der letzten 0.8s als Slices pro Kamera
+            recent_motions = self.tracker.detections.recent(current_time - 0.8,
+                                                            cameras=list(self.camera_positions), limit=50)
             
             if len(recent_motions) < 2:
                 return {}
             
-            # Finde beste zeitliche Uebereinstimmung
-            camera_names = list(recent_motions.keys())
-            best_match = None
-            best_time_diff = float('inf')
-            
-            for i in range(len(camera_names)):
-                for j in range(i + 1, len(camera_names)):
-                    cam1_name = camera_names[i]
-                    cam2_name = camera_names[j]
-                    
-                    for motion1 in recent_motions[cam1_name]:
-                        for motion2 in recent_motions[cam2_name]:
-                            try:
-                                time_diff = abs(motion1['timestamp'] - motion2['timestamp'])
-                                if time_diff < sync_tolerance and time_diff < best_time_diff:
-                                    best_time_diff = time_diff
-                                    best_match = {cam1_name: motion1, cam2_name: motion2}
-                            except Exception:
-                                continue
-            
-            return best_match or {}
+            # Finde beste zeitliche Uebereinstimmung (Binaersuche ueber die Zeitstempel)
+            return best_synchronized(recent_motions, match_synchronized(recent_motions, sync_tolerance))
             
         except Exception:
             return {}
@@ -347,7 +315,7 @@ class Stable3DTriangulation:
                 camera_color = self.camera_colors.get(camera_name, 'white')
                 
                 # 3D Richtung berechnen
-                direction = self._pixel_to_3d_direction(motion['x'], motion['y'])
+                direction = self._pixel_to_3d_direction(motion['cx'], motion['cy'])
                 
                 # Strahl fuer Tracking
                 ray_length = 5.0 / self.zoom_level  # Zoom-angepasst
@@ -387,10 +355,10 @@ class Stable3DTriangulation:
                         
                         # 3D Strahlen
                         pos1 = self.camera_positions[cam1_name]
-                        dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'])
+                        dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'])
                         
                         pos2 = self.camera_positions[cam2_name]
-                        dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'])
+                        dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'])
                         
                         # Triangulation
                         intersection, confidence = self._line_intersection_3d_with_confidence(pos1, dir1, pos2, dir2)
@@ -608,7 +576,7 @@ if __name__ == "__main__":
                 return
                 
             # Prüfe ob Motion-Daten vorhanden
-            if not hasattr(self.master_tracker, 'camera_motion_data'):
+            if not hasattr(self.master_tracker, 'detections'):
                 return
                 
             # Synchrone Motion-Filter anwenden
@@ -634,55 +602,21 @@ if __name__ == "__main__":
     def _filter_synchronized_motions(self):
         """Filtere nur zeitgleiche Bewegungen - identisch zur PyVista-Version"""
         try:
-            if not hasattr(self.master_tracker, 'camera_motion_data') or \
-               len(self.master_tracker.camera_motion_data) < 2:
+            if not hasattr(self.master_tracker, 'detections'):
                 return {}
                 
-            current_time = time.time()
-            sync_tolerance = 0.3  # 300ms Toleranz
+            current_time = getattr(self.master_tracker, 'pipeline_time', time.monotonic)()  # Uhr der Capture-Zeitstempel
+            sync_tolerance = 0.05  # 50ms - echter Kamera-Versatz dank Capture-Zeitstempel
             
-            # Sammle aktuelle Motion-Events
-            recent_motions = {}
-            for camera_name, motion_list in self.master_tracker.camera_motion_data.items():
-                if camera_name not in self.camera_positions or not motion_list:
-                    continue
-                    
-                # Nur Events der letzten Sekunde
-                very_recent = []
-                for motion in motion_list:
-                    try:
-                        if current_time - motion['timestamp'] < 1.0:
-                            very_recent.append(motion)
-                    except:
-                        continue
-                        
-                if very_recent:
-                    recent_motions[camera_name] = very_recent
+            # Gefilterte Motion-Events der letzten Sekunde als Slices pro Kamera
+            recent_motions = self.master_tracker.detections.recent(current_time - 1.0,
+                                                                   cameras=list(self.camera_positions), limit=20)
             
             if len(recent_motions) < 2:
                 return {}
             
-            # Finde beste zeitliche Übereinstimmung
-            camera_names = list(recent_motions.keys())
-            best_match = None
-            best_time_diff = float('inf')
-            
-            for i in range(len(camera_names)):
-                for j in range(i + 1, len(camera_names)):
-                    cam1_name = camera_names[i]
-                    cam2_name = camera_names[j]
-                    
-                    for motion1 in recent_motions[cam1_name]:
-                        for motion2 in recent_motions[cam2_name]:
-                            try:
-                                time_diff = abs(motion1['timestamp'] - motion2['timestamp'])
-                                if time_diff < sync_tolerance and time_diff < best_time_diff:
-                                    best_time_diff = time_diff
-                                    best_match = {cam1_name: motion1, cam2_name: motion2}
-                            except:
-                                continue
-            
-            return best_match or {}
+            # Finde beste zeitliche Übereinstimmung (Binärsuche über die Zeitstempel)
+            return best_synchronized(recent_motions, match_synchronized(recent_motions, sync_tolerance))
             
         except Exception:
             return {}
@@ -703,7 +637,7 @@ if __name__ == "__main__":
                 camera_color = self.camera_colors.get(camera_name, 'white')
                 
                 # 3D Richtung berechnen
-                direction = self._pixel_to_3d_direction(motion['x'], motion['y'], camera_name)
+                direction = self._pixel_to_3d_direction(motion['cx'], motion['cy'], camera_name)
                 
                 # Strahl für Himmel-Tracking
                 ray_length = 4.0  # Reduziert für bessere Sichtbarkeit
@@ -743,10 +677,10 @@ if __name__ == "__main__":
                         
                         # 3D Strahlen
                         pos1 = self.camera_positions[cam1_name]
-                        dir1 = self._pixel_to_3d_direction(motion1['x'], motion1['y'], cam1_name)
+                        dir1 = self._pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name)
                         
                         pos2 = self.camera_positions[cam2_name]
-                        dir2 = self._pixel_to_3d_direction(motion2['x'], motion2['y'], cam2_name)
+                        dir2 = self._pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name)
                         
                         # Triangulation
                         intersection, confidence = self._line_intersection_3d_with_confidence(pos1, dir1, pos2, dir2)
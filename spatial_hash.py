@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SPATIAL HASH - Gleichmäßiges Raster für Nachbarschaftsabfragen in Bildkoordinaten
+=================================================================================
+Zuordnung (Tracks ↔ Detections), Anti-Wolken Mindest-Bewegung und
+Duplikat-Unterdrückung suchten nahe Punkte über volle Abstandsmatrizen -
+bei Schwärmen wächst das quadratisch. Das Raster ordnet jeden Punkt einer
+Zelle der Kantenlänge cell_size zu; eine Abfrage mit Radius r prüft nur
+die Punkte der (2·ceil(r / cell_size) + 1)² umliegenden Zellen:
+
+    index = SpatialHash(cell_size=80)
+    index.build(points)                                # pro Frame neu, O(n log n)
+    queries, hits, distance = index.pairs(centers, 80) # alle Paare im Radius
+    nearest, distance = index.nearest(centers, k=1)    # k nächste im Radius
+
+Der Aufbau ist ein einziges argsort über die Zellschlüssel (CSR-Layout:
+sortierte Zellen + Startindizes), die Abfragen laufen für alle Punkte
+gleichzeitig als Array-Operationen - keine Python-Schleife pro Punkt.
+
+Jede Kamera hat ihr eigenes Raster: die Besitzer (MultiObjectTracker,
+AntiCloudFilter) existieren ohnehin einmal pro Kamera.
+"""
+
+import numpy as np
+
+# Zellkoordinaten → ein int64-Schlüssel (|Zelle| < 2^31 reicht für jede Bildgröße)
+_KEY_SHIFT = np.int64(1) << 32
+_KEY_OFFSET = np.int64(1) << 31
+
+
+def _cell_keys(cells):
+    return (cells[:, 0] + _KEY_OFFSET) * _KEY_SHIFT + (cells[:, 1] + _KEY_OFFSET)
+
+
+class SpatialHash:
+    """Raster über eine Punktmenge (N × 2, Pixel)
+
+    cell_size: Kantenlänge einer Zelle - am besten der typische Abfrage-Radius
+    (dann genügen 3×3 Zellen pro Abfrage)
+    """
+
+    def __init__(self, cell_size=50.0):
+        if cell_size <= 0:
+            raise ValueError("cell_size muss positiv sein")
+        self.cell_size = float(cell_size)
+        self.build(np.zeros((0, 2)))
+
+    def __len__(self):
+        return len(self.points)
+
+    def build(self, points):
+        """Raster für die Punkte eines Frames (neu) aufbauen"""
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        keys = _cell_keys(np.floor(self.points / self.cell_size).astype(np.int64))
+        self._order = np.argsort(keys, kind='stable')
+        self._keys, self._starts, self._counts = np.unique(
+            keys[self._order], return_index=True, return_counts=True)
+        return self
+
+    def pairs(self, queries, radius):
+        """Alle Paare (Abfrage, Punkt) mit Abstand <= radius
+
+        Returns:
+            (query_index, point_index, distance) - sortiert nach Abfrage
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        if not len(queries) or not len(self.points):
+            return np.zeros(0, np.intp), np.zeros(0, np.intp), np.zeros(0)
+
+        # Umliegende Zellen aller Abfragen: (Abfragen × Versätze) Schlüssel
+        reach = int(np.ceil(radius / self.cell_size))
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, indexing='ij'), axis=-1).reshape(-1, 2)
+        cells = np.floor(queries / self.cell_size).astype(np.int64)
+        keys = _cell_keys((cells[:, None, :] + offsets[None, :, :]).reshape(-1, 2))
+
+        # Belegte Zellen per Binärsuche, dann die Punkt-Bereiche aller Treffer aufspannen
+        slot = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+        found = np.flatnonzero(self._keys[slot] == keys)
+        slot = slot[found]
+        counts = self._counts[slot]
+        total = int(counts.sum())
+        if not total:
+            return np.zeros(0, np.intp), np.zeros(0, np.intp), np.zeros(0)
+        query_index = np.repeat(found // len(offsets), counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        point_index = self._order[np.repeat(self._starts[slot], counts) + within]
+
+        delta = self.points[point_index] - queries[query_index]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        keep = distance <= radius
+        return query_index[keep], point_index[keep], distance[keep]
+
+    def within(self, point, radius):
+        """Indizes der Punkte im Radius um einen einzelnen Punkt"""
+        return self.pairs(point, radius)[1]
+
+    def nearest(self, queries, k=1, radius=None):
+        """Die k nächsten Punkte jeder Abfrage innerhalb radius (Standard: cell_size)
+
+        Returns:
+            (index, distance) - je (Abfragen × k), aufsteigend nach Abstand;
+            fehlende Nachbarn: Index -1, Abstand inf
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        radius = self.cell_size if radius is None else radius
+        query_index, point_index, distance = self.pairs(queries, radius)
+
+        index = np.full((len(queries), k), -1, np.intp)
+        nearest_distance = np.full((len(queries), k), np.inf)
+        if len(query_index):
+            # Pro Abfrage nach Abstand ordnen, Rang innerhalb der Abfrage = Spalte
+            order = np.lexsort((point_index, distance, query_index))
+            query_index, point_index, distance = query_index[order], point_index[order], distance[order]
+            first = np.searchsorted(query_index, query_index, 'left')
+            rank = np.arange(len(query_index)) - first
+            keep = rank < k
+            index[query_index[keep], rank[keep]] = point_index[keep]
+            nearest_distance[query_index[keep], rank[keep]] = distance[keep]
+        return index, nearest_distance
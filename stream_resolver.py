@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+STREAM RESOLVER - Parallele, gecachte Stream-URL-Auflösung
+==========================================================
+YouTube-Seiten-URLs werden per yt-dlp in direkte Stream-URLs aufgelöst.
+Das dauert pro URL mehrere Sekunden - daher:
+
+* alle URLs einer Quelle werden gleichzeitig aufgelöst
+* aufgelöste URLs landen mit Ablaufzeit in einem Disk-Cache
+  (Neustart/Reconnect nutzt den Cache ohne erneute Extraktion)
+* ein Hintergrund-Thread erneuert Einträge kurz vor dem Ablauf
+
+Der eigentliche Resolver ist injizierbar - zum Testen ohne Netzwerk:
+
+    resolver = StreamResolver(cache_path="/tmp/cache.json",
+                              resolve_fn=lambda url: url + "#stream")
+    resolver.resolve_many({"cam": "https://example.com/live"})
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".voxeltracker", "stream_cache.json")
+DEFAULT_TTL = 4 * 3600          # Wenn die Stream-URL keine Ablaufzeit enthält
+REFRESH_MARGIN = 15 * 60        # So lange vor Ablauf wird erneuert
+REFRESH_INTERVAL = 60           # Prüfintervall des Hintergrund-Threads
+
+
+def yt_dlp_resolve(url, timeout=30, stream_format='best[height<=720]'):
+    """Standard-Resolver: yt-dlp --get-url (wirft RuntimeError bei Fehler)"""
+    cmd = [sys.executable, '-m', 'yt_dlp', '--get-url', '--format', stream_format, url]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"yt-dlp Exit-Code {result.returncode}")
+    stream_url = result.stdout.strip().splitlines()[0] if result.stdout.strip() else ""
+    if not stream_url:
+        raise RuntimeError("yt-dlp lieferte keine URL")
+    return stream_url
+
+
+def stream_url_expiry(stream_url, default_ttl=DEFAULT_TTL):
+    """Ablaufzeit (Unix-Zeit) einer Stream-URL
+
+    googlevideo-URLs tragen sie als 'expire' Query- bzw. Pfad-Parameter.
+    """
+    parsed = urlparse(stream_url)
+    expire = parse_qs(parsed.query).get('expire')
+    if expire and expire[0].isdigit():
+        return float(expire[0])
+    parts = parsed.path.split('/')
+    if 'expire' in parts:
+        idx = parts.index('expire')
+        if idx + 1 < len(parts) and parts[idx + 1].isdigit():
+            return float(parts[idx + 1])
+    return time.time() + default_ttl
+
+
+class StreamResolver:
+    """Löst Seiten-URLs parallel auf und cached die Stream-URLs auf Disk"""
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, resolve_fn=None, max_workers=4,
+                 refresh_margin=REFRESH_MARGIN, default_ttl=DEFAULT_TTL, log=None):
+        self.cache_path = cache_path
+        self.resolve_fn = resolve_fn or yt_dlp_resolve
+        self.max_workers = max_workers
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.log = log or print
+
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+        self._refresh_thread = None
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------------------ Cache
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            now = time.time()
+            return {url: entry for url, entry in cache.items() if entry.get('expires', 0) > now}
+        except Exception as e:
+            self.log(f"⚠️ Stream-Cache unlesbar, wird neu aufgebaut: {str(e)}")
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            with self._lock:
+                snapshot = dict(self._cache)
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, self.cache_path)  # Atomar - nie halber Cache
+        except Exception as e:
+            self.log(f"⚠️ Stream-Cache konnte nicht gespeichert werden: {str(e)}")
+
+    def cached(self, url, min_validity=0):
+        """Gecachte Stream-URL, wenn sie noch min_validity Sekunden gilt"""
+        with self._lock:
+            entry = self._cache.get(url)
+        if entry and entry['expires'] - time.time() > min_validity:
+            return entry['stream_url']
+        return None
+
+    def invalidate(self, url):
+        """Eintrag verwerfen (z.B. wenn der Stream nicht mehr öffnet)"""
+        with self._lock:
+            removed = self._cache.pop(url, None)
+        if removed:
+            self._save_cache()
+
+    # -------------------------------------------------------------- Auflösung
+
+    def _resolve_fresh(self, url):
+        stream_url = self.resolve_fn(url)
+        entry = {
+            'stream_url': stream_url,
+            'expires': stream_url_expiry(stream_url, self.default_ttl),
+            'resolved': time.time(),
+        }
+        with self._lock:
+            self._cache[url] = entry
+        return stream_url
+
+    def resolve(self, url, use_cache=True):
+        """Eine URL auflösen (Cache zuerst)
+
+        Returns:
+            Stream-URL oder None bei Fehler
+        """
+        return self.resolve_many({url: url}, use_cache=use_cache).get(url)
+
+    def resolve_many(self, urls, use_cache=True):
+        """Mehrere URLs gleichzeitig auflösen
+
+        Args:
+            urls: dict name → Seiten-URL
+
+        Returns:
+            dict name → Stream-URL (None bei Fehler)
+        """
+        results = {}
+        pending = {}
+        for name, url in urls.items():
+            stream_url = self.cached(url) if use_cache else None
+            if stream_url:
+                self.log(f"⚡ {name}: Stream-URL aus Cache")
+                results[name] = stream_url
+            else:
+                pending[name] = url
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                futures = {name: pool.submit(self._resolve_fresh, url) for name, url in pending.items()}
+                for name, future in futures.items():
+                    try:
+                        results[name] = future.result()
+                        self.log(f"✅ {name}: Stream-URL aufgelöst")
+                    except Exception as e:
+                        results[name] = None
+                        self.log(f"❌ {name}: URL-Extraktion fehlgeschlagen: {str(e)}")
+            self._save_cache()
+
+        self.start_background_refresh()
+        return results
+
+    # ------------------------------------------------------- Hintergrund-Refresh
+
+    def refresh_expiring(self):
+        """Erneuere alle Einträge, die innerhalb von refresh_margin ablaufen"""
+        now = time.time()
+        with self._lock:
+            expiring = [url for url, entry in self._cache.items()
+                        if entry['expires'] - now < self.refresh_margin]
+        if not expiring:
+            return 0
+        self.log(f"🔄 Erneuere {len(expiring)} Stream-URL(s) vor Ablauf")
+        refreshed = self.resolve_many({url: url for url in expiring}, use_cache=False)
+        return sum(1 for stream_url in refreshed.values() if stream_url)
+
+    def start_background_refresh(self, interval=REFRESH_INTERVAL):
+        """Starte den Refresh-Thread (idempotent)"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, args=(interval,),
+                                                name="stream-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop(self):
+        """Stoppe den Refresh-Thread"""
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=1.0)
+            self._refresh_thread = None
+
+    def _refresh_loop(self, interval):
+        while not self._stop_event.wait(interval):
+            try:
+                self.refresh_expiring()
+            except Exception as e:
+                self.log(f"⚠️ Stream-Refresh Fehler: {str(e)}")
@@ -2,30 +2,44 @@
 
 import json
 import numpy as np
-from PIL import Image
 import os
 
-def create_test_data():
-    # Create test images directory
-    os.makedirs("motionimages", exist_ok=True)
-    
-    # Create some simple test images with motion
-    frames = []
-    for i in range(5):
-        # Create a simple 100x100 image with a moving white dot
-        img = np.zeros((100, 100, 3), dtype=np.uint8)
+def generate_moving_square_frames(num_frames=5, width=100, height=100):
+    """Yield noisy frames with a white square moving left to right.
+
+    Sizes and steps scale with the frame width (defaults reproduce the
+    original 100x100 test set); the square wraps around for long streams.
+    """
+    unit = width / 100.0
+    half = max(1, int(round(10 * unit)))
+    step = 15 * unit
+    span = max(1, width - 2 * half)
+    for i in range(num_frames):
+        # Create a simple image with a moving white dot
+        img = np.zeros((height, width, 3), dtype=np.uint8)
         
         # Moving dot position
-        x = 20 + i * 15
-        y = 50
+        x = half + int(round(20 * unit - half + i * step)) % span
+        y = height // 2
         
         # Draw a larger white square (simulating a moving object)
-        img[y-10:y+10, x-10:x+10] = [255, 255, 255]
+        img[y-half:y+half, x-half:x+half] = [255, 255, 255]
         
         # Add some noise to make it more realistic
-        noise = np.random.randint(0, 50, (100, 100, 3))
+        noise = np.random.randint(0, 50, (height, width, 3))
         img = np.clip(img.astype(int) + noise, 0, 255).astype(np.uint8)
         
+        yield x, img
+
+def create_test_data():
+    from PIL import Image
+    
+    # Create test images directory
+    os.makedirs("motionimages", exist_ok=True)
+    
+    # Create some simple test images with motion
+    frames = []
+    for i, (x, img) in enumerate(generate_moving_square_frames(5, 100, 100)):
         # Save image
         image_path = f"motionimages/frame_{i:03d}.png"
         Image.fromarray(img).save(image_path)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from anti_cloud_filter import AntiCloudFilter, match_radius_for
+from motion_detection import BLOB_DTYPE
+
+
+def blobs(points, area=100):
+    result = np.zeros(len(points), BLOB_DTYPE)
+    result['cx'] = [p[0] for p in points]
+    result['cy'] = [p[1] for p in points]
+    result['area'] = area
+    return result
+
+
+def evaluate(cloud_filter, points, timestamp):
+    return cloud_filter.evaluate(blobs(points), timestamp, min_movement=0, min_area=10,
+                                 max_area=1000, min_speed=0)
+
+
+def test_overflow_never_evicts_objects_matched_this_frame():
+    cloud_filter = AntiCloudFilter(capacity=4, match_radius=20)
+    evaluate(cloud_filter, [(10, 10), (100, 100)], 0.0)
+    evaluate(cloud_filter, [(12, 10), (102, 100)], 0.1)
+
+    # Both objects matched again, plus more new blobs than free slots
+    new = [(300 + 40 * i, 300) for i in range(5)]
+    evaluate(cloud_filter, [(14, 10), (104, 100)] + new, 0.2)
+
+    assert sorted(cloud_filter.hits) == [1, 1, 3, 3]
+    matched = np.flatnonzero(cloud_filter.hits == 3)
+    assert sorted(map(tuple, cloud_filter.position[matched])) == [(14.0, 10.0), (104.0, 100.0)]
+    assert np.allclose(np.abs(cloud_filter.velocity[matched]), [[20.0, 0.0], [20.0, 0.0]])
+
+
+def test_match_radius_follows_frame_size():
+    assert match_radius_for((480, 640)) == 80.0
+    cloud_filter = AntiCloudFilter(match_radius=80.0)
+    cloud_filter.set_match_radius(match_radius_for((2160, 3840, 3)))
+    assert cloud_filter.match_radius > 400
@@ -0,0 +1,61 @@
+import numpy as np
+
+from detection_store import DETECTION_DTYPE, best_synchronized, match_synchronized
+
+
+def records(timestamps):
+    result = np.zeros(len(timestamps), DETECTION_DTYPE)
+    result['timestamp'] = timestamps
+    result['cx'] = np.arange(len(timestamps))
+    return result
+
+
+def brute_force(recent, tolerance):
+    pairs = set()
+    cameras = [camera for camera, rows in recent.items() if len(rows)]
+    for a, first in enumerate(cameras):
+        for second in cameras[a + 1:]:
+            for i, t1 in enumerate(recent[first]['timestamp']):
+                for j, t2 in enumerate(recent[second]['timestamp']):
+                    if abs(t1 - t2) < tolerance:
+                        pairs.add((first, second, i, j))
+    return pairs
+
+
+def test_match_synchronized_matches_brute_force():
+    rng = np.random.default_rng(3)
+    recent = {
+        'a': records(np.sort(rng.uniform(0, 1, 40))),
+        'b': records(rng.uniform(0, 1, 35)),  # unsorted on purpose
+        'c': records(np.sort(rng.uniform(0, 1, 20))),
+        'empty': records([]),
+    }
+    matches = match_synchronized(recent, 0.03)
+    found = {(str(m['camera1']), str(m['camera2']), int(m['index1']), int(m['index2'])) for m in matches}
+    assert found == brute_force(recent, 0.03)
+    assert len(found) == len(matches)
+
+
+def test_tolerance_is_exclusive():
+    recent = {'a': records([1.0]), 'b': records([1.05, 1.049])}
+    matches = match_synchronized(recent, 0.05)
+    assert list(matches['index2']) == [1]
+
+
+def test_one_to_one_prefers_smallest_time_difference():
+    recent = {'a': records([1.00, 1.02]), 'b': records([1.01, 1.021])}
+    matches = match_synchronized(recent, 0.05, one_to_one=True)
+    assert sorted(zip(matches['index1'], matches['index2'])) == [(0, 0), (1, 1)]
+
+
+def test_best_synchronized_picks_closest_pair():
+    recent = {'a': records([1.0, 2.0]), 'b': records([1.03, 2.001])}
+    pair = best_synchronized(recent, match_synchronized(recent, 0.05))
+    assert set(pair) == {'a', 'b'}
+    assert pair['a']['timestamp'] == 2.0
+    assert pair['b']['timestamp'] == 2.001
+
+
+def test_best_synchronized_without_matches_is_empty():
+    recent = {'a': records([1.0]), 'b': records([3.0])}
+    assert best_synchronized(recent, match_synchronized(recent, 0.05)) == {}
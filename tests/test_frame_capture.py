@@ -0,0 +1,58 @@
+import threading
+
+import numpy as np
+
+from frame_capture import FrameRingBuffer
+
+
+def write(ring, value, timeout=None):
+    acquired = ring.acquire_write_slot(timeout=timeout)
+    if acquired is None:
+        return False
+    idx, _ = acquired
+    ring.commit(idx, np.full((2, 2), value, np.uint8), value)
+    return True
+
+
+def test_lossless_writer_waits_until_frame_is_consumed():
+    ring = FrameRingBuffer(3, lossless=True)
+    assert write(ring, 1)
+    assert not write(ring, 2, timeout=0.05)  # latest frame not picked up yet
+    seq, frame, timestamp = ring.get_latest()
+    assert (seq, timestamp) == (1, 1)
+    assert write(ring, 2, timeout=0.05)
+
+
+def test_lossless_ring_delivers_every_frame_in_order():
+    ring = FrameRingBuffer(3, lossless=True)
+    count = 200
+
+    def producer():
+        for value in range(1, count + 1):
+            assert write(ring, value % 256, timeout=5.0)
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    seen = []
+    last_seq = 0
+    while len(seen) < count:
+        latest = ring.get_latest(last_seq)
+        if latest is None:
+            continue
+        last_seq, frame, _ = latest
+        seen.append(int(frame[0, 0]))
+        ring.release()
+    thread.join(timeout=5.0)
+
+    assert seen == [value % 256 for value in range(1, count + 1)]
+    assert ring.frames_dropped == 0
+    assert not ring.pending
+
+
+def test_lossy_ring_counts_overwritten_frames():
+    ring = FrameRingBuffer(3)
+    for value in range(1, 6):
+        assert write(ring, value)
+    seq, frame, _ = ring.get_latest()
+    assert seq == 5 and frame[0, 0] == 5
+    assert ring.frames_dropped == 4
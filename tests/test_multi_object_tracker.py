@@ -0,0 +1,42 @@
+import numpy as np
+
+from multi_object_tracker import CONFIRMED, TENTATIVE, MultiObjectTracker, hungarian
+
+
+def test_hungarian_finds_minimum_cost_assignment():
+    cost = np.array([[4.0, 1.0, 3.0],
+                     [2.0, 0.0, 5.0],
+                     [3.0, 2.0, 2.0]])
+    rows, cols = hungarian(cost)
+    assert cost[rows, cols].sum() == 5.0
+
+
+def test_tracks_keep_ids_when_paths_cross_closely():
+    tracker = MultiObjectTracker(max_distance=30, confirm_hits=2)
+    ids = None
+    for step in range(6):
+        t = step / 30.0
+        # Two objects moving towards each other, detections in shuffled order
+        points = np.array([[100 + 10 * step, 100], [200 - 10 * step, 104]])
+        order = [1, 0] if step % 2 else [0, 1]
+        frame_ids = tracker.update(points[order], t)[np.argsort(order)]
+        if ids is None:
+            ids = frame_ids
+        assert list(frame_ids) == list(ids)
+    assert list(tracker.states_of(ids)) == [CONFIRMED, CONFIRMED]
+
+
+def test_unmatched_detection_spawns_tentative_track():
+    tracker = MultiObjectTracker(max_distance=20, confirm_hits=3)
+    first = tracker.update([[10, 10]], 0.0)
+    second = tracker.update([[12, 10], [300, 300]], 0.033)
+    assert second[0] == first[0]
+    assert second[1] not in first
+    assert tracker.states_of(second[1:])[0] == TENTATIVE
+
+
+def test_missed_tentative_track_is_dropped():
+    tracker = MultiObjectTracker(max_distance=20, confirm_hits=3)
+    tracker.update([[10, 10]], 0.0)
+    tracker.update(np.zeros((0, 2)), 0.033)
+    assert len(tracker.tracks()) == 0
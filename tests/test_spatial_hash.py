@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from spatial_hash import SpatialHash
+
+
+def test_pairs_match_brute_force():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-200, 800, (300, 2))
+    queries = rng.uniform(-200, 800, (50, 2))
+    query_index, point_index, distance = SpatialHash(40).build(points).pairs(queries, 55)
+
+    full = np.hypot(*(queries[:, None, :] - points[None, :, :]).transpose(2, 0, 1))
+    expected = set(zip(*np.nonzero(full <= 55)))
+    assert set(zip(query_index, point_index)) == expected
+    assert np.allclose(distance, full[query_index, point_index])
+
+
+def test_nearest_returns_sorted_neighbours_and_padding():
+    index = SpatialHash(10).build([[0, 0], [3, 0], [0, 8], [100, 100]])
+    nearest, distance = index.nearest([[1, 0], [50, 50]], k=3, radius=10)
+    assert list(nearest[0]) == [0, 1, 2]
+    assert np.allclose(distance[0], [1.0, 2.0, np.hypot(1, 8)])
+    assert list(nearest[1]) == [-1, -1, -1]
+    assert np.all(np.isinf(distance[1]))
+
+
+def test_empty_index_and_invalid_cell_size():
+    query_index, point_index, distance = SpatialHash(5).pairs([[0, 0]], 10)
+    assert len(query_index) == len(point_index) == len(distance) == 0
+    with pytest.raises(ValueError):
+        SpatialHash(0)
@@ -0,0 +1,67 @@
+import json
+import time
+
+from stream_resolver import StreamResolver, stream_url_expiry
+
+
+def make_resolver(tmp_path, resolve_fn):
+    resolver = StreamResolver(cache_path=str(tmp_path / "cache.json"), resolve_fn=resolve_fn,
+                              log=lambda message: None)
+    resolver.start_background_refresh = lambda interval=None: None  # no refresh thread in tests
+    return resolver
+
+
+def test_resolve_many_uses_stub_and_writes_cache(tmp_path):
+    calls = []
+
+    def resolve(url):
+        calls.append(url)
+        return url + "/stream?expire=%d" % (time.time() + 3600)
+
+    resolver = make_resolver(tmp_path, resolve)
+    result = resolver.resolve_many({"a": "https://example.com/a", "b": "https://example.com/b"})
+
+    assert sorted(calls) == ["https://example.com/a", "https://example.com/b"]
+    assert result["a"].startswith("https://example.com/a/stream")
+    cache = json.loads((tmp_path / "cache.json").read_text())
+    assert set(cache) == {"https://example.com/a", "https://example.com/b"}
+
+
+def test_cache_is_reused_across_instances(tmp_path):
+    make_resolver(tmp_path, lambda url: url + "#1").resolve_many({"cam": "https://example.com/live"})
+
+    def fail(url):
+        raise AssertionError("cache should have been used")
+
+    result = make_resolver(tmp_path, fail).resolve_many({"cam": "https://example.com/live"})
+    assert result == {"cam": "https://example.com/live#1"}
+
+
+def test_failed_resolution_returns_none(tmp_path):
+    def resolve(url):
+        if "bad" in url:
+            raise RuntimeError("offline")
+        return url + "#ok"
+
+    result = make_resolver(tmp_path, resolve).resolve_many(
+        {"good": "https://example.com/good", "bad": "https://example.com/bad"})
+    assert result == {"good": "https://example.com/good#ok", "bad": None}
+
+
+def test_refresh_expiring_re_resolves_only_expiring_entries(tmp_path):
+    counter = {"n": 0}
+
+    def resolve(url):
+        counter["n"] += 1
+        ttl = 60 if "soon" in url else 7200
+        return url + "?expire=%d&n=%d" % (time.time() + ttl, counter["n"])
+
+    resolver = make_resolver(tmp_path, resolve)
+    resolver.resolve_many({"soon": "https://example.com/soon", "later": "https://example.com/later"})
+    assert resolver.refresh_expiring() == 1
+    assert counter["n"] == 3
+
+
+def test_stream_url_expiry_reads_query_and_path():
+    assert stream_url_expiry("https://x.googlevideo.com/videoplayback?expire=1700000000") == 1700000000
+    assert stream_url_expiry("https://x.googlevideo.com/api/expire/1700000001/id/1") == 1700000001
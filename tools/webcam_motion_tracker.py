@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import os
+import sys
 import cv2
 import numpy as np
 import threading
@@ -10,6 +12,12 @@ from tkinter import ttk, messagebox
 import pyvista as pv
 from collections import deque
 
+# Shared pipeline modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_pacer import FrameRateGovernor
+from multi_object_tracker import CONFIRMED, MultiObjectTracker
+from track_archive import FlightPaths, TrackArchive
+
 
 # Detection Profiles for different targets
 DETECTION_PROFILES = {
@@ -51,8 +59,10 @@ DETECTION_PROFILES = {
 class WebcamTracker:
     """Individual webcam motion tracker with flight path tracking"""
     
-    def __init__(self, camera_id, threshold=25, min_area=500, max_area=10000, flight_tracking=False):
+    def __init__(self, camera_id, threshold=25, min_area=500, max_area=10000, flight_tracking=False,
+                 target_fps=15, track_ttl=2.0, max_tracks=64, archive_path=None):
         self.camera_id = camera_id
+        self.target_fps = target_fps
         self.threshold = threshold
         self.min_area = min_area
         self.max_area = max_area
@@ -63,10 +73,12 @@ class WebcamTracker:
         self.thread = None
         self.motion_queue = queue.Queue(maxsize=50)
         
-        # Flight path tracking
-        self.flight_paths = {}  # Track ID -> list of positions
-        self.next_track_id = 0
-        self.track_distance_threshold = 50  # Max distance to associate with existing track
+        # Flight path tracking - Kalman tracks, detections assigned globally per frame
+        self.tracker = MultiObjectTracker(max_distance=50)  # Max distance to associate with existing track
+        # Live paths keep the last 30 points; finished tracks and older points go to the archive
+        self.track_archive = TrackArchive(log_path=archive_path)
+        self.flight_paths = FlightPaths(ttl=track_ttl, max_tracks=max_tracks, max_points=30,
+                                        archive=self.track_archive)
         
     def start(self):
         """Start camera capture"""
@@ -78,7 +90,7 @@ class WebcamTracker:
             # Set lower resolution for better performance
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 320)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 240)
-            self.cap.set(cv2.CAP_PROP_FPS, 15)
+            self.cap.set(cv2.CAP_PROP_FPS, self.target_fps)
             
             self.is_running = True
             self.thread = threading.Thread(target=self._capture_loop, daemon=True)
@@ -93,9 +105,11 @@ class WebcamTracker:
         """Stop camera capture"""
         self.is_running = False
         
-        # Don't try to join the thread from within itself
-        # Just mark as stopped and let it finish naturally
-        
+        # Don't try to join the thread from within itself - otherwise wait
+        # until the loop has archived its flight paths before releasing the camera
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2.0)
+            
         # Release camera
         if self.cap:
             try:
@@ -113,17 +127,27 @@ class WebcamTracker:
     def _capture_loop(self):
         """Main capture and motion detection loop"""
         window_name = f'Camera {self.camera_id}'
+        governor = FrameRateGovernor(self.target_fps, log=print)
         
         while self.is_running:
+            governor.begin()
             try:
                 ret, frame = self.cap.read()
                 if not ret:
                     print(f"Camera {self.camera_id}: Failed to read frame")
                     break
                     
+                # Under load the governor first drops overlays, then detects on a smaller frame
+                draw_overlays = governor.draw_overlays
+                scale = governor.detection_scale
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                if scale != 1.0:
+                    gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
                 gray = cv2.GaussianBlur(gray, (5, 5), 0)
                 
+                if self.prev_frame is not None and self.prev_frame.shape != gray.shape:
+                    self.prev_frame = None  # Detection scale changed - restart differencing
+                    
                 if self.prev_frame is not None:
                     # Motion detection
                     frame_diff = cv2.absdiff(self.prev_frame, gray)
@@ -133,42 +157,58 @@ class WebcamTracker:
                     # Find contours
                     contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
                     
-                    # Process detected motion
-                    current_objects = []
+                    # Collect detected motion - areas and coordinates always in full-resolution pixels
+                    detections = []
+                    inv_scale = 1.0 / scale
                     for contour in contours:
-                        area = cv2.contourArea(contour)
+                        area = cv2.contourArea(contour) * inv_scale * inv_scale
                         if self.min_area <= area <= self.max_area:
-                            x, y, w, h = cv2.boundingRect(contour)
-                            center_x = x + w // 2
-                            center_y = y + h // 2
-                            
-                            # Store motion data
-                            motion_obj = {
-                                'camera_id': self.camera_id,
-                                'timestamp': time.time(),
-                                'x': center_x,
-                                'y': center_y,
-                                'area': area,
-                                'frame_width': frame.shape[1],
-                                'frame_height': frame.shape[0]
-                            }
+                            x, y, w, h = (int(round(v * inv_scale)) for v in cv2.boundingRect(contour))
+                            detections.append((x, y, w, h, x + w // 2, y + h // 2, area))
+                    
+                    # Flight path tracking: one global assignment for all detections of the frame
+                    now = time.time()
+                    track_ids = track_states = None
+                    if self.flight_tracking:
+                        track_ids = self.tracker.update([d[4:6] for d in detections], now)
+                        track_states = self.tracker.states_of(track_ids)
+                        # Tracks the tracker dropped (or idle past the TTL) leave the live paths
+                        self.flight_paths.expire(now, alive=self.tracker.tracks()['id'])
+                    
+                    # Process detected motion
+                    current_objects = []
+                    for index, (x, y, w, h, center_x, center_y, area) in enumerate(detections):
+                        # Store motion data
+                        motion_obj = {
+                            'camera_id': self.camera_id,
+                            'timestamp': now,
+                            'x': center_x,
+                            'y': center_y,
+                            'area': area,
+                            'frame_width': frame.shape[1],
+                            'frame_height': frame.shape[0]
+                        }
+                        
+                        if track_ids is not None:
+                            track_id = int(track_ids[index])
+                            motion_obj['track_id'] = track_id
+                            # Tentative paths are dropped on expiry - only confirmed flights are archived
+                            self.flight_paths.update(track_id, center_x, center_y, now,
+                                                     confirmed=track_states[index] == CONFIRMED)
                             
-                            # Flight path tracking
-                            if self.flight_tracking:
-                                track_id = self._assign_track_id(center_x, center_y)
-                                motion_obj['track_id'] = track_id
-                                self._update_flight_path(track_id, center_x, center_y)
-                                
+                            # Only confirmed tracks get a path and ID - single-frame noise stays unlabeled
+                            if draw_overlays and track_states[index] == CONFIRMED:
                                 # Draw flight path
                                 self._draw_flight_path(frame, track_id)
                                 
                                 # Draw track ID
                                 cv2.putText(frame, f'ID:{track_id}', (center_x+10, center_y-10), 
                                           cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 0), 1)
-                            
-                            current_objects.append(motion_obj)
-                            
-                            # Draw detection
+                        
+                        current_objects.append(motion_obj)
+                        
+                        # Draw detection
+                        if draw_overlays:
                             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
                             cv2.circle(frame, (center_x, center_y), 3, (255, 0, 0), -1)
                     
@@ -192,48 +232,23 @@ class WebcamTracker:
                 if key == ord('q') or key == 27:  # q or ESC
                     break
                     
-                time.sleep(0.067)  # ~15 FPS
+                # Sleep only for what is left of the frame budget
+                governor.end()
                 
             except Exception as e:
                 print(f"Camera {self.camera_id} error: {e}")
                 break
                 
+        # Archive the remaining flight paths - only this thread touches them
+        try:
+            self.flight_paths.clear()
+            self.track_archive.close()
+        except Exception as e:
+            print(f"Camera {self.camera_id}: failed to archive flight paths: {e}")
+            
         # Clean exit - don't call self.stop() here to avoid recursion
         print(f"Camera {self.camera_id} thread ending")
         
-    def _assign_track_id(self, x, y):
-        """Assign track ID based on proximity to existing tracks"""
-        min_distance = float('inf')
-        best_track_id = None
-        
-        # Find closest existing track
-        for track_id, positions in self.flight_paths.items():
-            if positions:  # Check if track has positions
-                last_pos = positions[-1]
-                distance = np.sqrt((x - last_pos[0])**2 + (y - last_pos[1])**2)
-                if distance < min_distance and distance < self.track_distance_threshold:
-                    min_distance = distance
-                    best_track_id = track_id
-        
-        # Create new track if no close match found
-        if best_track_id is None:
-            best_track_id = self.next_track_id
-            self.next_track_id += 1
-            self.flight_paths[best_track_id] = []
-            
-        return best_track_id
-        
-    def _update_flight_path(self, track_id, x, y):
-        """Update flight path for given track"""
-        if track_id not in self.flight_paths:
-            self.flight_paths[track_id] = []
-            
-        self.flight_paths[track_id].append((x, y, time.time()))
-        
-        # Keep only recent positions (last 30 points)
-        if len(self.flight_paths[track_id]) > 30:
-            self.flight_paths[track_id] = self.flight_paths[track_id][-30:]
-            
     def _draw_flight_path(self, frame, track_id):
         """Draw flight path on frame"""
         if track_id not in self.flight_paths:
@@ -772,7 +787,11 @@ class MultiWebcamGUI:
         
         for cam_id in selected_cameras:
             try:
-                tracker = WebcamTracker(cam_id, threshold, min_area, max_area, flight_tracking)
+                profile = DETECTION_PROFILES.get(self.profile_var.get(), DETECTION_PROFILES["Custom"])
+                # Finished flight paths are appended to a binary log (track_archive.load_track_log)
+                archive_path = f'flight_paths_cam{cam_id}.bin' if flight_tracking else None
+                tracker = WebcamTracker(cam_id, threshold, min_area, max_area, flight_tracking,
+                                        target_fps=profile['fps'], archive_path=archive_path)
                 if tracker.start():
                     self.cameras[cam_id] = tracker
                     success_count += 1
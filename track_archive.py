@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TRACK ARCHIVE - Begrenzter Lebenszyklus für Flugbahnen
+======================================================
+Flugbahnen wuchsen pro Track-ID in einem dict, das nie aufgeräumt wurde -
+bei 24h-Läufen wuchs der Speicher ohne Grenze. FlightPaths hält nur noch
+LEBENDE Tracks:
+
+    ttl           Sekunden ohne neuen Punkt, nach denen ein Track endet
+    max_tracks    höchstens so viele lebende Tracks (am längsten nicht
+                  gesehene werden zuerst beendet)
+    max_points    Punkte pro lebendem Track - ältere wandern sofort ins Archiv
+
+Ins Archiv kommen nur BESTÄTIGTE Tracks (update(..., confirmed=True)) -
+Pfade, die nie bestätigt wurden (Ein-Frame-Rauschen), werden beim Ablauf
+verworfen.
+
+Beendete Tracks landen im TrackArchive: einem NumPy-Ringpuffer fester
+Kapazität (TRACK_POINT_DTYPE, ein Record pro Punkt) und optional in einem
+binären Log auf der Platte, das nie gekürzt wird:
+
+    <log>   TRACK_POINT_DTYPE Records (little endian), nur angehängt
+
+    paths = FlightPaths(archive=TrackArchive(log_path='flight_paths.bin'))
+    paths.update(track_id, x, y, timestamp, confirmed=state == CONFIRMED)
+    paths.expire(now, alive=tracker.tracks()['id'])
+    points = load_track_log('flight_paths.bin')   # Auswertung
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+
+TRACK_POINT_DTYPE = np.dtype([
+    ('track', '<i8'),
+    ('timestamp', '<f8'),
+    ('x', '<f4'), ('y', '<f4'),
+])
+
+
+def load_track_log(log_path):
+    """Lese ein Flugbahn-Log (unvollständiger letzter Record wird ignoriert)"""
+    with open(log_path, 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % TRACK_POINT_DTYPE.itemsize
+    return np.frombuffer(data[:usable], dtype=TRACK_POINT_DTYPE)
+
+
+class TrackArchive:
+    """Beendete Flugbahnen - Ringpuffer im Speicher, optional Log auf der Platte
+
+    capacity: Punkte im Speicher (älteste werden überschrieben)
+    log_path: Binär-Log, an das jeder archivierte Punkt angehängt wird (None = keins)
+    """
+
+    def __init__(self, capacity=100000, log_path=None):
+        self.points = np.zeros(capacity, TRACK_POINT_DTYPE)
+        self.total = 0  # Jemals archivierte Punkte
+        self.tracks = 0  # Jemals beendete Tracks
+        self._log = open(log_path, 'ab') if log_path else None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, len(self.points))
+
+    def add(self, track_id, positions, finished=True):
+        """Punkte (x, y, timestamp) eines Tracks archivieren"""
+        if not positions:
+            return
+        records = np.zeros(len(positions), TRACK_POINT_DTYPE)
+        records['track'] = track_id
+        records['x'], records['y'], records['timestamp'] = np.asarray(positions, dtype=np.float64).T
+        with self._lock:
+            capacity = len(self.points)
+            if len(records) > capacity:
+                self.total += len(records) - capacity
+                tail = records[-capacity:]
+            else:
+                tail = records
+            start = self.total % capacity
+            first = min(len(tail), capacity - start)
+            self.points[start:start + first] = tail[:first]
+            self.points[:len(tail) - first] = tail[first:]
+            self.total += len(tail)
+            self.tracks += int(finished)
+            if self._log is not None:
+                records.tofile(self._log)
+
+    def history(self):
+        """Alle Punkte im Speicher in Archivierungs-Reihenfolge (Kopie)"""
+        with self._lock:
+            capacity = len(self.points)
+            if self.total <= capacity:
+                return self.points[:self.total].copy()
+            start = self.total % capacity
+            return np.concatenate((self.points[start:], self.points[:start]))
+
+    def trajectory(self, track_id):
+        """Archivierte Punkte eines Tracks, zeitlich sortiert"""
+        points = self.history()
+        points = points[points['track'] == track_id]
+        return points[np.argsort(points['timestamp'], kind='stable')]
+
+    def flush(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.flush()
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+class FlightPaths:
+    """Lebende Flugbahnen einer Kamera: Track-ID → letzte Punkte (x, y, timestamp)
+
+    ttl: Sekunden ohne Punkt, nach denen ein Track archiviert wird
+    max_tracks: Obergrenze lebender Tracks
+    max_points: Punkte pro lebendem Track (ältere werden archiviert)
+    archive: TrackArchive für beendete Tracks (None = verwerfen)
+    """
+
+    def __init__(self, ttl=2.0, max_tracks=64, max_points=300, archive=None):
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.max_points = max_points
+        self.archive = archive
+        self._paths = {}
+        self._last_seen = {}
+        self._confirmed = set()  # Track-IDs, die je bestätigt wurden
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, track_id):
+        return track_id in self._paths
+
+    def __getitem__(self, track_id):
+        return self._paths[track_id]
+
+    def ids(self):
+        return list(self._paths)
+
+    def update(self, track_id, x, y, timestamp, confirmed=True):
+        """Punkt anhängen - confirmed: Track ist (inzwischen) bestätigt"""
+        if confirmed:
+            self._confirmed.add(track_id)
+        path = self._paths.get(track_id)
+        if path is None:
+            path = self._paths[track_id] = deque()
+        elif len(path) >= self.max_points:
+            # Ältester Punkt ins Archiv - der Track läuft weiter
+            if self.archive is not None and track_id in self._confirmed:
+                self.archive.add(track_id, [path[0]], finished=False)
+            path.popleft()
+        path.append((x, y, timestamp))
+        self._last_seen[track_id] = timestamp
+
+    def expire(self, now, alive=None):
+        """Beendete Tracks archivieren (unbestätigte verwerfen) → Anzahl entfernter Tracks
+
+        alive: IDs, die der Tracker noch führt (None = nur TTL); alle anderen
+        gelten sofort als beendet
+        """
+        finished = {track_id for track_id, seen in self._last_seen.items() if now - seen > self.ttl}
+        if alive is not None:
+            alive = set(int(track_id) for track_id in alive)
+            finished.update(track_id for track_id in self._paths if track_id not in alive)
+        for track_id in finished:
+            self._finish(track_id)
+
+        # Obergrenze: am längsten nicht gesehene Tracks zuerst
+        overflow = max(0, len(self._paths) - self.max_tracks)
+        for track_id in sorted(self._last_seen, key=self._last_seen.get)[:overflow]:
+            self._finish(track_id)
+        return len(finished) + overflow
+
+    def clear(self):
+        """Alle lebenden Tracks archivieren"""
+        for track_id in list(self._paths):
+            self._finish(track_id)
+
+    def _finish(self, track_id):
+        path = self._paths.pop(track_id)
+        del self._last_seen[track_id]
+        if track_id in self._confirmed:
+            self._confirmed.discard(track_id)
+            if self.archive is not None:
+                self.archive.add(track_id, path)
@@ -0,0 +1,1237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TRACKING ENGINE - Headless Pipeline: Capture → Detection → Filter → Triangulation
+=================================================================================
+Die komplette Verarbeitung ohne Tkinter. Alle Tuning-Werte stecken in einer
+unveränderlichen TrackingConfig; die Schleife liest pro Frame genau EINEN
+Snapshot (self.config) und ist damit unabhängig von GUI-Variablen.
+Änderungen werden als neuer Snapshot komplett ausgetauscht - eine einzelne
+Attribut-Zuweisung, also atomar:
+
+    engine = TrackingEngine(TrackingConfig.from_profile("🐦 Bird"))
+    engine.open_sources(VIDEO_SOURCES["📷 Webcam 0 (Primary)"])
+    engine.update_config(engine.config.replace(threshold=20))  # jederzeit
+    engine.run()    # blockiert bis stop() oder Replay-Ende
+    engine.close()
+
+Die GUI (master_motion_tracker.py) hängt sich über on_frames an die Anzeige.
+Ohne GUI - z.B. als Dienst auf einem Rack-Rechner:
+
+    python tracking_engine.py --profile bird --webcam 0 1 --output tracks.jsonl
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from anti_cloud_filter import AntiCloudFilter, describe_reasons, match_radius_for
+from camera_config import load_camera_regions
+from detection_store import DetectionStore, best_synchronized, match_synchronized
+from frame_capture import CameraCaptureThread, monotonic_to_wall
+from frame_pacer import FrameRateGovernor
+from motion_detection import NATIVE_KERNEL_AVAILABLE, MotionDetector
+from motion_workers import DetectionWorkerPool
+from multi_object_tracker import MultiObjectTracker
+from overlay_renderer import DetectionResult, OverlayRenderer
+from recorded_session import ReplaySession, SessionRecorder
+from roi_scheduler import RoiScheduler
+from stream_resolver import StreamResolver
+
+# Synchronisations-Toleranz zwischen Kameras: Frames tragen Capture-Zeitstempel,
+# daher reicht der echte Kamera-Versatz (~1-2 Frames) statt 300ms Verarbeitungs-Jitter
+SYNC_TOLERANCE = 0.05  # 50ms
+
+# Detection Profiles für verschiedene Ziele - Full HD optimiert
+DETECTION_PROFILES = {
+    "🦟 Mosquito": {
+        "threshold": 15,
+        "min_area": 25,  # Skaliert für Full HD
+        "max_area": 400,  # Skaliert für Full HD
+        "fps": 60,
+        "resolution": (1920, 1080),  # Full HD
+        "detection_scale": 1.0,  # Winzige Objekte - volle Auflösung
+        "refine": False,
+        "background": {"model": "frame_diff", "noise_floor": 4},  # Differenzbild, volle Rate
+        "gate": {"block": 8, "sample": 2, "noise_threshold": 6},  # Winzige Objekte - feine Blöcke
+        "description": "Optimiert für kleine, schnelle Insekten - Full HD"
+    },
+    "🐦 Bird": {
+        "threshold": 30,
+        "min_area": 500,  # Skaliert für Full HD
+        "max_area": 12000,  # Skaliert für Full HD
+        "fps": 30,
+        "resolution": (1920, 1080),  # Full HD
+        "detection_scale": 0.5,  # 960x540 Graustufen, Boxen in Full HD verfeinert
+        "refine": True,
+        "background": {"model": "mog2", "history": 500, "learning_rate": -1},
+        "gate": {"block": 16, "noise_threshold": 8},
+        "description": "Optimiert für Vögel und mittlere Flugobjekte - Full HD"
+    },
+    "✈️ Aircraft": {
+        "threshold": 40,
+        "min_area": 1200,  # Skaliert für Full HD
+        "max_area": 120000,  # Skaliert für Full HD
+        "fps": 15,
+        "resolution": (1920, 1080),  # Full HD
+        "detection_scale": 0.25,  # 480x270 Graustufen reicht für große Objekte
+        "refine": False,
+        "background": {"model": "running_average", "history": 600, "noise_floor": 3},  # ~40 s bei 15 FPS
+        "gate": {"block": 16, "noise_threshold": 8},
+        "description": "Optimiert für Flugzeuge und große Objekte - Full HD"
+    },
+    "🎯 Custom": {
+        "threshold": 25,
+        "min_area": 250,  # Skaliert für Full HD
+        "max_area": 25000,  # Skaliert für Full HD
+        "fps": 30,
+        "resolution": (1920, 1080),  # Full HD
+        "detection_scale": 1.0,  # Volle Auflösung
+        "refine": False,
+        "background": {"model": "mog2", "history": 500, "learning_rate": -1},
+        "description": "Manuelle Konfiguration - Full HD"
+    }
+}
+
+# Video-Quellen
+VIDEO_SOURCES = {
+    "📷 Webcam 0 (Primary)": {
+        "type": "webcam",
+        "source": 0,
+        "description": "Standard USB-Webcam (Index 0)"
+    },
+    "📷 Webcam 1": {
+        "type": "webcam",
+        "source": 1,
+        "description": "Zweite USB-Webcam (Index 1)"
+    },
+    "📷 Webcam 2": {
+        "type": "webcam",
+        "source": 2,
+        "description": "Dritte USB-Webcam (Index 2)"
+    },
+    "📷📷 Multi-Webcam": {
+        "type": "multi_webcam",
+        "sources": [0, 1, 2],
+        "description": "Alle verfügbaren Webcams gleichzeitig"
+    },
+    "🌊 Niagara Falls Live": {
+        "type": "youtube_dual",
+        "sources": {
+            "NiagaraFallsLive": "https://www.youtube.com/watch?v=4Z6wOToTgh0",
+            "EarthCam": "https://www.youtube.com/watch?v=W3D3dEpR3bs"
+        },
+        "description": "YouTube Live-Streams - Dual-Perspektiven"
+    },
+    "🌊 Niagara Falls (Single)": {
+        "type": "youtube_single",
+        "source": "https://www.youtube.com/watch?v=4Z6wOToTgh0",
+        "description": "YouTube Live-Stream - Einzelperspektive"
+    },
+    "📺 Custom URL": {
+        "type": "custom_url",
+        "source": "",
+        "description": "Eigene URL eingeben"
+    },
+    "⏯️ Replay (Aufzeichnung)": {
+        "type": "replay",
+        "source": "",
+        "description": "Aufgezeichnete Multi-Kamera-Session mit Original-Zeitstempeln"
+    }
+}
+
+# Replay-Geschwindigkeiten (0 = so schnell wie die CPU erlaubt)
+REPLAY_SPEEDS = {
+    "1x (Echtzeit)": 1.0,
+    "2x": 2.0,
+    "4x": 4.0,
+    "10x": 10.0,
+    "⚡ Maximum": 0.0,
+}
+
+
+@dataclass(frozen=True)
+class TrackingConfig:
+    """Unveränderlicher Snapshot aller Tuning-Werte der Pipeline"""
+
+    profile: str = "🎯 Custom"
+    threshold: int = 25
+    min_area: int = 250
+    max_area: int = 25000
+    target_fps: float = 30
+    detection_scale: float = 1.0     # Detection-Pyramide des Profils
+    refine: bool = False
+    background: tuple = ()           # Hintergrundmodell als (Schlüssel, Wert)-Paare
+    backend: str = "opencv"          # 'native' = C++-Kernel aus core/ (falls gebaut)
+    gate: tuple = ()                 # Motion-Gate als (Schlüssel, Wert)-Paare - leer = aus
+    storm_fraction: float = 0.3      # Contour-Storm Guard: max. Vordergrund-Anteil pro Frame (0 = aus)
+    # Anti-Wolken Filter
+    min_movement: int = 15           # Pixel zwischen zwei Detections einer Kamera
+    anti_cloud_min_area: int = 60
+    anti_cloud_max_area: int = 2500
+    min_speed: int = 20              # Pixel pro Frame (bei 30 FPS)
+    anti_cloud_match: float = 0.1    # Zuordnungsradius Blob ↔ Objekt (Anteil der Bilddiagonale)
+    track_distance: float = 80.0     # Max. Abstand Detection ↔ vorhergesagte Track-Position (Pixel)
+    roi_tracking: bool = False       # Aktive Tracks nur in vorhergesagten Suchfenstern (nicht mit multiprocess)
+    roi_scan_interval: int = 5       # ... und nur jeden n-ten Frame voll scannen
+    # Nur beim Start ausgewertet
+    multiprocess: bool = False
+    record: bool = False
+    recordings_dir: str = "recordings"
+
+    @classmethod
+    def from_profile(cls, profile_name, **overrides):
+        """Snapshot mit den Werten eines DETECTION_PROFILES-Eintrags"""
+        profile = DETECTION_PROFILES[profile_name]
+        values = {
+            'profile': profile_name,
+            'threshold': profile['threshold'],
+            'min_area': profile['min_area'],
+            'max_area': profile['max_area'],
+            'target_fps': profile['fps'],
+            'detection_scale': profile.get('detection_scale', 1.0),
+            'refine': profile.get('refine', False),
+            'background': tuple(sorted(profile.get('background', {}).items())),
+            'backend': profile.get('backend', 'opencv'),
+            'gate': tuple(sorted(profile.get('gate', {}).items())),
+            'storm_fraction': profile.get('storm_fraction', cls.storm_fraction),
+            'roi_scan_interval': profile.get('roi_scan_interval', cls.roi_scan_interval),
+        }
+        values.update(overrides)
+        return cls(**values)
+
+    def replace(self, **changes):
+        """Neuer Snapshot mit geänderten Werten (der alte bleibt unverändert)"""
+        return dataclasses.replace(self, **changes)
+
+    @property
+    def detector_kwargs(self):
+        # Verkleinerte Detection läuft auf Graustufen - Farbe bringt bei großen Objekten nichts
+        return {'grayscale': self.detection_scale < 1.0, 'background': dict(self.background) or None,
+                'backend': self.backend, 'gate': dict(self.gate) or None,
+                'storm_fraction': self.storm_fraction}
+
+
+def pixel_to_3d_direction(pixel_x, pixel_y, camera_name):
+    """Konvertiere 2D Pixel-Koordinaten zu 3D Richtungsvektor - Full HD optimiert"""
+    # Vereinfachte Kamera-Transformation für Full HD
+    # In einer echten Implementierung würden hier Kamera-Intrinsics verwendet
+
+    # Normalisiere Pixel-Koordinaten zu [-1, 1] für Full HD (1920x1080)
+    norm_x = (pixel_x - 960) / 960  # Full HD: 1920/2 = 960
+    norm_y = (pixel_y - 540) / 540  # Full HD: 1080/2 = 540
+
+    # Standard Field of View Annahme (60° typisch für Webcams)
+    fov_factor = 0.7  # Für 60° FOV
+
+    # Basis-Richtung für jede Kamera (Himmel-Tracking Setup)
+    if camera_name == 'webcam_0':
+        # Linke Kamera: nach oben-vorne gerichtet (Himmel-Tracking)
+        base_dir = np.array([0, 0.5, 0.866])  # 60° Elevation für Himmel
+        right_vec = np.array([1, 0, 0])  # X-Achse für horizontale Bewegung
+        up_vec = np.array([0, 0.866, -0.5])  # Hoch-Vektor angepasst für 60° Neigung
+    elif camera_name == 'webcam_1':
+        # Rechte Kamera: parallel zur linken (Himmel-Tracking)
+        base_dir = np.array([0, 0.5, 0.866])  # 60° Elevation für Himmel (parallel)
+        right_vec = np.array([1, 0, 0])  # X-Achse für horizontale Bewegung
+        up_vec = np.array([0, 0.866, -0.5])  # Hoch-Vektor angepasst für 60° Neigung
+    elif camera_name == 'webcam_2':
+        # Zentrum: gerade nach vorne
+        base_dir = np.array([0, 1, 0])
+        right_vec = np.array([1, 0, 0])
+        up_vec = np.array([0, 0, 1])
+    else:
+        # Default: gerade nach vorne
+        base_dir = np.array([0, 1, 0])
+        right_vec = np.array([1, 0, 0])
+        up_vec = np.array([0, 0, 1])
+
+    # Kombiniere Basis-Richtung mit Pixel-Offset
+    direction = base_dir + (right_vec * norm_x * fov_factor) + (up_vec * norm_y * fov_factor)
+
+    # Normalisiere Richtungsvektor
+    return direction / np.linalg.norm(direction)
+
+
+def line_intersection_3d_with_confidence(p1, d1, p2, d2):
+    """Finde Kreuzungspunkt mit Confidence-Score - optimiert für Himmel-Tracking (große Entfernungen)"""
+    w = p1 - p2
+    a = np.dot(d1, d1)
+    b = np.dot(d1, d2)
+    c = np.dot(d2, d2)
+    d = np.dot(d1, w)
+    e = np.dot(d2, w)
+
+    denominator = a * c - b * b
+    if abs(denominator) < 1e-8:  # Strengere Parallel-Erkennung für Himmel-Tracking
+        return None, 0.0
+
+    t1 = (b * e - c * d) / denominator
+    t2 = (a * e - b * d) / denominator
+
+    # Für Himmel-Tracking: Nur positive t-Werte (vor den Kameras)
+    if t1 < 0.1 or t2 < 0.1:  # Mindestabstand 10cm
+        return None, 0.0
+
+    # Berechne nächste Punkte auf beiden Linien
+    closest1 = p1 + t1 * d1
+    closest2 = p2 + t2 * d2
+
+    # Mittelpunkt als Triangulation
+    intersection = (closest1 + closest2) / 2
+
+    # Confidence für große Entfernungen angepasst
+    distance = np.linalg.norm(closest1 - closest2)
+
+    # Für Flugzeuge/Vögel: Toleriere größere Abstände zwischen den Strahlen
+    confidence = max(0.0, 1.0 - distance / 50.0)  # 50m Toleranz statt 2m
+
+    # Winkel zwischen Strahlen - für parallele Kameras sind kleine Winkel OK
+    cos_angle = abs(np.dot(d1, d2))
+    angle_confidence = 1.0 - cos_angle * 0.5  # Weniger Penalty für parallele Strahlen
+
+    # Entfernung zu Kameras - Flugzeuge sind weit weg
+    dist1 = np.linalg.norm(intersection - p1)
+    dist2 = np.linalg.norm(intersection - p2)
+    avg_distance = (dist1 + dist2) / 2
+
+    # Optimaler Bereich für Flugzeuge: 100m - 10km
+    if 100 <= avg_distance <= 10000:
+        distance_confidence = 1.0
+    elif avg_distance < 100:
+        distance_confidence = avg_distance / 100.0  # Reduziere Confidence für zu nahe Objekte
+    else:
+        distance_confidence = 1.0 / (1.0 + (avg_distance - 10000) / 5000.0)  # Reduziere für sehr weit entfernte
+
+    # Kombinierte Confidence
+    final_confidence = confidence * angle_confidence * distance_confidence
+
+    return intersection, final_confidence
+
+
+class TrackingEngine:
+    """Capture-, Detection-, Filter- und Triangulations-Pipeline ohne GUI"""
+
+    def __init__(self, config=None, log=None, stream_resolver=None):
+        self.config = config or TrackingConfig()
+        self.log = log or print
+
+        self.caps = {}
+        self.capture_threads = {}  # Ein Reader-Thread + Ringpuffer pro Kamera
+        self.detectors = {}  # MotionDetector (eigenes Hintergrundmodell) pro Stream
+        self.worker_pool = None  # Optional: ein Detection-Prozess pro Kamera
+        self.replay_session = None  # Gemeinsame Uhr bei Replay-Quellen
+        self.recorder = None  # Optional: Rohframe-Aufnahme als Session
+        self.governor = None  # Frame-Pacing der Tracking-Schleife
+        self.camera_regions = {}  # ROI + Ausschluss-Masken pro Kamera (camera_config.json)
+        self.region_snapshot_request = False  # ROI-Editor wartet auf Rohframes
+        self.region_snapshots = {}
+
+        self.detections = DetectionStore()  # Alle Blobs als Records pro Kamera (Dashboard, 3D, Triangulation)
+        self.cloud_filters = {}  # AntiCloudFilter (Objektzustand) pro Stream
+        self.trackers = {}  # MultiObjectTracker (Kalman-Tracks der gefilterten Blobs) pro Stream
+        self.roi_schedulers = {}  # RoiScheduler (Suchfenster aktiver Tracks) pro Stream
+        self.gate_stats = {}  # Motion-Gate pro Stream: [Frames, davon gated]
+        self.storm_frames = {}  # Contour-Storm pro Stream: verworfene Frames der laufenden Episode
+        self.current_motion_counts = {}
+        self.current_fps = 0
+        self.tracking_start_time = 0
+        self.last_detection_frame = None
+        self.last_detection_info = None
+
+        # Standard Kamera-Positionen - bei Webcams aus den aktiven Indizes abgeleitet
+        self.camera_positions = {
+            'webcam_0': np.array([-1, 0, 0]),     # Links (1m von Zentrum)
+            'webcam_1': np.array([1, 0, 0]),      # Rechts (1m von Zentrum)
+            'webcam_2': np.array([0, 0, 0])       # Zentrum (falls vorhanden)
+        }
+        self.camera_colors = {
+            'webcam_0': 'red',     # Links = Rot
+            'webcam_1': 'green',   # Rechts = Grün
+            'webcam_2': 'blue'     # Zentrum = Blau (falls vorhanden)
+        }
+
+        # Optionaler Anzeige-Hook: on_frames(results, motion_counts, frame_count,
+        # start_time, new_frames) → False beendet die Schleife. results sind
+        # DetectionResults - gezeichnet wird nur über render_frames()
+        self.on_frames = None
+        self.overlay_renderer = OverlayRenderer()  # Höchstens Anzeige-Wiederholrate
+        self.is_running = False
+
+        # YouTube-URLs: parallel aufgelöst, auf Disk gecached, vor Ablauf erneuert
+        self.stream_resolver = stream_resolver or StreamResolver(log=self.log)
+
+        try:
+            self.camera_regions = load_camera_regions()
+            if self.camera_regions:
+                self.log(f"✂️ ROI/Masken für {len(self.camera_regions)} Kamera(s) geladen")
+        except Exception as e:
+            self.log(f"⚠️ Kamera-Konfiguration unlesbar: {str(e)}")
+
+    def update_config(self, config):
+        """Neuen Config-Snapshot übernehmen - wirkt ab dem nächsten Frame"""
+        self.config = config
+
+    def pipeline_time(self):
+        """Aktuelle Zeit auf der Uhr der Capture-Zeitstempel (Sekunden)
+
+        Live: time.monotonic(). Replay: Uhr der Aufnahme - sonst wären alle
+        Detections für die Triangulation sofort 'veraltet'.
+        """
+        if self.replay_session is not None:
+            return self.replay_session.now()
+        return time.monotonic()
+
+    # ---------------------------------------------------------------- Quellen
+
+    def open_sources(self, source, url=None, webcams=None, replay_dir=None, replay_speed=1.0):
+        """Initialize video sources based on type
+
+        Args:
+            source: Eintrag aus VIDEO_SOURCES (bzw. dict mit 'type')
+            url: Custom URL (type custom_url)
+            webcams: Webcam-Indizes (type multi_webcam)
+            replay_dir / replay_speed: Session-Verzeichnis (type replay)
+        """
+        if source['type'] == 'webcam':
+            cap = cv2.VideoCapture(source['source'])
+            if cap.isOpened():
+                webcam_name = f"webcam_{source['source']}"
+                self.caps[webcam_name] = cap
+                self.detectors[webcam_name] = self._create_detector()
+                self.log(f"✅ Webcam {source['source']} initialisiert")
+                return True
+            else:
+                self.log(f"❌ Webcam {source['source']} konnte nicht geöffnet werden")
+                return False
+
+        elif source['type'] == 'multi_webcam':
+            success_count = 0
+            # Verwende nur ausgewählte Webcams
+            selected_webcams = list(webcams if webcams is not None else source.get('sources', []))
+
+            if not selected_webcams:
+                self.log("❌ Keine Webcams ausgewählt!")
+                return False
+
+            self.log(f"🎯 Verwende ausgewählte Webcams: {selected_webcams}")
+
+            for webcam_idx in selected_webcams:
+                try:
+                    cap = cv2.VideoCapture(webcam_idx)
+                    if cap.isOpened():
+                        # Set Full HD resolution (1920x1080) at 30 FPS
+                        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
+                        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+                        cap.set(cv2.CAP_PROP_FPS, 30)
+                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+                        # Test ob die Webcam wirklich verfügbar ist
+                        ret, frame = cap.read()
+                        if ret and frame is not None:
+                            actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                            actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                            self.log(f"🎥 Webcam {webcam_idx} Auflösung: {actual_width}x{actual_height}")
+
+                            webcam_name = f"webcam_{webcam_idx}"
+                            self.caps[webcam_name] = cap
+                            self.detectors[webcam_name] = self._create_detector()
+                            self.log(f"✅ Webcam {webcam_idx} initialisiert")
+                            success_count += 1
+                        else:
+                            cap.release()
+                            self.log(f"⚠️ Webcam {webcam_idx} verfügbar aber liefert keine Frames")
+                    else:
+                        self.log(f"⚠️ Webcam {webcam_idx} nicht verfügbar")
+                except Exception as e:
+                    self.log(f"❌ Webcam {webcam_idx} Fehler: {str(e)}")
+
+            if success_count > 0:
+                self.log(f"✅ Multi-Webcam: {success_count}/{len(selected_webcams)} Kameras aktiv")
+                # Update Kamera-Positionen basierend auf aktiven Webcams
+                self._update_camera_positions_for_active_webcams(selected_webcams)
+                return True
+            else:
+                self.log("❌ Keine ausgewählten Webcams konnten initialisiert werden")
+                return False
+
+        elif source['type'] == 'youtube_single':
+            return self._init_youtube_streams({'youtube': source['source']})
+
+        elif source['type'] == 'youtube_dual':
+            return self._init_youtube_streams(source['sources'])
+
+        elif source['type'] == 'custom_url':
+            url = (url or source.get('source') or '').strip()
+            if not url:
+                self.log("❌ Keine Custom URL eingegeben")
+                return False
+            return self._init_custom_url(url)
+
+        elif source['type'] == 'replay':
+            session_dir = (replay_dir or source.get('source') or '').strip()
+            if not session_dir:
+                self.log("❌ Keine Session ausgewählt")
+                return False
+            return self._init_replay(session_dir, replay_speed)
+
+        return False
+
+    def _update_camera_positions_for_active_webcams(self, active_webcams):
+        """Update Kamera-Positionen basierend auf aktive Webcams"""
+        # Nur für aktive Webcams Positionen setzen
+        self.camera_positions = {}
+        self.camera_colors = {}
+
+        if len(active_webcams) == 1:
+            # Eine Kamera - zentral
+            webcam_name = f"webcam_{active_webcams[0]}"
+            self.camera_positions[webcam_name] = np.array([0, 0, 0])
+            self.camera_colors[webcam_name] = 'red'
+
+        elif len(active_webcams) == 2:
+            # Zwei Kameras - nebeneinander mit 30° Rotation (optimal)
+            webcam_0 = f"webcam_{active_webcams[0]}"
+            webcam_1 = f"webcam_{active_webcams[1]}"
+
+            self.camera_positions[webcam_0] = np.array([-1, 0, 0])  # Links
+            self.camera_positions[webcam_1] = np.array([1, 0, 0])   # Rechts
+
+            self.camera_colors[webcam_0] = 'red'
+            self.camera_colors[webcam_1] = 'green'
+
+        else:
+            # Drei oder mehr Kameras - erweiterte Anordnung
+            colors = ['red', 'green', 'blue', 'yellow']
+            for i, webcam_idx in enumerate(active_webcams):
+                webcam_name = f"webcam_{webcam_idx}"
+
+                if i == 0:
+                    self.camera_positions[webcam_name] = np.array([-1, 0, 0])  # Links
+                elif i == 1:
+                    self.camera_positions[webcam_name] = np.array([1, 0, 0])   # Rechts
+                elif i == 2:
+                    self.camera_positions[webcam_name] = np.array([0, 0, 0])   # Zentrum
+                else:
+                    # Weitere Kameras in einem Kreis anordnen
+                    angle = (i - 2) * (2 * np.pi / max(1, len(active_webcams) - 2))
+                    radius = 1.5
+                    x = radius * np.cos(angle)
+                    y = radius * np.sin(angle)
+                    self.camera_positions[webcam_name] = np.array([x, y, 0])
+
+                self.camera_colors[webcam_name] = colors[min(i, len(colors) - 1)]
+
+        self.log(f"📍 Kamera-Positionen aktualisiert für {len(active_webcams)} aktive Webcams")
+
+    def _init_youtube_streams(self, youtube_urls):
+        """Löse alle Stream-URLs gleichzeitig auf (Cache zuerst) und öffne die Streams"""
+        self.log(f"🔗 Extrahiere {len(youtube_urls)} YouTube Stream-URL(s)...")
+        stream_urls = self.stream_resolver.resolve_many(youtube_urls)
+        success_count = 0
+
+        for name, youtube_url in youtube_urls.items():
+            try:
+                cap = self._open_stream(stream_urls.get(name))
+                if cap is None and stream_urls.get(name):
+                    # Gecachte URL evtl. ungültig - einmal frisch auflösen
+                    self.stream_resolver.invalidate(youtube_url)
+                    cap = self._open_stream(self.stream_resolver.resolve(youtube_url, use_cache=False))
+
+                if cap is not None:
+                    self.caps[name] = cap
+                    self.detectors[name] = self._create_detector()
+                    self.log(f"✅ {name} Stream initialisiert")
+                    success_count += 1
+                else:
+                    self.log(f"❌ {name} Stream konnte nicht geöffnet werden")
+
+            except Exception as e:
+                self.log(f"❌ {name} Initialisierung fehlgeschlagen: {str(e)}")
+
+        return success_count > 0
+
+    def _open_stream(self, stream_url):
+        """VideoCapture für eine Stream-URL oder None"""
+        if not stream_url:
+            return None
+        cap = cv2.VideoCapture(stream_url)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        if cap.isOpened():
+            return cap
+        cap.release()
+        return None
+
+    def _init_custom_url(self, url):
+        """Initialize custom URL"""
+        try:
+            cap = cv2.VideoCapture(url)
+            if cap.isOpened():
+                self.caps['custom'] = cap
+                self.detectors['custom'] = self._create_detector()
+                self.log("✅ Custom URL initialisiert")
+                return True
+            else:
+                self.log("❌ Custom URL konnte nicht geöffnet werden")
+        except Exception as e:
+            self.log(f"❌ Custom URL Initialisierung fehlgeschlagen: {str(e)}")
+
+        return False
+
+    def _init_replay(self, session_dir, speed):
+        """Initialize recorded session replay"""
+        try:
+            self.replay_session = ReplaySession(session_dir, speed=speed)
+            for name, cap in self.replay_session.open_captures().items():
+                self.caps[name] = cap
+                self.detectors[name] = self._create_detector()
+                self.log(f"✅ Replay {name}: {len(cap.index)} Frames")
+
+            # Kamera-Positionen für aufgezeichnete Webcams übernehmen
+            webcam_indices = [int(name.split('_')[1]) for name in self.caps
+                              if name.startswith('webcam_') and name.split('_')[1].isdigit()]
+            if len(webcam_indices) == len(self.caps):
+                self._update_camera_positions_for_active_webcams(webcam_indices)
+
+            tempo = "maximal" if self.replay_session.max_speed else f"{speed:g}x"
+            self.log(f"⏯️ Replay gestartet: {self.replay_session.duration:.1f}s Aufnahme, Tempo {tempo}")
+            return True
+        except Exception as e:
+            self.log(f"❌ Replay Initialisierung fehlgeschlagen: {str(e)}")
+            self.replay_session = None
+            return False
+
+    def _create_detector(self):
+        """MotionDetector passend zum aktuellen Profil"""
+        detector = MotionDetector(**self.config.detector_kwargs)
+        if detector.backend != self.config.backend and not self.detectors:
+            self.log("⚠️ motion_kernel_cpp nicht gebaut (core/setup.py) - OpenCV-Pipeline")
+        return detector
+
+    def _rebuild_detectors(self, detector_kwargs):
+        """Profilwechsel im Betrieb: neues Hintergrundmodell für alle Streams"""
+        for name in list(self.detectors):
+            self.detectors[name] = MotionDetector(**detector_kwargs)
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = DetectionWorkerPool(log=self.log, detector_kwargs=detector_kwargs)
+        model = (detector_kwargs['background'] or {}).get('model', 'mog2')
+        native = detector_kwargs['backend'] == 'native' and NATIVE_KERNEL_AVAILABLE
+        self.log(f"🔄 Hintergrundmodell: {model}" + (" (nativer Kernel)" if native else ""))
+
+    # --------------------------------------------------------------- Schleife
+
+    def stop(self):
+        """Schleife beenden (Aufräumen über close())"""
+        self.is_running = False
+
+    def run(self):
+        """Tracking-Schleife - blockiert bis stop(), on_frames → False oder Replay-Ende"""
+        self.log("🎯 Starte Motion Detection...")
+        self.is_running = True
+
+        frame_count = 0
+        start_time = time.time()
+        self.tracking_start_time = start_time
+        fps_update_interval = 30  # Update FPS every 30 frames
+
+        # Ein Reader-Thread pro Kamera - langsame Kameras bremsen die anderen nicht
+        self._start_capture_threads()
+        last_seqs = {}  # Zuletzt verarbeiteter Frame pro Kamera
+        self.gate_stats = {}
+        self.storm_frames = {}
+        frames = {}  # Neuestes DetectionResult pro Kamera (für Anzeige)
+        motion_counts = {}
+
+        # Optional: Detection pro Kamera in eigenem Prozess (nutzt alle Kerne)
+        config = self.config
+        detector_kwargs = config.detector_kwargs
+        if config.multiprocess and self.worker_pool is None:
+            self.worker_pool = DetectionWorkerPool(log=self.log, detector_kwargs=config.detector_kwargs)
+            self.log("⚡ Multi-Process Detection aktiviert")
+
+        # Ziel-FPS des Profils - Replay mit Maximaltempo läuft ungebremst
+        max_speed = self.replay_session is not None and self.replay_session.max_speed
+        self.governor = FrameRateGovernor(0 if max_speed else config.target_fps, log=self.log)
+        roi_fallback_logged = False
+
+        while self.is_running:
+            self.governor.begin()
+            # EIN Snapshot pro Iteration - GUI kann jederzeit einen neuen einsetzen
+            config = self.config
+            if config.detector_kwargs != detector_kwargs:
+                detector_kwargs = config.detector_kwargs
+                self._rebuild_detectors(detector_kwargs)
+            if not max_speed and config.target_fps != self.governor.target_fps:
+                self.governor.set_target_fps(config.target_fps)
+            if config.roi_tracking and self.worker_pool is not None and not roi_fallback_logged:
+                self.log("⚠️ Suchfenster nur ohne Multi-Process - Worker verarbeiten volle Frames")
+                roi_fallback_logged = True
+            # Profil-Pyramide × Frame-Pacing (bei Überlast zusätzlich halbiert)
+            scale = config.detection_scale * self.governor.detection_scale
+            new_frames = 0
+            pending = []  # (name, frame, timestamp) - an Worker-Prozesse übergeben
+
+            # Neuesten Frame jeder Kamera holen - NICHT blockierend
+            for name, reader in list(self.capture_threads.items()):
+                if not self.is_running:
+                    break
+
+                latest = reader.get_latest(last_seqs.get(name, 0))
+                if latest is None:
+                    continue  # Kein neuer Frame - nicht auf diese Kamera warten
+
+                seq, frame, timestamp_ns = latest
+                last_seqs[name] = seq
+                if self.region_snapshot_request:
+                    self.region_snapshots[name] = frame.copy()  # Rohframe für den ROI-Editor
+                timestamp = timestamp_ns / 1e9  # Capture-Zeit (monoton, Sekunden)
+                try:
+                    if self.worker_pool is not None:
+                        # Alle Kameras zuerst abschicken - laufen parallel
+                        if self.worker_pool.submit(name, frame, config.threshold, config.min_area,
+                                                   config.max_area, scale, config.refine,
+                                                   self.camera_regions.get(name)):
+                            pending.append((name, frame, timestamp, seq))
+                        else:
+                            self._drop_result(name, frames, motion_counts)
+                        continue
+
+                    result = self.process_motion(frame, name, config, timestamp, scale=scale, frame_id=seq)
+                    self._count_gate(name, result.gated)
+                    self._note_storm(name, result.storm)
+                    frames[name] = result
+                    motion_counts[name] = result.filtered_count
+                    new_frames += 1
+                except Exception as e:
+                    self.log(f"❌ {name} Processing-Fehler: {str(e)}")
+                    self._drop_result(name, frames, motion_counts)
+
+            # Ergebnisse der Worker-Prozesse einsammeln (nur Blob-Records) - eine Frist
+            # für alle Kameras, ein hängender Worker wird übersprungen
+            deadline = self.worker_pool.deadline() if pending else None
+            for name, frame, timestamp, seq in pending:
+                try:
+                    blobs = self.worker_pool.collect(name, deadline=deadline)
+                    if blobs is None:
+                        self._drop_result(name, frames, motion_counts)
+                        continue
+                    if self.worker_pool.gated.get(name):
+                        result = DetectionResult.empty(name, frame, timestamp, gated=True)
+                    elif self.worker_pool.storm.get(name):
+                        result = DetectionResult.empty(name, frame, timestamp, storm=self.worker_pool.storm[name])
+                    else:
+                        result = self.apply_motion_filters(frame, name, blobs, config, timestamp, frame_id=seq)
+                    self._count_gate(name, result.gated)
+                    self._note_storm(name, result.storm)
+                    frames[name] = result
+                    motion_counts[name] = result.filtered_count
+                    new_frames += 1
+                except Exception as e:
+                    self.log(f"❌ {name} Processing-Fehler: {str(e)}")
+                    self._drop_result(name, frames, motion_counts)
+
+            if self.region_snapshot_request and len(self.region_snapshots) >= len(self.capture_threads):
+                self.region_snapshot_request = False
+
+            if new_frames:
+                frame_count += 1
+
+                # Update FPS für Dashboard
+                if frame_count % fps_update_interval == 0:
+                    elapsed = time.time() - start_time
+                    self.current_fps = frame_count / elapsed if elapsed > 0 else 0
+
+            # Update Dashboard Daten
+            self.current_motion_counts = motion_counts.copy()
+
+            # Anzeige (nur mit GUI) - False beendet die Schleife
+            if self.on_frames is not None and self.is_running:
+                if self.on_frames(frames, motion_counts, frame_count, start_time, new_frames) is False:
+                    break
+
+            # Replay zu Ende: alle Kameras leer, Reader beendet und jeder Frame abgeholt
+            if (not new_frames and self.replay_session is not None and self.replay_session.finished
+                    and all(reader.drained for reader in self.capture_threads.values())):
+                self.log(f"⏹️ Replay beendet - {frame_count} Frames verarbeitet")
+                break
+
+            # Nur die Restzeit bis zur Ziel-FPS schlafen, bei Überlast drosseln
+            self.governor.end()
+
+        self.is_running = False
+        self._log_gate_stats()
+        self._log_roi_stats()
+        return frame_count
+
+    @staticmethod
+    def _drop_result(name, frames, motion_counts):
+        """Altes Ergebnis verwerfen - sein Frame liegt in einem Ring-Slot, den die
+        Kamera inzwischen wieder beschreibt"""
+        frames.pop(name, None)
+        motion_counts.pop(name, None)
+
+    def _count_gate(self, name, gated):
+        stats = self.gate_stats.setdefault(name, [0, 0])
+        stats[0] += 1
+        stats[1] += bool(gated)
+
+    def _note_storm(self, name, fraction):
+        """Contour-Storm (Helligkeitssprung) einmal pro Episode loggen"""
+        frames = self.storm_frames.get(name, 0)
+        if fraction:
+            if not frames:
+                self.log(f"🌩️ {name}: Helligkeitssprung - {fraction:.0%} Vordergrund, "
+                         f"Blobs verworfen, Hintergrund lernt neu")
+            self.storm_frames[name] = frames + 1
+        elif frames:
+            self.log(f"🌤️ {name}: Beleuchtung stabil - {frames} Frames verworfen")
+            self.storm_frames[name] = 0
+
+    def _log_gate_stats(self):
+        """Wie viele Frames hat der Motion-Gate gespart? (nur bei aktivem Gate)"""
+        if not self.config.gate:
+            return
+        for name, (frames, gated) in self.gate_stats.items():
+            if frames:
+                self.log(f"🚦 {name}: {gated}/{frames} Frames ohne Bewegung übersprungen ({gated / frames:.0%})")
+
+    def _log_roi_stats(self):
+        """Anteil der Frames/Pixel, die nur in Suchfenstern verarbeitet wurden"""
+        for name, scheduler in self.roi_schedulers.items():
+            if scheduler.frames:
+                self.log(f"🎯 {name}: {scheduler.summary()}")
+
+    def close(self):
+        """Quellen, Threads, Prozesse und Aufnahme freigeben - Engine ist danach wiederverwendbar"""
+        self.is_running = False
+
+        # Replay-Uhr schließen - weckt wartende Reader-Threads auf
+        if self.replay_session is not None:
+            self.replay_session.close()
+
+        # Reader-Threads stoppen bevor die Captures freigegeben werden
+        self._stop_capture_threads()
+        self._stop_recording()
+
+        # Detection-Prozesse beenden + Shared Memory freigeben
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+
+        # Release captures safely
+        caps_to_release = list(self.caps.items()) if self.caps else []
+        for name, cap in caps_to_release:
+            try:
+                if cap and hasattr(cap, 'isOpened'):
+                    if cap.isOpened():
+                        # For webcams, clear buffer first
+                        if 'webcam' in name.lower():
+                            try:
+                                # Quick buffer clear
+                                for _ in range(3):
+                                    ret, _ = cap.read()
+                                    if not ret:
+                                        break
+                            except Exception:
+                                pass
+                        cap.release()
+                        self.log(f"✅ {name} released")
+
+            except Exception as e:
+                self.log(f"⚠️ {name} release error: {str(e)}")
+
+        # Clear data structures
+        self.caps.clear()
+        self.detectors.clear()
+        self.cloud_filters.clear()
+        self.trackers.clear()
+        self.roi_schedulers.clear()
+        self.replay_session = None
+
+    def _start_capture_threads(self):
+        """Starte einen Reader-Thread mit Ringpuffer pro Kamera"""
+        for name, cap in list(self.caps.items()):
+            if name in self.capture_threads:
+                continue
+            # Replay mit Maximaltempo: kein Frame darf verworfen werden
+            lossless = self.replay_session is not None and self.replay_session.max_speed
+            reader = CameraCaptureThread(name, cap, buffer_capacity=3, log=self.log, lossless=lossless)
+            reader.start()
+            self.capture_threads[name] = reader
+        self.log(f"📷 {len(self.capture_threads)} Capture-Threads gestartet")
+
+        if self.config.record:
+            self._start_recording()
+
+    def _start_recording(self):
+        """Starte die Session-Aufnahme - Capture-Threads liefern die Rohframes"""
+        try:
+            session_dir = os.path.join(self.config.recordings_dir,
+                                       datetime.now().strftime("session_%Y%m%d_%H%M%S"))
+            fps = self.config.target_fps  # Nur nominell - Zeitstempel stehen im Index
+            self.recorder = SessionRecorder(session_dir, list(self.capture_threads.keys()),
+                                            fps=fps, log=self.log)
+            self.recorder.start()
+            for reader in self.capture_threads.values():
+                reader.on_frame = self.recorder.submit
+            self.log(f"⏺️ Aufnahme gestartet: {session_dir}")
+        except Exception as e:
+            self.log(f"❌ Aufnahme konnte nicht gestartet werden: {str(e)}")
+            self.recorder = None
+
+    def _stop_recording(self):
+        """Beende die Aufnahme (nach dem Stoppen der Capture-Threads)"""
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.stop()
+            written = sum(self.recorder.frames_written.values())
+            dropped = sum(self.recorder.frames_dropped.values())
+            self.log(f"💾 Aufnahme gespeichert: {self.recorder.session_dir} "
+                     f"({written} Frames, {dropped} verworfen)")
+        except Exception as e:
+            self.log(f"⚠️ Aufnahme-Stop-Fehler: {str(e)}")
+        self.recorder = None
+
+    def _stop_capture_threads(self):
+        """Stoppe alle Reader-Threads - MUSS vor cap.release() passieren"""
+        for name, reader in list(self.capture_threads.items()):
+            try:
+                reader.stop(timeout=1.0)
+                if reader.frames_dropped:
+                    self.log(f"📉 {name}: {reader.frames_dropped}/{reader.frames_captured} Frames verworfen")
+            except Exception as e:
+                self.log(f"⚠️ {name} Capture-Thread Stop-Fehler: {str(e)}")
+        self.capture_threads.clear()
+
+    # -------------------------------------------------------- Detection/Filter
+
+    def process_motion(self, frame, stream_name, config, timestamp=None, scale=None, frame_id=-1):
+        """Process motion detection on frame
+
+        config: TrackingConfig-Snapshot dieser Iteration
+        timestamp: Capture-Zeit des Frames (time.monotonic() Sekunden)
+        scale: Detection-Pyramide (Profil + Frame-Pacing), Standard aus config
+        frame_id: Capture-Sequenz des Frames (für den DetectionStore)
+
+        Returns:
+            DetectionResult - gezeichnet wird erst in render_frames()
+        """
+        if frame is None:
+            return None
+
+        if scale is None:
+            scale = config.detection_scale
+        detector = self.detectors[stream_name]
+        windows = self._plan_windows(stream_name, detector, config, frame, timestamp, scale)
+        if windows is not None:
+            # Aktive Tracks: nur die vorhergesagten Suchfenster, in Vollauflösung
+            blobs = detector.detect_windows(frame, windows, config.min_area, config.max_area,
+                                            self.camera_regions.get(stream_name))
+            return self.apply_motion_filters(frame, stream_name, blobs, config, timestamp, frame_id,
+                                             rois=windows)
+
+        # Detection-Pipeline: Gate → Hintergrund → Threshold → Morphologie → Komponenten
+        blobs = detector.detect(frame, config.threshold, config.min_area, config.max_area,
+                                scale, config.refine, self.camera_regions.get(stream_name))
+        if detector.gated:
+            # Keine globale Veränderung - Anti-Wolken Filter entfällt
+            return DetectionResult.empty(stream_name, frame, timestamp, gated=True)
+        if detector.storm:
+            # Helligkeitssprung - die Blobs wären Artefakte, Filter und Overlay entfallen
+            return DetectionResult.empty(stream_name, frame, timestamp, storm=detector.foreground_fraction)
+
+        return self.apply_motion_filters(frame, stream_name, blobs, config, timestamp, frame_id)
+
+    def _plan_windows(self, stream_name, detector, config, frame, timestamp, scale=1.0):
+        """Suchfenster der aktiven Tracks (roi_scheduler) oder None = vollen Frame scannen"""
+        if not config.roi_tracking or not detector.supports_windows:
+            return None
+        scheduler = self.roi_schedulers.get(stream_name)
+        if scheduler is None:
+            scheduler = self.roi_schedulers[stream_name] = RoiScheduler()
+        scheduler.scan_interval = config.roi_scan_interval
+        return scheduler.plan(self.trackers.get(stream_name),
+                              timestamp if timestamp is not None else time.monotonic(), frame.shape, scale)
+
+    def apply_motion_filters(self, frame, stream_name, blobs, config, timestamp=None, frame_id=-1,
+                             rois=None):
+        """Anti-Wolken Filter für die Blobs eines Frames → DetectionResult
+
+        rois: Suchfenster, auf die sich die Detection beschränkt hat (nur Overlay)
+        """
+        # Alle Blobs tragen die Capture-Zeit ihres Frames - nicht die Verarbeitungszeit
+        current_time = timestamp if timestamp is not None else time.monotonic()
+
+        # ANTI-WOLKEN FILTER - Bewegung, Fläche und Speed für alle Blobs auf einmal,
+        # jeder Blob gegen die Historie seines eigenen Objekts
+        cloud_filter = self.cloud_filters.get(stream_name)
+        if cloud_filter is None:
+            cloud_filter = self.cloud_filters[stream_name] = AntiCloudFilter()
+        cloud_filter.set_match_radius(match_radius_for(frame.shape, config.anti_cloud_match))
+        passes, reasons = cloud_filter.evaluate(blobs, current_time, config.min_movement,
+                                                config.anti_cloud_min_area, config.anti_cloud_max_area,
+                                                config.min_speed)
+        passed = np.flatnonzero(passes)
+
+        # Gefilterte Blobs global den Kalman-Tracks zuordnen
+        tracker = self.trackers.get(stream_name)
+        if tracker is None:
+            tracker = self.trackers[stream_name] = MultiObjectTracker()
+        tracker.max_distance = config.track_distance
+        track_ids = np.full(len(blobs), -1, np.int64)
+        track_ids[passed] = tracker.update(np.column_stack((blobs['cx'][passed], blobs['cy'][passed])),
+                                           current_time)
+
+        result = DetectionResult(stream_name, frame, current_time, blobs, passes, reasons,
+                                 track_ids=track_ids, rois=rois)
+        # Alle Blobs (auch verworfene) für 3D Viewer, Dashboard und Triangulation
+        self.detections.add(result, frame_id)
+
+        if len(passed):
+            # Extract detection region (größerer Bereich) für das Last Detection Window
+            blob = blobs[passed[-1]]
+            x, y, w, h = int(blob['x']), int(blob['y']), int(blob['w']), int(blob['h'])
+            padding = 30
+            detection_region = frame[max(0, y-padding):min(frame.shape[0], y+h+padding),
+                                   max(0, x-padding):min(frame.shape[1], x+w+padding)]
+            if detection_region.size > 0:
+                self.last_detection_frame = detection_region.copy()
+                self.last_detection_info = {
+                    'timestamp': current_time,
+                    'camera': stream_name,
+                    'area': float(blob['area']),
+                    'center': (int(blob['cx']), int(blob['cy'])),
+                    'bbox': (x, y, w, h),
+                    'reason': describe_reasons(reasons[passed[-1]])
+                }
+
+        return result
+
+    # ---------------------------------------------------------------- Overlays
+
+    def overlay_header(self, result, config=None):
+        """Kopfzeilen (Stream, Zähler, Filter-Parameter) für den OverlayRenderer"""
+        config = config or self.config
+        timestamp_str = datetime.now().strftime("%H:%M:%S")
+        return [
+            (f'{result.camera} - {timestamp_str}', (10, 30), 0.7, (255, 255, 255), 2),
+            (f'Total Motion: {result.motion_count} | 🦅 Vögel: {result.filtered_count}',
+             (10, 60), 0.7, (0, 255, 0), 2),
+            # Filter-Parameter anzeigen
+            (f'🌤️ Anti-Wolken: Move≥{config.min_movement}px '
+             f'Area{config.anti_cloud_min_area}-{config.anti_cloud_max_area}px² '
+             f'Speed≥{config.min_speed}', (10, 90), 0.4, (0, 255, 255), 1),
+        ]
+
+    def render_frames(self, results):
+        """Annotierte Bilder für anzuzeigende/zu speichernde Frames
+
+        Bei Überlast (Frame-Pacing) nur Rohbilder ohne Annotationen.
+        """
+        annotate = self.governor is None or self.governor.draw_overlays
+        return {name: self.overlay_renderer.render(result, self.overlay_header(result),
+                                                   self.camera_regions.get(name), annotate)
+                for name, result in results.items()}
+
+    # ----------------------------------------------------------- Triangulation
+
+    def synchronized_matches(self, window=1.0, limit=20, one_to_one=False):
+        """Alle zeitgleichen Detection-Paare der Kameras mit bekannter Position
+
+        Returns:
+            (recent, matches) - {Kamera: Records} und SYNC_DTYPE-Paare (detection_store)
+        """
+        # Nur gefilterte Events des Zeitfensters (neueste limit pro Kamera)
+        recent = self.detections.recent(self.pipeline_time() - window, cameras=list(self.camera_positions),
+                                         limit=limit)
+        return recent, match_synchronized(recent, SYNC_TOLERANCE, one_to_one)
+
+    def synchronized_motions(self):
+        """Filtere nur zeitgleiche Bewegungen auf beiden Kameras - KERN-FILTER
+
+        Returns:
+            {Kamera: Record} des Paares mit der kleinsten Zeitdifferenz ({} ohne Treffer)
+        """
+        try:
+            return best_synchronized(*self.synchronized_matches())
+        except Exception:
+            # Sicher fallback
+            return {}
+
+    def triangulate(self, synchronized_motions=None, min_confidence=0.2):
+        """Gewichtete 3D-Position der synchronen Motions
+
+        Returns:
+            (Position als np.array, mittlere Confidence) oder None
+        """
+        if synchronized_motions is None:
+            synchronized_motions = self.synchronized_motions()
+        if len(synchronized_motions) < 2:
+            return None
+
+        triangulated_points = []
+        confidence_scores = []
+        camera_names = list(synchronized_motions.keys())
+        for i in range(len(camera_names)):
+            for j in range(i + 1, len(camera_names)):
+                cam1_name, cam2_name = camera_names[i], camera_names[j]
+                motion1 = synchronized_motions[cam1_name]
+                motion2 = synchronized_motions[cam2_name]
+                intersection, confidence = line_intersection_3d_with_confidence(
+                    self.camera_positions[cam1_name], pixel_to_3d_direction(motion1['cx'], motion1['cy'], cam1_name),
+                    self.camera_positions[cam2_name], pixel_to_3d_direction(motion2['cx'], motion2['cy'], cam2_name))
+                if intersection is not None and confidence > min_confidence:
+                    triangulated_points.append(intersection)
+                    confidence_scores.append(confidence)
+
+        total_weight = sum(confidence_scores)
+        if total_weight <= 0:
+            return None
+        # Gewichteter Durchschnitt aller Triangulationen
+        weights = np.array(confidence_scores) / total_weight
+        position = np.sum(np.array(triangulated_points) * weights[:, None], axis=0)
+        return position, total_weight / len(confidence_scores)
+
+
+# ------------------------------------------------------------------------ CLI
+
+def _match_profile(name):
+    """Profil per Teilstring ohne Emoji finden ('bird' → '🐦 Bird')"""
+    for profile_name in DETECTION_PROFILES:
+        if name.lower() in profile_name.lower():
+            return profile_name
+    raise argparse.ArgumentTypeError(
+        f"Unbekanntes Profil '{name}' - verfügbar: {', '.join(DETECTION_PROFILES)}")
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(description="Headless Motion Tracking (ohne GUI)")
+    parser.add_argument('--profile', type=_match_profile, default="🎯 Custom",
+                        help="Detection-Profil: mosquito, bird, aircraft, custom")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--webcam', type=int, nargs='+', metavar='INDEX', help="Webcam-Index(e)")
+    source.add_argument('--url', help="Stream-/Video-URL oder Datei")
+    source.add_argument('--youtube', nargs='+', metavar='URL', help="YouTube Live-URL(s)")
+    source.add_argument('--replay', metavar='DIR', help="Aufgezeichnete Session")
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay-Tempo (0 = maximal)")
+    parser.add_argument('--threshold', type=int)
+    parser.add_argument('--min-area', type=int)
+    parser.add_argument('--max-area', type=int)
+    parser.add_argument('--fps', type=float, help="Ziel-FPS (0 = unbegrenzt)")
+    parser.add_argument('--multiprocess', action='store_true', help="Detection pro Kamera in eigenem Prozess")
+    parser.add_argument('--native', action='store_true',
+                        help="Fusionierter C++-Kernel (core/motion_kernel.cpp) statt OpenCV-Pipeline")
+    parser.add_argument('--no-gate', action='store_true',
+                        help="Motion-Gate aus - jeder Frame durchläuft die volle Pipeline")
+    parser.add_argument('--record', action='store_true', help="Rohframes als Session aufnehmen")
+    parser.add_argument('--duration', type=float, default=0, help="Laufzeit in Sekunden (0 = unbegrenzt)")
+    parser.add_argument('--output', help="Triangulierte Positionen als JSON Lines anhängen")
+    parser.add_argument('--show', action='store_true', help="Frames mit Overlays anzeigen (braucht Display)")
+    return parser
+
+
+def _source_from_args(args):
+    """(VIDEO_SOURCES-artiger Eintrag, open_sources kwargs) aus den CLI-Argumenten"""
+    if args.webcam:
+        if len(args.webcam) == 1:
+            return {'type': 'webcam', 'source': args.webcam[0]}, {}
+        return {'type': 'multi_webcam'}, {'webcams': args.webcam}
+    if args.youtube:
+        if len(args.youtube) == 1:
+            return {'type': 'youtube_single', 'source': args.youtube[0]}, {}
+        return {'type': 'youtube_dual',
+                'sources': {f"youtube_{i}": url for i, url in enumerate(args.youtube)}}, {}
+    if args.replay:
+        return {'type': 'replay'}, {'replay_dir': args.replay, 'replay_speed': args.speed}
+    return {'type': 'custom_url'}, {'url': args.url}
+
+
+def main(argv=None):
+    """Headless Entry Point - gleiche Pipeline wie die GUI"""
+    args = _build_parser().parse_args(argv)
+
+    overrides = {'multiprocess': args.multiprocess, 'record': args.record}
+    if args.native:
+        overrides['backend'] = 'native'
+    if args.no_gate:
+        overrides['gate'] = ()
+    for field, value in (('threshold', args.threshold), ('min_area', args.min_area),
+                         ('max_area', args.max_area), ('target_fps', args.fps)):
+        if value is not None:
+            overrides[field] = value
+    config = TrackingConfig.from_profile(args.profile, **overrides)
+
+    engine = TrackingEngine(config)
+    source, options = _source_from_args(args)
+    if not engine.open_sources(source, **options):
+        engine.log("❌ Konnte Video-Quellen nicht initialisieren")
+        engine.close()
+        return 1
+
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    deadline = time.monotonic() + args.duration if args.duration > 0 else None
+    last_report = [time.monotonic()]
+    last_position = [None]
+
+    def on_frames(frames, motion_counts, frame_count, start_time, new_frames):
+        if args.show:
+            # Zeichnen nur für tatsächlich angezeigte Frames
+            if new_frames and engine.overlay_renderer.due():
+                for name, image in engine.render_frames(frames).items():
+                    cv2.imshow(f'Motion Tracker - {name}', image)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                return False
+
+        if new_frames and len(engine.caps) >= 2:
+            synchronized = engine.synchronized_motions()
+            result = engine.triangulate(synchronized)
+            # Dasselbe synchrone Paar nicht bei jedem Frame erneut ausgeben
+            if result is not None and result[0].tobytes() != last_position[0]:
+                last_position[0] = result[0].tobytes()
+                position, confidence = result
+                timestamp = max(motion['timestamp'] for motion in synchronized.values())
+                if output is not None:
+                    output.write(json.dumps({
+                        'time': monotonic_to_wall(timestamp) if engine.replay_session is None else timestamp,
+                        'position': [round(float(v), 3) for v in position],
+                        'confidence': round(float(confidence), 3),
+                        'cameras': {name: [int(motion['cx']), int(motion['cy'])]
+                                    for name, motion in synchronized.items()},
+                    }) + "\n")
+                    output.flush()
+
+        now = time.monotonic()
+        if now - last_report[0] >= 10.0:
+            last_report[0] = now
+            engine.log(f"📊 Frame {frame_count}: {sum(motion_counts.values())} Motions, "
+                       f"{engine.current_fps:.1f} FPS")
+        return deadline is None or now < deadline
+
+    engine.on_frames = on_frames
+    try:
+        frame_count = engine.run()
+        engine.log(f"✅ Tracking beendet - {frame_count} Frames verarbeitet")
+    except KeyboardInterrupt:
+        engine.log("👋 Abbruch durch Benutzer")
+    finally:
+        engine.close()
+        engine.stream_resolver.stop()
+        if output is not None:
+            output.close()
+        if args.show:
+            cv2.destroyAllWindows()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())